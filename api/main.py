@@ -1,10 +1,15 @@
 import os
 import json
+import hashlib
+import itertools
+from datetime import datetime
+from email.utils import format_datetime, parsedate_to_datetime
 from pathlib import Path  
 from typing import Dict, List, Any
+from contextlib import asynccontextmanager
 
-from fastapi import FastAPI, Request, Query
-from fastapi.responses import HTMLResponse, JSONResponse
+from fastapi import FastAPI, Request, Query, Body, HTTPException
+from fastapi.responses import HTMLResponse, JSONResponse, FileResponse, Response, StreamingResponse
 from fastapi.templating import Jinja2Templates
 from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
@@ -12,12 +17,36 @@ from fastapi.middleware.cors import CORSMiddleware
 from src.application.ingest_words import IngestWords
 from src.application.generate_vocabtest import GenerateVocabTest
 from src.application.test_db_mgr import TestDBManager
+from src.application.registry import get_registry
+from src.application.test_jobs import get_job_runner
+from src.application.test_pdf import get_test_pdf_store
+from src.application.similarity_index import get_similarity_index
+from utils.db_manager import all_pool_stats
+from utils import metrics
+from utils.exporter import EXPORT_FORMATS, OPTIONAL_DEPENDENCIES, format_available
+from exception.custom_exception import CustomException
 
 from logger import GLOBAL_LOGGER as log
 
 BASE_DIR = Path(__file__).resolve().parent.parent
 
-app = FastAPI(title="Vocabulary Card", version="0.1")
+# Warm the process-wide registry once so requests never build LLM clients or DB connections
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    registry = get_registry()
+    timings = registry.warm_up()
+    log.info("Model registry warmed up", **timings)
+    get_job_runner().recover()
+    # Embedding new and edited cards off the request path calls the (paid) embedding API: opt-in
+    similarity = get_similarity_index()
+    if similarity.background_sync:
+        similarity.start()
+    yield
+    get_job_runner().shutdown()
+    get_similarity_index().close()
+    registry.close()
+
+app = FastAPI(title="Vocabulary Card", version="0.1", lifespan=lifespan)
 app.mount("/static", StaticFiles(directory=str(BASE_DIR / "static")), name="static")
 templates = Jinja2Templates(directory=str(BASE_DIR / "templates"))
 
@@ -28,6 +57,8 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+# Added last so it is outermost and times every request, CORS preflights included
+app.add_middleware(metrics.MetricsMiddleware)
 
 # Get request to serve the UI
 @app.get("/", response_class=HTMLResponse)
@@ -43,71 +74,201 @@ async def serve_original_ui(request: Request):
     resp.headers["Cache-Control"] = "no-store"
     return resp
 
+def _not_modified(request: Request, etag: str, last_modified: datetime = None) -> bool:
+    # If-None-Match takes precedence over If-Modified-Since (RFC 9110)
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        return if_none_match.strip() == "*" or etag in [tag.strip() for tag in if_none_match.split(",")]
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and last_modified is not None:
+        try:
+            return last_modified <= parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+    return False
+
+def _validator_headers(etag: str, last_modified: datetime) -> Dict[str, str]:
+    return {"ETag": etag, "Last-Modified": format_datetime(last_modified, usegmt=True), "Cache-Control": "no-cache"}
+
 @app.get("/api/words")
-def get_words() -> List[str]:
+def get_words(request: Request) -> List[str]:
+    version, last_modified = get_registry().vocab_db().change_state()
+    headers = _validator_headers(f'"words-{version}"', last_modified)
+    if _not_modified(request, headers["ETag"], last_modified):
+        return Response(status_code=304, headers=headers)
     ingestor = IngestWords()
-    output = ingestor.retrieve_all_words()
-    ingestor.close()
-    return output if output else []
+    output = ingestor.retrieve_all_words(version=version)
+    return JSONResponse(content=output if output else [], headers=headers)
 
 @app.get("/api/word")
-def get_word(word: str = Query(...)) -> Dict[str, Any]:
+def get_word(request: Request, word: str = Query(...)) -> Dict[str, Any]:
+    vocab_db = get_registry().vocab_db()
+    word_key = hashlib.sha256(word.lower().encode()).hexdigest()[:16]
+    version, last_modified = vocab_db.change_state()
+    headers = _validator_headers(f'"word-{word_key}-{version}"', last_modified)
+    if _not_modified(request, headers["ETag"], last_modified):
+        return Response(status_code=304, headers=headers)
     ingestor = IngestWords()
-    output = ingestor.retrieve_word(word)
-    ingestor.close()
-    return output if output else {}
+    output = ingestor.retrieve_word(word, version=version)
+    if not output:
+        # Unknown word: offer the closest known spellings instead
+        output = {"suggestions": [suggestion['word'] for suggestion in vocab_db.suggest(word.lower())]}
+    return JSONResponse(content=output, headers=headers)
+
+# Synonyms/antonyms of a word in either direction, from the word_relation graph
+@app.get("/api/word/related")
+def get_related_words(word: str = Query(...), kind: str = Query(None, pattern="^(synonym|antonym)$"),
+                      in_vocab: bool = Query(False)) -> Dict[str, Any]:
+    return {"word": word, **get_registry().vocab_db().get_related(word, kind=kind, in_vocab=in_vocab)}
+
+# Full-text prefix search over word, meaning, usage, synonyms and antonyms
+@app.get("/api/search")
+def search_words(q: str = Query(...), limit: int = Query(20, ge=1, le=100), offset: int = Query(0, ge=0)) -> Dict[str, Any]:
+    result = get_registry().vocab_db().search(q, limit=limit, offset=offset)
+    return {"query": q, "limit": limit, "offset": offset, **result}
+
+# Vocab words whose cards are closest to a word's card in embedding space
+@app.get("/api/similar")
+def get_similar_words(word: str = Query(...), k: int = Query(None, ge=1, le=100)) -> Dict[str, Any]:
+    k = k or get_registry().config().get("retriever", {}).get("top_k", 10)
+    return {"word": word, "k": k, "results": get_similarity_index().similar(word, k=k)}
+
+# Similarity index size, search backend and embedding model
+@app.get("/api/similar/stats")
+def get_similarity_stats() -> Dict[str, Any]:
+    return get_similarity_index().stats()
+
+# Download the whole vocab table as CSV, JSONL or Parquet, streamed a chunk of rows at a time
+@app.get("/api/export")
+def export_vocab(format: str = Query("csv", pattern="^(csv|jsonl|parquet)$")):
+    if not format_available(format):
+        raise HTTPException(status_code=501,
+                            detail=f"{format} export needs {OPTIONAL_DEPENDENCIES[format]}, which is not installed "
+                                   f"(pip install '.[{format}]')")
+    registry = get_registry()
+    chunk_size = registry.config().get("export", {}).get("chunk_size", 1000)
+    stream = registry.vocab_db().iter_export(format, chunk_size=chunk_size)
+    # Pull the first chunk here so a missing dependency or DB error is a proper error response
+    try:
+        first = next(stream, b"")
+    except CustomException as e:
+        log.error("Vocab export failed", format=format, error=str(e))
+        raise HTTPException(status_code=500, detail=f"Export to {format} failed")
+    media_type, extension = EXPORT_FORMATS[format]
+    headers = {"Content-Disposition": f'attachment; filename="vocab_export{extension}"'}
+    return StreamingResponse(itertools.chain([first], stream), media_type=media_type, headers=headers)
+
+# Vocab read cache hit/miss counters and current vocab version
+@app.get("/api/cache/vocab")
+def get_vocab_cache_stats() -> Dict[str, Any]:
+    return get_registry().vocab_db().cache_stats()
 
 
 @app.get("/health")
 def health() -> Dict[str, str]:
     return {"status": "ok", "service": "vocabulary-card"}
 
+# SQLite connection pool sizing stats
+@app.get("/api/db/pool")
+def get_db_pool_stats() -> List[Dict[str, Any]]:
+    return all_pool_stats()
+
+# Prometheus scrape target: LLM, DB, PDF and HTTP timings plus ingest outcome counters
+@app.get("/metrics")
+def get_metrics() -> Response:
+    return Response(content=metrics.render(), media_type=metrics.CONTENT_TYPE)
+
+# LLM response cache hit/miss counters
+@app.get("/api/cache/llm")
+def get_llm_cache_stats() -> Dict[str, Any]:
+    cache = get_registry().llm_cache()
+    return cache.stats() if cache else {"enabled": False}
+
 # Post requests for adding/updating/deleting words can be added here
+# Plain def: enrichment makes blocking LLM calls and SQLite writes, so it runs in the threadpool
 @app.post("/api/addword")
-async def add_word(request: Request) -> dict:
-    # Parse JSON body
-    body = await request.json()
+def add_word(body: Dict[str, Any] = Body(...)) -> dict:
     word_list = body.get('word_list', '')
     critical = body.get('critical', False)
+    allow_typos = body.get('allow_typos', False)
     log.info(f"Adding words: {word_list} with critical={critical}")
     ingestor = IngestWords()
     words = word_list.split() if word_list else []
-    ingest_status = ingestor.ingest_wordlist(words, critical)
-    ingestor.close()
+    ingest_status = ingestor.ingest_wordlist(words, critical, allow_typos=allow_typos)
+    typo_words = list(dict.fromkeys(ingest_status.get("suspected_typo", [])))
+    typo_suggestions = {word: ingestor.typo_suggestions(word) for word in typo_words}
     return {"total-words":len(words), 
             "failed-count": len(ingest_status.get("failed", [])),
             "failed-words": ingest_status.get("failed", []),
             "skipped-count": len(ingest_status.get("exists", [])),
-            "skipped-words": ingest_status.get("exists", [])}
+            "skipped-words": ingest_status.get("exists", []),
+            "typo-count": len(ingest_status.get("suspected_typo", [])),
+            "typo-words": ingest_status.get("suspected_typo", []),
+            "typo-suggestions": typo_suggestions}
 
-# request to generate vocab tests
+# request to generate vocab tests, runs as a background job
 @app.post("/api/vocabtest")
-async def post_test(request: Request) -> dict:
-    body = await request.json()
+def post_test(body: Dict[str, Any] = Body(...)) -> dict:
     test_type = body.get('test_type')
     num_to_pick = body.get('num_to_pick', 20)  # Default to 20 if not provided
-    log.info(f"Generating vocab test for type: {test_type} with {num_to_pick} words")
-    generator = GenerateVocabTest(test_type=test_type)
-    result = generator.generate_tests(num_to_pick=num_to_pick)
-    generator.close()   
-    return result
+    # bool is an int subclass, but true/false is not a test type
+    for name, value in (('test_type', test_type), ('num_to_pick', num_to_pick)):
+        if not isinstance(value, int) or isinstance(value, bool) or value < 1:
+            raise HTTPException(status_code=422, detail=f"{name} must be a positive integer, got {value!r}")
+    log.info(f"Queueing vocab test generation for type: {test_type} with {num_to_pick} words")
+    job = get_job_runner().submit(test_type, num_to_pick)
+    return {"status": "queued", "job_id": job['job_id']}
+
+# request to poll a test generation job
+@app.get("/api/vocabtest/jobs/{job_id}")
+def get_test_job(job_id: str) -> Dict[str, Any]:
+    job = get_job_runner().get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail=f"Unknown job: {job_id}")
+    return job
+
+# request to cancel a queued or running test generation job
+@app.delete("/api/vocabtest/jobs/{job_id}")
+def cancel_test_job(job_id: str) -> Dict[str, Any]:
+    runner = get_job_runner()
+    if not runner.get(job_id):
+        raise HTTPException(status_code=404, detail=f"Unknown job: {job_id}")
+    cancelled = runner.cancel(job_id)
+    return {"cancelled": cancelled, "job": runner.get(job_id)}
 
 # request to get all tests
 @app.get("/api/vocabtest")
-async def get_test(testtype: int = Query(...)) -> List[Dict[str, Any]]:
+def get_test(testtype: int = Query(...)) -> List[Dict[str, Any]]:
     log.info(f"Getting vocab test for type: {testtype}")
     generator = GenerateVocabTest(test_type=testtype)
     result = generator.retrieve_test()
-    generator.close()
     return result
 
+# request to download one part (definitions, usage, answers, booklet) of a test as a PDF
+@app.get("/api/vocabtest/{test_type}/{test_no}/{part}.pdf")
+def get_test_pdf(test_type: int, test_no: int, part: str, request: Request):
+    pdf = get_test_pdf_store().get_pdf(test_type, test_no, part)
+    if pdf is None:
+        raise HTTPException(status_code=404, detail=f"No {part} PDF for test {test_type}-{test_no}")
+    headers = {"ETag": pdf['etag'], "Cache-Control": "no-cache"}
+    if _not_modified(request, pdf['etag']):
+        return Response(status_code=304, headers=headers)
+    filename = f"test-{test_type}-{test_no}-{part}.pdf"
+    headers["Content-Disposition"] = f'inline; filename="{filename}"'
+    if 'path' in pdf:
+        return FileResponse(pdf['path'], media_type="application/pdf", headers=headers)
+    return Response(content=pdf['content'], media_type="application/pdf", headers=headers)
+
+# Rendered test PDF cache stats
+@app.get("/api/cache/pdf")
+def get_pdf_cache_stats() -> Dict[str, Any]:
+    return get_test_pdf_store().stats()
+
 # request to get test summary
 @app.get("/api/vocabtest/summary")
-async def get_all_test_summary() -> List[Dict[str, Any]]:
+def get_all_test_summary() -> List[Dict[str, Any]]:
     log.info(f"Getting vocab test summary")
-    test_db_mgr = TestDBManager()
-    result = test_db_mgr.get_all_test_summary()
-    test_db_mgr.close()
+    result = get_registry().test_db().get_all_test_summary()
     return result
     
 
@@ -0,0 +1,62 @@
+import os
+import json
+import time
+import random
+import tempfile
+
+from src.application.vocab_db_mgr import VocabDBManager
+
+# Compare the parameterised points writer with the string-built CASE update it replaced
+SIZES = [20, 1000, 50000]
+VOCAB_SIZE = 60000
+REPEATS = 5
+
+def legacy_update(db_mgr, vocab_words):
+    update_query = """UPDATE vocab 
+                    SET points = CASE word
+                    """
+    for word_dict in vocab_words:
+        update_query += f"""
+                        WHEN '{word_dict['word']}' THEN {word_dict['points']}
+                    """
+    update_query += """
+                    END
+                    WHERE word IN ({});""".format(','.join(["'{}'".format(word_dict['word']) for word_dict in vocab_words]))
+    db_mgr.db.query_execute(update_query)
+    return True
+
+def seed(db_mgr, n):
+    columns = [col for col in db_mgr.vocab_columns if col not in ['id', 'created_at', 'points']]
+    rows = [{col: (f"word{i}" if col == 'word' else f"{col} of word{i}") for col in columns} for i in range(n)]
+    db_mgr.insert_words(rows)
+
+def time_call(fn, *args):
+    timings = []
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        fn(*args)
+        timings.append((time.perf_counter() - start) * 1000)
+    return round(min(timings), 3)
+
+def run():
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        db_mgr = VocabDBManager(db_path=os.path.join(tmp, "bench_vocab.db"))
+        seed(db_mgr, VOCAB_SIZE)
+        for size in SIZES:
+            batch = [{'word': f"word{i}", 'points': random.choice([0, 5, 10, 15])}
+                     for i in random.sample(range(VOCAB_SIZE), size)]
+            result = {"words": size, "parameterised_ms": time_call(db_mgr.updated_words_points_for_test, batch)}
+            try:
+                result["legacy_case_ms"] = time_call(legacy_update, db_mgr, batch)
+            except Exception as e:
+                result["legacy_case_ms"] = None
+                result["legacy_error"] = str(e).splitlines()[0]
+            results.append(result)
+        db_mgr.close()
+    return results
+
+if __name__ == "__main__":
+    print(json.dumps(run(), indent=2))
+
+# python test.py benchmarks/bench_points_update.py
@@ -0,0 +1,176 @@
+import io
+import os
+import sys
+import json
+import time
+import random
+import sqlite3
+import platform
+import tempfile
+import statistics
+import subprocess
+from itertools import islice
+from contextlib import redirect_stdout
+from datetime import datetime, timezone
+
+from benchmarks.synthetic import parse_sizes, size_label, synthetic_word, synthetic_cards, seed_vocab_db, StubTestGenerator
+from src.application.schema import VOCAB_TABLE
+from src.application.registry import ModelRegistry
+from src.application.generate_vocabtest import GenerateVocabTest
+from src.application.word_sampler import WeightedWordSampler
+from utils.db_manager import SQLiteManager
+from utils.pdf_printer import save_text_to_pdf, save_dict_list_to_pdf
+
+# Microbenchmarks of the DB, sampling, export, PDF and test-generation paths over synthetic vocab.
+# Results are one JSON document (environment + one record per benchmark and size) for compare.py.
+# stdout is not used for them: PDF worker processes print there.
+DEFAULT_SIZES = "1k,10k,100k"
+NUM_TO_PICK = 20
+FETCH_LOOKUPS = 1000
+FETCH_ALL_MAX_ROWS = 100_000   # query_fetch_all materialises every row as a dict; larger sizes only stream
+PICKS = 500
+E2E_MAX_WORDS = 1000     # generate_tests runs ~n/10 tests (3 PDFs each), so it is skipped above this
+STUB_LATENCY = 0.0       # seconds per stubbed LLM call in generate_tests
+
+def repeats_for(n):
+    return 5 if n <= 10_000 else 3 if n <= 100_000 else 1
+
+def timed(fn, repeats=5):
+    """Run fn repeats times; min is the headline number (least noise), median shows the spread."""
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return {"ms": round(min(timings), 3), "median_ms": round(statistics.median(timings), 3), "repeats": repeats}
+
+def record(results, name, n, **fields):
+    results.append({"name": name, "size": n, **fields})
+    print(f"{name:<24} {size_label(n) if n else '-':>6} {fields.get('ms', '')}", file=sys.stderr)
+
+def bench_sqlite(results, n, tmp):
+    # Raw SQLiteManager on the plain vocab table (no FTS or relation upkeep)
+    columns = list(next(synthetic_cards(1)).keys())
+    path = os.path.join(tmp, "sqlite.db")
+
+    def insert():
+        # Cards are generated outside the timed region in 5000-row batches, so 1M rows never sit in memory
+        db = SQLiteManager(db_path=path)
+        db.query_execute("DROP TABLE IF EXISTS vocab;")
+        db.query_execute(VOCAB_TABLE)
+        elapsed, cards = 0.0, synthetic_cards(n)
+        while batch := list(islice(cards, 5000)):
+            start = time.perf_counter()
+            db.insert_many("vocab", batch)
+            elapsed += time.perf_counter() - start
+        db.close()
+        return elapsed
+    timings = [insert() * 1000 for _ in range(repeats_for(n))]
+    record(results, "sqlite_insert_many", n, ms=round(min(timings), 3), median_ms=round(statistics.median(timings), 3),
+           repeats=len(timings), rows_per_s=round(n / min(timings) * 1000))
+
+    db = SQLiteManager(db_path=path)
+    select_all = f"SELECT {', '.join(columns)} FROM vocab;"
+    if n <= FETCH_ALL_MAX_ROWS:
+        record(results, "sqlite_fetch_all", n, **timed(lambda: db.query_fetch_all(select_all), repeats_for(n)))
+    record(results, "sqlite_iter_chunks", n, **timed(lambda: sum(len(chunk) for chunk in db.iter_chunks(select_all)), repeats_for(n)))
+    rng = random.Random(1)
+    keys = [synthetic_word(rng.randrange(n)) for _ in range(FETCH_LOOKUPS)]
+    result = timed(lambda: [db.query_fetch("SELECT * FROM vocab WHERE word = ?;", (key,)) for key in keys], repeats_for(n))
+    record(results, "sqlite_fetch_by_word", n, **result, per_call_us=round(result["ms"] * 1000 / FETCH_LOOKUPS, 2))
+    db.close()
+
+def bench_vocab(results, n, registry, tmp):
+    db_mgr = registry.vocab_db()
+    # Seeding goes through insert_words, so it also covers the FTS triggers and relation graph
+    seconds = seed_vocab_db(db_mgr, n)
+    record(results, "vocab_insert_words", n, ms=round(seconds * 1000, 3), rows_per_s=round(n / seconds))
+
+    rng = random.Random(2)
+    words = [row['word'] for row in db_mgr.get_all_words_for_test()]
+    for batch_size in sorted({NUM_TO_PICK, min(n, 10_000)}):
+        batch = [{'word': word, 'points': rng.choice([0, 5, 10, 15])} for word in rng.sample(words, batch_size)]
+        record(results, "points_update", n, batch=batch_size,
+               **timed(lambda: db_mgr.updated_words_points_for_test(batch), repeats_for(n)))
+    db_mgr.reset_words_points_for_test()
+
+    record(results, "get_all_words_for_test", n, **timed(db_mgr.get_all_words_for_test, repeats_for(n)))
+
+    generator = GenerateVocabTest(registry=registry)
+    words_for_test = db_mgr.get_all_words_for_test()
+    def picks():
+        # Fresh sampler each repeat so every run starts from full points
+        generator.sampler = WeightedWordSampler(words_for_test)
+        for _ in range(PICKS):
+            generator.generate_random_word_list(NUM_TO_PICK)
+    result = timed(picks, repeats_for(n))
+    record(results, "generate_random_word_list", n, **result, per_test_us=round(result["ms"] * 1000 / PICKS, 2))
+
+    export_path = os.path.join(tmp, "export.csv")
+    record(results, "export_to_csv", n, **timed(lambda: db_mgr.export_to_csv(export_path), repeats_for(n)),
+           bytes=os.path.getsize(export_path))
+    return generator
+
+def bench_pdf(results, tmp):
+    # One test's worth of content, as GenerateVocabTest renders it
+    cards = list(synthetic_cards(NUM_TO_PICK))
+    definitions = [{'Meaning': card['meaning'], 'Word': card['word']} for card in cards]
+    questions = "Words : \n{}\n\n\nQuestions : \n{}".format(" ".join(card['word'] for card in cards),
+                                                           "\n".join(f"{i + 1}. {card['usage']}" for i, card in enumerate(cards)))
+    with redirect_stdout(io.StringIO()):
+        record(results, "save_text_to_pdf", None, **timed(lambda: save_text_to_pdf(questions, os.path.join(tmp, "text.pdf"), "usage")))
+        record(results, "save_dict_list_to_pdf", None, **timed(lambda: save_dict_list_to_pdf(definitions, os.path.join(tmp, "table.pdf"), "definitions")))
+
+def bench_generate_tests(results, n, generator, tmp):
+    # End to end: sampling, points writes, test rows, manifests and PDFs, with the LLM stubbed out
+    stub = StubTestGenerator(latency=STUB_LATENCY)
+    generator._test_generator = stub
+    generator.test_loc = os.path.join(tmp, "test_sets")
+    generator.reset_test()
+    start = time.perf_counter()
+    with redirect_stdout(io.StringIO()):
+        outcome = generator.generate_tests(num_to_pick=NUM_TO_PICK)
+    ms = (time.perf_counter() - start) * 1000
+    record(results, "generate_tests", n, ms=round(ms, 3), status=outcome['status'], tests=stub.calls,
+           per_test_ms=round(ms / max(1, stub.calls), 3), stub_latency_s=STUB_LATENCY)
+
+def environment():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, timeout=10,
+                                cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__)))).stdout.strip()
+    except Exception:
+        commit = None
+    return {"commit": commit or None,
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "platform": platform.platform(),
+            "cpus": os.cpu_count()}
+
+def run(sizes):
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        bench_pdf(results, tmp)
+        for n in sizes:
+            size_dir = os.path.join(tmp, size_label(n))
+            os.makedirs(size_dir)
+            bench_sqlite(results, n, size_dir)
+            registry = ModelRegistry(vocab_db_path=os.path.join(size_dir, "vocab.db"),
+                                     testset_db_path=os.path.join(size_dir, "testset.db"))
+            try:
+                generator = bench_vocab(results, n, registry, size_dir)
+                if n <= E2E_MAX_WORDS:
+                    bench_generate_tests(results, n, generator, size_dir)
+            finally:
+                registry.close()
+    return {"environment": environment(), "sizes": sizes, "results": results}
+
+if __name__ == "__main__":
+    sizes = parse_sizes(sys.argv[1] if len(sys.argv) > 1 else DEFAULT_SIZES)
+    report = run(sizes)
+    output = sys.argv[2] if len(sys.argv) > 2 else f"bench-{report['environment']['commit'] or 'local'}.json"
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {output}", file=sys.stderr)
+
+# python test.py benchmarks/bench_suite.py [1k,10k,100k,1m] [bench.json]
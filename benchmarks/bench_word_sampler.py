@@ -0,0 +1,71 @@
+import json
+import time
+import numpy as np
+
+from src.application.word_sampler import WeightedWordSampler
+
+# Compare the Fenwick-tree sampler with the per-test weight rebuild it replaced
+SIZES = [100000, 1000000]
+NUM_TO_PICK = 20
+SAMPLER_TESTS = 1000
+LEGACY_TESTS = 5
+
+def legacy_pick(words_for_test, num_to_pick=20):
+    weights = []
+    stop_criteria = True
+    for item in words_for_test:
+        if item['points'] >= 10:
+            weights.append(0.749)
+            stop_criteria = False
+        elif item['points'] == 5:
+            weights.append(0.25)
+            stop_criteria = False
+        else:
+            weights.append(0.001)
+    weights = np.array(weights)
+    weights_normalized = weights / weights.sum()
+    picked_indices = np.random.choice(
+        a=list(range(len(words_for_test))),
+        size=min(num_to_pick, len(words_for_test)),
+        replace=False,
+        p=weights_normalized
+        )
+    picked_words = []
+    for item in list(set(picked_indices)):
+        words_for_test[item]['points'] = max(0, words_for_test[item]['points'] - 5)
+        picked_words.append(words_for_test[item])
+    return picked_words, stop_criteria
+
+def synthetic_words(n):
+    points = np.random.default_rng(0).choice([0, 5, 10, 15], size=n)
+    return [{'word': f"word{i}", 'points': int(p)} for i, p in enumerate(points)]
+
+def run():
+    results = []
+    for size in SIZES:
+        words = synthetic_words(size)
+
+        start = time.perf_counter()
+        sampler = WeightedWordSampler(words)
+        build_ms = (time.perf_counter() - start) * 1000
+        start = time.perf_counter()
+        for _ in range(SAMPLER_TESTS):
+            sampler.stop_criteria
+            sampler.pick(NUM_TO_PICK)
+        sampler_ms = (time.perf_counter() - start) * 1000 / SAMPLER_TESTS
+
+        start = time.perf_counter()
+        for _ in range(LEGACY_TESTS):
+            legacy_pick(words, NUM_TO_PICK)
+        legacy_ms = (time.perf_counter() - start) * 1000 / LEGACY_TESTS
+
+        results.append({"words": size,
+                        "sampler_build_ms": round(build_ms, 3),
+                        "sampler_per_test_ms": round(sampler_ms, 4),
+                        "legacy_per_test_ms": round(legacy_ms, 3)})
+    return results
+
+if __name__ == "__main__":
+    print(json.dumps(run(), indent=2))
+
+# python test.py benchmarks/bench_word_sampler.py
@@ -0,0 +1,41 @@
+import sys
+import json
+
+# Compare two bench_suite.py result files; exits 1 if any benchmark got slower than the threshold
+THRESHOLD = 0.10    # fractional slowdown of the min time counted as a regression
+
+def key(result):
+    # points_update runs at several batch sizes per vocab size
+    return (result["name"], result["size"], result.get("batch"))
+
+def compare(baseline, current, threshold=THRESHOLD):
+    before = {key(result): result for result in baseline["results"]}
+    rows = []
+    for result in current["results"]:
+        old = before.get(key(result))
+        if old is None or not old.get("ms"):
+            continue
+        change = result["ms"] / old["ms"] - 1
+        rows.append({"name": result["name"], "size": result["size"], "batch": result.get("batch"),
+                     "baseline_ms": old["ms"], "current_ms": result["ms"], "change": round(change, 4),
+                     "regression": change > threshold})
+    return rows
+
+if __name__ == "__main__":
+    if len(sys.argv) < 3:
+        print(f"Usage: {sys.argv[0]} <baseline.json> <current.json> [threshold]")
+        sys.exit(1)
+    with open(sys.argv[1], encoding="utf-8") as f:
+        baseline = json.load(f)
+    with open(sys.argv[2], encoding="utf-8") as f:
+        current = json.load(f)
+    threshold = float(sys.argv[3]) if len(sys.argv) > 3 else THRESHOLD
+    rows = compare(baseline, current, threshold)
+    print(f"{baseline['environment'].get('commit')} -> {current['environment'].get('commit')}")
+    for row in rows:
+        label = row["name"] + (f"[{row['batch']}]" if row["batch"] else "")
+        flag = "  REGRESSION" if row["regression"] else ""
+        print(f"{label:<32} {row['size'] or '-':>8} {row['baseline_ms']:>12.3f} {row['current_ms']:>12.3f} {row['change']:>+8.1%}{flag}")
+    sys.exit(1 if any(row["regression"] for row in rows) else 0)
+
+# python test.py benchmarks/compare.py bench-before.json bench-after.json [0.10]
@@ -0,0 +1,90 @@
+import random
+import string
+import time
+
+# Deterministic synthetic vocab for benchmarks: no API keys, no LLM, same cards on every run
+SIZES = {"1k": 1_000, "10k": 10_000, "100k": 100_000, "1m": 1_000_000}
+
+SYLLABLES = [c + v for c in "bcdfghjklmnprstvwz" for v in "aeiou"] + ["ch", "sh", "th", "qu", "str", "pl"]
+FILLER = ("the a of to and in is that it was for on are as with his they be at one have this from "
+          "or had by word but what some we can out other were all there when up use your how said").split()
+
+def parse_sizes(text):
+    """'1k,10k' or '5000' -> [1000, 10000] / [5000]."""
+    return [SIZES[size.lower()] if size.lower() in SIZES else int(size) for size in text.split(",") if size]
+
+def size_label(n):
+    labels = {count: label for label, count in SIZES.items()}
+    return labels.get(n, str(n))
+
+def synthetic_word(i):
+    # Pronounceable and unique: the index written in base len(SYLLABLES), one syllable per digit
+    syllables = []
+    while True:
+        i, digit = divmod(i, len(SYLLABLES))
+        syllables.append(SYLLABLES[digit])
+        if i == 0:
+            break
+        i -= 1
+    return "".join(reversed(syllables))
+
+def _sentence(rng, words, length):
+    return " ".join(rng.choice(words) for _ in range(length)).capitalize() + "."
+
+def synthetic_cards(n, seed=0):
+    """Yield n vocab cards (vocab table columns) with realistic field lengths and related-word links."""
+    rng = random.Random(seed)
+    for i in range(n):
+        word = synthetic_word(i)
+        related = [synthetic_word(rng.randrange(n)) for _ in range(5)]
+        yield {'word': word,
+               'meaning': _sentence(rng, FILLER, rng.randint(6, 14)),
+               'usage': f"{_sentence(rng, FILLER, rng.randint(4, 8))[:-1]} {word} {_sentence(rng, FILLER, rng.randint(3, 8)).lower()}",
+               'etymology': f"From Latin {word}{rng.choice(['us', 'are', 'ere'])}, {_sentence(rng, FILLER, 5).lower()}",
+               'word_break': "-".join(word[j:j + 2] for j in range(0, len(word), 2)),
+               'picture': _sentence(rng, FILLER, rng.randint(5, 10)),
+               'did_you_know_facts': _sentence(rng, FILLER, rng.randint(8, 16)),
+               'synonyms': ", ".join(related[:3]),
+               'antonyms': ", ".join(related[3:]),
+               'additional_facts': _sentence(rng, FILLER, rng.randint(5, 12))}
+
+def seed_vocab_db(db_mgr, n, batch_size=5000, seed=0):
+    """Fill a VocabDBManager with n synthetic cards through insert_words; returns the seconds taken."""
+    start = time.perf_counter()
+    batch = []
+    for card in synthetic_cards(n, seed):
+        batch.append(card)
+        if len(batch) == batch_size:
+            db_mgr.insert_words(batch)
+            batch = []
+    if batch:
+        db_mgr.insert_words(batch)
+    return time.perf_counter() - start
+
+
+class StubTestGenerator:
+    """
+    Stands in for test_generator: returns one usage question per picked word in the Test1 shape
+    without calling an LLM. latency seconds are slept per call to model a remote model.
+    """
+
+    def __init__(self, latency=0.0, seed=0):
+        self.latency = latency
+        self.rng = random.Random(seed)
+        self.calls = 0
+
+    def generate_test(self, word_list, bypass_cache=False) -> list[dict]:
+        self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+        return [{'word': word['word'],
+                 'question': f"The {self.rng.choice(FILLER)} was ______ when the {''.join(self.rng.choices(string.ascii_lowercase, k=6))} arrived."}
+                for word in word_list]
+
+
+if __name__ == "__main__":
+    print([synthetic_word(i) for i in (0, 1, 95, 96, 10_000, 999_999)])
+    print(next(synthetic_cards(3)))
+    print(StubTestGenerator().generate_test([{'word': "bab"}]))
+
+# python test.py benchmarks/synthetic.py
@@ -13,6 +13,9 @@ class WordInfo(BaseModel):
     Antonyms: str
     Additional_facts: str
 
+class WordInfoList(RootModel[list[WordInfo]]):
+    pass
+
 class Test1Format(BaseModel):
     word: str
     question: str
@@ -22,5 +25,6 @@ class Test1(RootModel[list[Test1Format]]):
 
 class PromptType(str, Enum):
     RETRIEVE_VOCABINFO = "retrieve_vocabinfo_prompt"
+    RETRIEVE_VOCABINFO_BATCH = "retrieve_vocabinfo_batch_prompt"
     TEST_VOCAB_TYPE1 = "TestVocab_type1_prompt"
 
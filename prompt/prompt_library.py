@@ -40,6 +40,52 @@ additional_facts : Page (sheet of paper) and Page (royal attendant) are homograp
 input_word : {input_word}
 """)
 
+# Prompt for retrieve vocabulary information for several words in one call
+retrieve_vocabinfo_batch_prompt = ChatPromptTemplate.from_template(
+"""
+You're an excellent English teacher for a 11 year old student. Your task is to help the student learn vocabulary. Given a list of input words, you need to extract relevant information for every word using the template below. No additional information or commentary is expected. 
+You must always return a valid JSON array fenced by a markdown code block, with exactly one object per input word in the order given. Do not return any additional text.
+Every object must repeat the input word exactly as given in input_word.
+When a word has multiple meanings, provide information for the most common meaning and mention the other meaning in additional facts.
+When a word doesnt exist, return word as None and empty strings for all other fields.
+You have the template followed by an example below.
+
+Template ##############################
+input_words : one word per line
+
+input_word : input word exactly as given
+word : input_word
+meaning : Definition of the word
+usage : Example sentence using the word
+etymology : Origin of the word
+word_break : Breakdown of the word to aid memory
+picture : Visual cue or description
+did_you_know_facts : Interesting fact about the word
+synonyms : List of synonyms separated by comma
+antonyms : List of antonyms separated by comma
+additional_facts : Facts seperated by newline like 1) if there is a Homographs, Homonyms or Homophones then mention and explain it with an example without a miss 2) any others relevant facts about vocab to remember
+
+E.g. ##############################
+input_words :
+page
+
+input_word : page
+word : Page
+meaning : A single side of a sheet of paper in a collection of sheets bound together, especially as part of a book, magazine, or newspaper.
+usage : Please turn to page 10 of your textbook for today's lesson.
+etymology : Comes from the Latin word 'pagina,' meaning 'a written page, leaf, sheet.
+word_break : Think of 'page' as a 'p-age' - a piece of paper with age-old information.
+picture : A book lying open with a page being turned.
+did_you_know_facts : The concept of pages dates back to ancient scrolls, where text was written in columns.
+synonyms : leaf, sheet, folio, paper
+antonyms : cover, binding, spine
+additional_facts : Page (sheet of paper) and Page (royal attendant) are homographs (same spelling, different meaning).\n The verb 'to page' (as in 'to call someone over an intercom') also comes from this root, showing how words evolve with technology.
+#########################
+
+input_words :
+{input_words}
+""")
+
 # Prompt for create Test 1 
 TestVocab_type1_prompt = ChatPromptTemplate.from_template(
 """
@@ -74,5 +120,6 @@ Words :
 # Central dictionary to register prompts
 PROMPT_REGISTRY = {
     "retrieve_vocabinfo_prompt": retrieve_vocabinfo_prompt,
+    "retrieve_vocabinfo_batch_prompt": retrieve_vocabinfo_batch_prompt,
     "TestVocab_type1_prompt": TestVocab_type1_prompt
 }
\ No newline at end of file
@@ -0,0 +1,30 @@
+import os
+import sys
+import time
+
+from logger import GLOBAL_LOGGER as log
+from utils.config_loader import load_config
+from utils.exporter import EXPORT_FORMATS, format_for_path
+from src.application.vocab_db_mgr import VocabDBManager
+
+# Stream the vocab table of a vocab database to a CSV, JSONL or Parquet file (format from the extension)
+# python test.py src/application/export_vocab.py data/vocab_11plus_export.jsonl [data/vocab_11plus.db]
+def export(export_path, db_path):
+    start = time.perf_counter()
+    chunk_size = load_config().get("export", {}).get("chunk_size", 1000)
+    vocab_db_mgr = VocabDBManager(db_path=db_path)
+    rows = vocab_db_mgr.export(export_path, chunk_size=chunk_size)
+    vocab_db_mgr.close()
+    log.info("Vocab exported", path=export_path, format=format_for_path(export_path), rows=rows,
+             elapsed_ms=round((time.perf_counter() - start) * 1000, 2))
+    return rows
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print(f"Usage: {sys.argv[0]} <export_path{'|'.join(ext for _, ext in EXPORT_FORMATS.values())}> [db_path]")
+        sys.exit(1)
+    db_path = sys.argv[2] if len(sys.argv) > 2 else os.path.join("data","vocab_11plus.db")
+    if not os.path.exists(db_path):
+        print(f"Error: database not found: {db_path}")
+        sys.exit(1)
+    export(sys.argv[1], db_path)
@@ -1,9 +1,10 @@
 from src.application.vocab_db_mgr import VocabDBManager
 import os
 import json
+import itertools
 from collections import defaultdict
 import random
-import numpy as np
+from concurrent.futures import ThreadPoolExecutor
 
 from logger import GLOBAL_LOGGER as log
 from exception.custom_exception import CustomException
@@ -11,73 +12,54 @@ from exception.custom_exception import CustomException
 from src.application.test_generator import test_generator
 from src.application.vocab_db_mgr import VocabDBManager
 from src.application.test_db_mgr import TestDBManager
-from utils.pdf_printer import save_text_to_pdf, save_dict_list_to_pdf
+from src.application.registry import get_registry
+from src.application.word_sampler import WeightedWordSampler
+from utils.pdf_printer import PdfRenderService
 
 class GenerateVocabTest:
-    def __init__(self, test_type=1):
-        self.db_mgr = VocabDBManager(db_path=os.path.join("data","vocab_11plus.db"))     
-        self.words_for_test = self.db_mgr.get_all_words_for_test()   
+    def __init__(self, test_type=1, registry=None):
+        self.registry = registry or get_registry()
+        self.db_mgr = self.registry.vocab_db()
+        # Built from a full (word, points) scan when generation starts, so read-only callers never pay for it
+        self.sampler = None
         self.stop_criteria = False
         self.test_type = test_type
-        self.test_db_mgr = TestDBManager(db_path=os.path.join("data","vocab_testset.db"))
+        self.test_db_mgr = self.registry.test_db()
         self.test_loc = os.path.join("data","test_sets")
+        self.pdf_service = self.registry.pdf_service()
+        self._test_generator = None
+        self._pending_renders = []
+        # files: three PDFs per test, booklet: one PDF per test, batch: one PDF per generate_tests run
+        self.pdf_layout = self.registry.config().get("pdf", {}).get("layout", "files")
+        self._batch_booklet = None
+        # Decoy words added to the usage word bank (0 = test words only)
+        self.num_distractors = self.registry.config().get("test_generation", {}).get("distractors", 0)
+
+    @property
+    def test_generator(self):
+        # Built on first generation so read-only callers never touch the LLM
+        if self._test_generator is None:
+            self._test_generator = test_generator(self.test_type, registry=self.registry)
+        return self._test_generator
   
-    def generate_vocab_test(self, num_to_pick=20):
+    def generate_vocab_test(self, num_to_pick=20, wait_for_pdfs=True):
+        # wait_for_pdfs=False leaves the renders pending for generate_tests to collect at the end
         try:    
+            if self.sampler is None:
+                self._load_sampler()
             # Get test summary based on last run
-            test_summary = self.test_db_mgr.get_test_summary(self.test_type)      
-            if not test_summary:
-                test_summary = {'testtype': self.test_type,'last_test': 0, 'test_count': 0}
+            test_summary = self._get_test_summary()
 
             # Generate picked words
-            picked_words = self.generate_random_word_list(num_to_pick=num_to_pick) 
-            log.info(f"Picked words for test: {picked_words}")
+            plan = self._reserve_test(test_summary['last_test'] + 1, num_to_pick)
 
             # Generate test
-            testgenerator = test_generator(self.test_type)           
-            result = testgenerator.generate_test(picked_words)
-            log.info(f"Generated test: {result}")
-            query_status = self.db_mgr.updated_words_points_for_test(picked_words)
-            if not query_status:
-                return {"status": "failed", "error": "Failed to update words points for test"}
-            
-            # Generate test pdf
-            test_no = test_summary['last_test'] + 1
-            word_list = [word['word'] for word in picked_words]
-            random.shuffle(word_list)
-            words = ' '.join(word_list)
-            location = os.path.join(self.test_loc, f"test-{self.test_type}-{test_no}.txt")  
-
-            word_cards = [self.db_mgr.get_word(word['word']) for word in picked_words]
-            random.shuffle(word_cards)            
-            definition_words_answers = '|'.join(f"{i+1}. {word['word']}" for i, word in enumerate(word_cards))
-            definitions_to_print = [{'Meaning': word['meaning'], 'Word': word_list[i]} for i, word in enumerate(word_cards)]         
-            usage_questions = '\n'.join(f"{i+1}. {word_question['question']}" for i, word_question in enumerate(result))
-            usage_answers = '|'.join(f"{i+1}. {word_question['word']}" for i, word_question in enumerate(result))
-            
-            questions_to_print = """
-            Words : \n{}\n\n\n
-            Questions : \n{}\n\n\n
-            """.format(words, \
-                       usage_questions)
-            answers_to_print = """
-            Definitions : \n{}\n
-            Usage : \n{}\n\n\n
-            """.format(definition_words_answers, \
-                       usage_answers)
-            instructions = f"""{self.test_type}-{test_no}-Match the words with their definitions"""
-            
-            # Save test pdf
-            save_dict_list_to_pdf(definitions_to_print, os.path.join(self.test_loc, f"test-{self.test_type}-{test_no}-definitions.pdf"), instructions)
-            save_text_to_pdf(questions_to_print, os.path.join(self.test_loc, f"test-{self.test_type}-{test_no}-usage.pdf"),title=f"test-{self.test_type}-{test_no}-usage")
-            save_text_to_pdf(answers_to_print, os.path.join(self.test_loc, f"test-{self.test_type}-{test_no}-answers.pdf"),title=f"test-{self.test_type}-{test_no}-answers")
-            
-            # Update test db
-            test_data = {'testtype': self.test_type, 
-                         'testno': test_no, 
-                         'words': words, 
-                         'location': location}
-            self.test_db_mgr.insert_test(test_data)
+            result = self._generate_questions(plan)
+            renders = self._commit_test(plan, result)
+            if wait_for_pdfs:
+                PdfRenderService.wait_all(renders)
+            else:
+                self._pending_renders.extend(renders)
             
             return {"status": "success", "test_count": test_summary['test_count'] + 1}           
 
@@ -85,57 +67,235 @@ class GenerateVocabTest:
             log.error(f"Error generating vocab test", error=str(e))
             return {"status": "failed", "error": str(e)}
 
+    def _get_test_summary(self):
+        test_summary = self.test_db_mgr.get_test_summary(self.test_type)      
+        if not test_summary:
+            test_summary = {'testtype': self.test_type,'last_test': 0, 'test_count': 0}
+        return test_summary
+
+    def _reserve_test(self, test_no, num_to_pick=20):
+        # Sampling is sequential so every test sees the points left by the tests before it
+        picked_words = self.generate_random_word_list(num_to_pick=num_to_pick) 
+        log.info(f"Picked words for test: {picked_words}", test_no=test_no)
+        return {'test_no': test_no,
+                'picked_words': picked_words,
+                'words_remaining': self.sampler.eligible_count,
+                'tests_remaining': self._estimate_tests_remaining(num_to_pick)}
+
+    def _estimate_tests_remaining(self, num_to_pick):
+        # Rough estimate: assumes every remaining pick takes 5 points off an eligible word
+        if self.stop_criteria:
+            return 0
+        return -(-self.sampler.pending_draws // max(1, num_to_pick))
+
+    @staticmethod
+    def _report_progress(progress_callback, tests_produced, plan, tests_remaining=None):
+        if progress_callback is None:
+            return
+        progress_callback({'tests_produced': tests_produced,
+                           'words_remaining': plan['words_remaining'],
+                           'tests_remaining': plan['tests_remaining'] if tests_remaining is None else tests_remaining})
+
+    def _generate_questions(self, plan):
+        result = self.test_generator.generate_test(plan['picked_words'])
+        log.info(f"Generated test: {result}", test_no=plan['test_no'])
+        return result
+
+    def _commit_test(self, plan, result):
+        """
+        Write points and the test row for one generated test and queue its PDFs; raises on failure.
+        Returns the render futures, which the caller waits on.
+        """
+        test_no = plan['test_no']
+        picked_words = plan['picked_words']
+        query_status = self.db_mgr.updated_words_points_for_test(picked_words)
+        if not query_status:
+            raise CustomException("Failed to update words points for test")
+        
+        # Generate test pdf
+        word_list = [word['word'] for word in picked_words]
+        random.shuffle(word_list)
+        words = ' '.join(word_list)
+        # The usage word bank also offers related decoys, so the last blanks aren't a process of elimination
+        word_bank = word_list + self.pick_distractors(word_list, self.num_distractors)
+        random.shuffle(word_bank)
+        location = os.path.join(self.test_loc, f"test-{self.test_type}-{test_no}.json")
+
+        word_cards = self.db_mgr.get_words([word['word'] for word in picked_words])
+        random.shuffle(word_cards)            
+        definition_words_answers = '|'.join(f"{i+1}. {word['word']}" for i, word in enumerate(word_cards))
+        definitions_to_print = [{'Meaning': word['meaning'], 'Word': word_list[i]} for i, word in enumerate(word_cards)]         
+        usage_questions = '\n'.join(f"{i+1}. {word_question['question']}" for i, word_question in enumerate(result))
+        usage_answers = '|'.join(f"{i+1}. {word_question['word']}" for i, word_question in enumerate(result))
+        
+        questions_to_print = """
+        Words : \n{}\n\n\n
+        Questions : \n{}\n\n\n
+        """.format(' '.join(word_bank), \
+                   usage_questions)
+        answers_to_print = """
+        Definitions : \n{}\n
+        Usage : \n{}\n\n\n
+        """.format(definition_words_answers, \
+                   usage_answers)
+        instructions = f"""{self.test_type}-{test_no}-Match the words with their definitions"""
+        
+        # Save test pdf (rendered by the PDF worker processes)
+        sections = [
+            {'part': "definitions", 'kind': "table", 'data': definitions_to_print, 'title': instructions, 'bookmark': "Definitions"},
+            {'part': "usage", 'kind': "text", 'data': questions_to_print, 'title': f"test-{self.test_type}-{test_no}-usage", 'bookmark': "Usage"},
+            {'part': "answers", 'kind': "text", 'data': answers_to_print, 'title': f"test-{self.test_type}-{test_no}-answers", 'bookmark': "Answers"},
+        ]
+        self._write_manifest(location, test_no, sections)
+        renders = self._render_test_pdfs(test_no, sections)
+        
+        # Update test db
+        test_data = {'testtype': self.test_type, 
+                     'testno': test_no, 
+                     'words': words, 
+                     'location': location}
+        self.test_db_mgr.insert_test(test_data)
+        return renders
+
+    def _write_manifest(self, location, test_no, sections):
+        # Everything needed to re-render any part of the test, e.g. for GET /api/vocabtest/{type}/{no}/{part}.pdf
+        os.makedirs(os.path.dirname(location), exist_ok=True)
+        with open(location, "w", encoding="utf-8") as f:
+            json.dump({'testtype': self.test_type, 'testno': test_no, 'sections': sections}, f, ensure_ascii=False)
+
+    def _render_test_pdfs(self, test_no, sections):
+        if self.pdf_layout == "batch" and self._batch_booklet is not None:
+            # Rendered as one booklet when the generate_tests run finishes
+            self._batch_booklet.append({'title': f"test-{self.test_type}-{test_no}", 'sections': sections})
+            return []
+        if self.pdf_layout in ("booklet", "batch"):
+            booklet = [{'title': f"test-{self.test_type}-{test_no}", 'sections': sections}]
+            return [self.pdf_service.submit_booklet(booklet, os.path.join(self.test_loc, f"test-{self.test_type}-{test_no}-booklet.pdf"),
+                                                    title=f"test-{self.test_type}-{test_no}")]
+        return [self.pdf_service.submit(section['kind'], section['data'],
+                                        os.path.join(self.test_loc, f"test-{self.test_type}-{test_no}-{section['part']}.pdf"),
+                                        section['title'])
+                for section in sections]
+
+    def _render_batch_booklet(self):
+        booklet, self._batch_booklet = self._batch_booklet, None
+        if not booklet:
+            return
+        first, last = booklet[0]['title'], booklet[-1]['title'].rsplit("-", 1)[-1]
+        self._pending_renders.append(
+            self.pdf_service.submit_booklet(booklet, os.path.join(self.test_loc, f"{first}-{last}-booklet.pdf"), title=f"{first}-{last}"))
+
     def retrieve_vocab_cards(self, words):
-        vocab_cards = []
-        for word in words:
-            vocab_card = self.db_mgr.get_word(word)
-            vocab_cards.append(vocab_card)
-        return vocab_cards
+        return self.db_mgr.get_words(words)
+
+    def pick_distractors(self, words, count):
+        """
+        Up to count decoys for the usage word bank, taken in turn from each word's antonyms (then
+        antonyms of its synonyms) with one batched relations query; never a test word or a synonym of one.
+        """
+        if count <= 0:
+            return []
+        per_word = self.db_mgr.get_distractors(words, k=-(-count // max(1, len(words))))
+        decoys = []
+        for decoy in itertools.chain.from_iterable(itertools.zip_longest(*per_word.values())):
+            if decoy is not None and decoy not in decoys:
+                decoys.append(decoy)
+        return decoys[:count]
        
-    def generate_tests(self, num_to_pick=20):
-        self.words_for_test = self.db_mgr.get_all_words_for_test()
+    def generate_tests(self, num_to_pick=20, max_workers=None, progress_callback=None, should_stop=None):
+        """
+        Generate tests until every word has dropped below the points threshold.
+        With max_workers > 1 (default test_generation.max_workers in config.yaml) word sets are
+        reserved sequentially, questions for all tests are generated concurrently, and tests are
+        committed (points, DB row) strictly in test number order. PDFs render in the PDF worker
+        processes (pdf.workers) alongside generation and are waited for before returning.
+        progress_callback receives {tests_produced, words_remaining, tests_remaining} after each
+        committed test; should_stop is polled between tests and ends the run as "cancelled".
+        """
+        if max_workers is None:
+            max_workers = self.registry.config().get("test_generation", {}).get("max_workers", 1)
+        self._load_sampler()
+        self._pending_renders = []
+        self._batch_booklet = [] if self.pdf_layout == "batch" else None
+        if max_workers > 1:
+            result = self._generate_tests_pipelined(num_to_pick, max_workers, progress_callback, should_stop)
+        else:
+            result = self._generate_tests_sequential(num_to_pick, progress_callback, should_stop)
+        return self._wait_for_renders(result)
+
+    def _load_sampler(self):
+        # Points as stored now: every run starts from what earlier runs committed
+        self.sampler = WeightedWordSampler(self.db_mgr.get_all_words_for_test())
+        self.stop_criteria = False
+
+    def _wait_for_renders(self, result):
+        # PDFs render in worker processes while later tests are generated; collect them once at the end
+        self._render_batch_booklet()
+        renders, self._pending_renders = self._pending_renders, []
+        try:
+            PdfRenderService.wait_all(renders)
+        except Exception as e:
+            log.error(f"Error rendering test pdf", error=str(e))
+            if result['status'] == "success":
+                return {"status": "failed", "error": str(e)}
+        return result
+
+    def _generate_tests_sequential(self, num_to_pick, progress_callback=None, should_stop=None):
+        tests_produced = 0
         while not self.stop_criteria:
-            result = self.generate_vocab_test(num_to_pick=num_to_pick)
+            if should_stop and should_stop():
+                return {"status": "cancelled", "test_count": self._get_test_summary()['test_count']}
+            result = self.generate_vocab_test(num_to_pick=num_to_pick, wait_for_pdfs=False)
             #self.stop_criteria = True ## For testing purpose - uncomment this for testing purpose
             if result['status'] != "success":
                 log.error(f"Error generating vocab test", error=result['error'])
                 self.stop_criteria = True
                 return {"status": "failed", "error": result['error']}
+            tests_produced += 1
+            self._report_progress(progress_callback, tests_produced,
+                                  {'words_remaining': self.sampler.eligible_count,
+                                   'tests_remaining': self._estimate_tests_remaining(num_to_pick)})
         return {"status": "success", "test_count": result['test_count']}
     
+    def _generate_tests_pipelined(self, num_to_pick, max_workers, progress_callback=None, should_stop=None):
+        test_summary = self._get_test_summary()
+        test_count = test_summary['test_count']
+
+        # Reserve every word set up front, in order, exactly as the sequential loop would pick them
+        plans = []
+        test_no = test_summary['last_test']
+        while not self.stop_criteria:
+            test_no += 1
+            plans.append(self._reserve_test(test_no, num_to_pick))
+        log.info("Reserved word sets for tests", tests=len(plans), workers=max_workers)
+
+        self.test_generator  # build once here rather than racing to build it in the workers
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="testgen") as executor:
+            futures = [executor.submit(self._generate_questions, plan) for plan in plans]
+            for i, (plan, future) in enumerate(zip(plans, futures)):
+                if should_stop and should_stop():
+                    for pending in futures:
+                        pending.cancel()
+                    return {"status": "cancelled", "test_count": test_count}
+                try:
+                    self._pending_renders.extend(self._commit_test(plan, future.result()))
+                except Exception as e:
+                    # Later tests are dropped so points and test numbers stay consistent with what was committed
+                    for pending in futures:
+                        pending.cancel()
+                    log.error(f"Error generating vocab test", error=str(e), test_no=plan['test_no'])
+                    self.stop_criteria = True
+                    return {"status": "failed", "error": str(e)}
+                test_count += 1
+                self._report_progress(progress_callback, i + 1, plan, tests_remaining=len(plans) - i - 1)
+        return {"status": "success", "test_count": test_count}
+
     def generate_random_word_list(self, num_to_pick=20):
-        # Determine eligible items and their weights
-        weights = []
-        self.stop_criteria = True
-        for item in self.words_for_test:
-            if item['points'] >= 10:
-                weights.append(0.749)
-                self.stop_criteria = False
-            elif item['points'] == 5:
-                weights.append(0.25)
-                self.stop_criteria = False
-            else:  # item['points'] == 0
-                weights.append(0.001)
-        
-        # Pick num_to_pick distinct items
-        weights = np.array(weights)
-        weights_normalized = weights / weights.sum()
-        picked_indices = np.random.choice(
-            a=list(range(len(self.words_for_test))),
-            size=min(num_to_pick, len(self.words_for_test)),
-            replace=False,  # Ensure distinct items
-            p=weights_normalized
-            )
-        
-        # Ensure distinct items
-        picked_words = []
-        
-        # Reduce points by 5 for picked items
-        for item in list(set(picked_indices)):
-            self.words_for_test[item]['points'] = max(0, self.words_for_test[item]['points'] - 5)
-            picked_words.append(self.words_for_test[item])
+        # Stop once no word has points left to lose (judged before this pick, as before)
+        self.stop_criteria = self.sampler.stop_criteria
 
-        return picked_words
+        # Pick num_to_pick distinct words weighted by points, reducing their points by 5
+        return self.sampler.pick(num_to_pick)
         
     def retrieve_test(self):
         return self.test_db_mgr.get_all_tests(self.test_type)
@@ -149,9 +309,6 @@ class GenerateVocabTest:
                 "reset_words_points_for_test": reset_words_points_for_test, \
                 "reset_test": reset_test}
 
-    def close(self):
-        self.db_mgr.close()
-
 if __name__ == "__main__":
     test_case = 3
     if test_case == 1:
@@ -0,0 +1,222 @@
+import os
+import sys
+import json
+import time
+
+from pydantic import ValidationError
+
+from logger import GLOBAL_LOGGER as log
+from exception.custom_exception import CustomException
+from model.model import WordInfo
+from utils.config_loader import load_config
+from src.application.vocab_db_mgr import VocabDBManager
+
+# vocab column -> WordInfo field
+CARD_FIELDS = {field.lower(): field for field in WordInfo.model_fields}
+
+# Loads pre-enriched cards straight into the vocab table, without any LLM call
+class VocabImporter:
+    """
+    Reads cards from a JSONL file (one card per line) or a JSON file holding a list of cards
+    or an object of cards keyed by word (like data/sample_vocab.json). Files are decoded one
+    card at a time. WordInfo-style keys (Word, Meaning, ...) map to the vocab columns of the
+    same lower-cased name. Every card is validated against WordInfo; valid cards are written
+    in batches of batch_size, each batch one executemany transaction. Malformed JSON items are
+    reported as invalid and skipped like cards that fail validation. Words already in the DB
+    are skipped, never overwritten, so an interrupted import can simply be re-run.
+    """
+
+    MAX_REPORTED_ERRORS = 20
+
+    def __init__(self, db_mgr: VocabDBManager, batch_size=5000):
+        self.db_mgr = db_mgr
+        self.batch_size = batch_size
+
+    def import_file(self, path, critical=False) -> dict:
+        """Import every card in path; returns {'inserted', 'skipped', 'invalid', 'errors'}."""
+        report = {'inserted': 0, 'skipped': 0, 'invalid': 0, 'errors': []}
+        batch = []
+        try:
+            with open(path, encoding="utf-8") as f:
+                items = _iter_jsonl(f) if path.lower().endswith(".jsonl") else _JsonItemReader(f)
+                for position, item in items:
+                    if isinstance(item, json.JSONDecodeError):
+                        row, error = None, f"not valid JSON ({item.msg})"
+                    else:
+                        row, error = self.validate(item)
+                    if error:
+                        report['invalid'] += 1
+                        if len(report['errors']) < self.MAX_REPORTED_ERRORS:
+                            report['errors'].append(f"{position}: {error}")
+                        continue
+                    batch.append(row)
+                    if len(batch) >= self.batch_size:
+                        self._flush(batch, critical, report)
+                        batch = []
+            self._flush(batch, critical, report)
+        except CustomException:
+            raise
+        except Exception as e:
+            log.error("Error importing vocab file", path=path, error=str(e))
+            raise CustomException(f"Error importing vocab file {path}", e) from e
+        log.info("Vocab file imported", path=path, inserted=report['inserted'],
+                 skipped=report['skipped'], invalid=report['invalid'])
+        return report
+
+    @staticmethod
+    def validate(item):
+        """(vocab row, None) for a well-formed card, else (None, reason)."""
+        if not isinstance(item, dict):
+            return None, f"expected an object, got {type(item).__name__}"
+        fields = {str(key).strip().lower(): value for key, value in item.items()}
+        try:
+            card = WordInfo.model_validate({field: fields.get(column) for column, field in CARD_FIELDS.items()})
+        except ValidationError as e:
+            missing = [".".join(str(part) for part in error['loc']) for error in e.errors()]
+            return None, f"invalid or missing fields: {', '.join(missing)}"
+        row = {column: getattr(card, field).strip() for column, field in CARD_FIELDS.items()}
+        if not row['word'] or row['word'] == 'None':
+            return None, "empty word"
+        return row, None
+
+    def _flush(self, batch, critical, report):
+        if not batch:
+            return
+        # Rows for words already present (or repeated in the file) are ignored by the insert
+        written = self.db_mgr.insert_words(batch, critical, overwrite=False)
+        report['inserted'] += written
+        report['skipped'] += len(batch) - written
+
+
+def _iter_jsonl(f):
+    for line_no, line in enumerate(f, start=1):
+        if not line.strip():
+            continue
+        try:
+            yield f"line {line_no}", json.loads(line)
+        except json.JSONDecodeError as e:
+            yield f"line {line_no}", e
+
+
+class _JsonItemReader:
+    # Incremental reader for the items of a top-level JSON list, or the values of a top-level object
+    def __init__(self, f, read_size=1 << 16):
+        self.f = f
+        self.read_size = read_size
+        self.decoder = json.JSONDecoder()
+        self.buffer = ""
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self):
+        data = self.f.read(self.read_size)
+        self.eof = not data
+        self.buffer = self.buffer[self.pos:] + data
+        self.pos = 0
+
+    def _skip(self, chars=""):
+        # Step over whitespace and any of chars, reading more input as needed
+        while True:
+            while self.pos < len(self.buffer) and (self.buffer[self.pos].isspace() or self.buffer[self.pos] in chars):
+                self.pos += 1
+            if self.pos < len(self.buffer) or self.eof:
+                return
+            self._fill()
+
+    def _peek(self):
+        return self.buffer[self.pos:self.pos + 1]
+
+    def _item_end(self):
+        # Index of the "," or closing bracket ending the value at self.pos (outside strings and nested
+        # values), reading only as far as that
+        depth, in_string, escaped, offset = 0, False, False, 0
+        while True:
+            for i in range(self.pos + offset, len(self.buffer)):
+                ch = self.buffer[i]
+                if in_string:
+                    if escaped:
+                        escaped = False
+                    elif ch == "\\":
+                        escaped = True
+                    elif ch == '"':
+                        in_string = False
+                elif ch == '"':
+                    in_string = True
+                elif ch in "[{":
+                    depth += 1
+                elif ch in "]}":
+                    if depth == 0:
+                        return i
+                    depth -= 1
+                elif ch == "," and depth == 0:
+                    return i
+            offset = len(self.buffer) - self.pos
+            if self.eof:
+                return len(self.buffer)
+            self._fill()
+
+    def _decode(self):
+        """The next value, or its JSONDecodeError when malformed (the reader then continues after it)."""
+        try:
+            value, end = self.decoder.raw_decode(self.buffer, self.pos)
+            # Complete only once something follows it, so a value at the buffer's end is never cut short
+            if end < len(self.buffer) or self.eof:
+                self.pos = end
+                return value
+        except json.JSONDecodeError:
+            pass
+        # Cut short by the buffer, or malformed: decode exactly up to where the value ends
+        end = self._item_end()
+        text, self.pos = self.buffer[self.pos:end], end
+        try:
+            return json.loads(text)
+        except json.JSONDecodeError as e:
+            return e
+
+    def __iter__(self):
+        self._skip()
+        opener = self._peek()
+        if opener not in ("[", "{"):
+            raise CustomException("JSON import file must hold a list or an object of cards", sys)
+        self.pos += 1
+        closer = "]" if opener == "[" else "}"
+        position = 0
+        while True:
+            self._skip(",")
+            if self._peek() in (closer, ""):
+                return
+            position += 1
+            if opener == "[":
+                yield f"item {position}", self._decode()
+                continue
+            key = self._decode()
+            if isinstance(key, json.JSONDecodeError):
+                yield f"entry {position}", key
+                continue
+            self._skip(":")
+            value = self._decode()
+            # An object keyed by word may leave the word out of the card itself
+            if isinstance(value, dict) and not any(str(k).strip().lower() == "word" for k in value):
+                value = {"word": key, **value}
+            yield f"entry {key!r}", value
+
+
+# Seed a vocab database from pre-enriched cards
+# python test.py src/application/import_vocab.py data/sample_vocab.json [data/vocab_11plus.db]
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print(f"Usage: {sys.argv[0]} <cards.json|cards.jsonl> [db_path]")
+        sys.exit(1)
+    import_path = sys.argv[1]
+    db_path = sys.argv[2] if len(sys.argv) > 2 else os.path.join("data","vocab_11plus.db")
+    if not os.path.exists(import_path):
+        print(f"Error: file not found: {import_path}")
+        sys.exit(1)
+    start = time.perf_counter()
+    batch_size = load_config().get("ingestion", {}).get("import_batch_size", 5000)
+    vocab_db_mgr = VocabDBManager(db_path=db_path)
+    report = VocabImporter(vocab_db_mgr, batch_size=batch_size).import_file(import_path)
+    vocab_db_mgr.close()
+    print(json.dumps(report, indent=2))
+    print(f"Elapsed : {time.perf_counter() - start:.2f}s")
+    sys.exit(0 if not report['invalid'] else 2)
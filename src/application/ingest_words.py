@@ -1,64 +1,181 @@
 from src.application.word_definition import vocab_enhancer
 from src.application.vocab_db_mgr import VocabDBManager
+from src.application.registry import get_registry
 import os
 import json
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 
 from logger import GLOBAL_LOGGER as log
+from utils.metrics import INGEST_WORDS
 from exception.custom_exception import CustomException
 
 class IngestWords:
-    def __init__(self):
-        self.vocab_enhancer = vocab_enhancer()
-        self.db_mgr = VocabDBManager(db_path=os.path.join("data","vocab_11plus.db"))
+    def __init__(self, registry=None):
+        self.registry = registry or get_registry()
+        self.db_mgr = self.registry.vocab_db()
+        self._vocab_enhancer = None
+        self.typo_config = self.registry.config().get("ingestion", {}).get("typo_check", {})
+
+    @property
+    def vocab_enhancer(self):
+        # Built on first enrichment so read-only callers never touch the LLM
+        if self._vocab_enhancer is None:
+            self._vocab_enhancer = vocab_enhancer(registry=self.registry)
+        return self._vocab_enhancer
         
   
-    def ingest_word(self, word, critical=False):
+    def ingest_word(self, word, critical=False, allow_typos=False):
+        result = self._ingest_word(word, critical, allow_typos)
+        INGEST_WORDS.inc(1, result[word])
+        return result
+
+    def _ingest_word(self, word, critical=False, allow_typos=False):
         try:
             # Check if word already exists
-            existing = self.db_mgr.get_word(word.lower())
-            if existing and not critical :
-                log.info(f"Word '{word}' already exists in DB. Skipping.")
-                return {word: "exists"}
-            elif existing and critical :
-                word_info = [{'word': word, 'points': 15}]
-                self.db_mgr.updated_words_points_for_test(word_info)
-                log.info(f"Word '{word}' already exists in DB. Updating points to 15.")
-                return {word: "points_updated"}
+            status = self._check_existing(word, critical)
+            if status:
+                return {word: status}
+
+            if not allow_typos and self.typo_suggestions(word):
+                return {word: "suspected_typo"}
 
             # Enhance with LLM
             enhanced_info = self.vocab_enhancer.enhance_word_info(word)
-            log.info(f"Enhanced info for '{word}': {enhanced_info}")
-            if not enhanced_info or 'word' not in enhanced_info or not enhanced_info['word']:
-                log.error(f"Enhanced info for '{word}' is invalid: {enhanced_info}")
-                return {word: "failed"}
-            
+            return {word: self._store_enhanced(word, enhanced_info, critical)}
+
+        except Exception as e:
+            log.error(f"Error ingesting word '{word}'", error=str(e))
+            return {word: "failed"}
+
+    def _check_existing(self, word, critical=False):
+        """Return 'exists'/'points_updated' for a word already in the DB, None if it needs enrichment."""
+        existing = self.db_mgr.get_word(word.lower())
+        if existing and not critical :
+            log.info(f"Word '{word}' already exists in DB. Skipping.")
+            return "exists"
+        elif existing and critical :
+            word_info = [{'word': word, 'points': 15}]
+            self.db_mgr.updated_words_points_for_test(word_info)
+            log.info(f"Word '{word}' already exists in DB. Updating points to 15.")
+            return "points_updated"
+        return None
+
+    def typo_suggestions(self, word):
+        """
+        Known words a new word is probably a misspelling of, or [] if it looks genuine.
+        Only words of at least typo_check.min_length letters are checked; shorter real words are
+        too often one edit away from another real word.
+        """
+        if not self.typo_config.get("enabled", False) or len(word) < self.typo_config.get("min_length", 6):
+            return []
+        return [suggestion['word'] for suggestion in
+                self.db_mgr.suggest(word.lower(), k=3, max_distance=self.typo_config.get("max_distance", 1))]
+
+    def _is_valid_enhanced(self, word, enhanced_info):
+        log.info(f"Enhanced info for '{word}': {enhanced_info}")
+        if not enhanced_info or 'word' not in enhanced_info or not enhanced_info['word'] \
+                or enhanced_info['word'] == 'None':
+            log.error(f"Enhanced info for '{word}' is invalid: {enhanced_info}")
+            return False
+        return True
+
+    def _store_enhanced(self, word, enhanced_info, critical=False):
+        try:
+            if not self._is_valid_enhanced(word, enhanced_info):
+                return "failed"
 
             # Insert into DB
             self.db_mgr.insert_word(enhanced_info, critical)
             log.info(f"Inserted word '{word}' into DB.")
-            return {word: "inserted"}
-
+            return "inserted"
         except Exception as e:
             log.error(f"Error ingesting word '{word}'", error=str(e))
-            return {word: "failed"}
-        
-    def ingest_wordlist(self, wordlist, critical=False):
+            return "failed"
+
+    def _ingest_batch(self, batch, critical=False):
+        # One LLM call enriches the whole batch; stragglers are retried per word by the enhancer
+        try:
+            word_infos = self.vocab_enhancer.enhance_word_infos(batch)
+        except Exception as e:
+            log.error(f"Error enhancing batch {batch}", error=str(e))
+            word_infos = {}
+        batch_status = {word: "failed" for word in batch}
+        valid = {word: word_infos[word] for word in batch if self._is_valid_enhanced(word, word_infos.get(word))}
+        if not valid:
+            return batch_status
+
+        # Flush the whole batch in one transaction; fall back to row by row to isolate a bad row
+        try:
+            self.db_mgr.insert_words(list(valid.values()), critical)
+            log.info(f"Inserted {len(valid)} words into DB.", words=list(valid))
+            batch_status.update({word: "inserted" for word in valid})
+        except Exception as e:
+            log.error(f"Batch insert failed, inserting row by row", error=str(e))
+            batch_status.update({word: self._store_enhanced(word, info, critical) for word, info in valid.items()})
+        return batch_status
+
+    def ingest_wordlist(self, wordlist, critical=False, max_concurrency=None, allow_typos=False):
+        """
+        Ingest a list of words. Words already in the DB are resolved first, the rest are enriched
+        in multi-word batches with up to max_concurrency batches in flight.
+        max_concurrency defaults to ingestion.max_concurrency in config.yaml; 1 runs sequentially.
+        Unknown words one edit away from a known word are reported as 'suspected_typo' without an
+        LLM call unless allow_typos is set.
+        The returned status map is identical to a sequential run.
+        """
+        if max_concurrency is None:
+            max_concurrency = self.registry.config().get("ingestion", {}).get("max_concurrency", 1)
+        words = [word.lower() for word in wordlist]
+
+        # Each distinct word is ingested once; repeats are resolved the way a sequential run would
+        unique_words = list(dict.fromkeys(words))
+        first_status = {}
+        to_enrich = []
+        for word in unique_words:
+            try:
+                status = self._check_existing(word, critical)
+            except Exception as e:
+                log.error(f"Error ingesting word '{word}'", error=str(e))
+                status = "failed"
+            if not status and not allow_typos and self.typo_suggestions(word):
+                status = "suspected_typo"
+            if status:
+                first_status[word] = status
+            else:
+                to_enrich.append(word)
+
+        if to_enrich:
+            batches = self.vocab_enhancer.make_batches(to_enrich)
+            if max_concurrency <= 1 or len(batches) <= 1:
+                results = [self._ingest_batch(batch, critical) for batch in batches]
+            else:
+                with ThreadPoolExecutor(max_workers=min(max_concurrency, len(batches)),
+                                        thread_name_prefix="ingest") as executor:
+                    results = list(executor.map(lambda batch: self._ingest_batch(batch, critical), batches))
+            for batch_status in results:
+                first_status.update(batch_status)
+
         ingest_counter = defaultdict(list)
-        for word in wordlist:
-            word = word.lower()
-            status = self.ingest_word(word, critical)
-            ingest_counter[status[word]].append(word)
+        seen = set()
+        for word in words:
+            if word not in seen:
+                seen.add(word)
+                status = first_status[word]
+            elif first_status[word] in ("failed", "suspected_typo"):
+                status = first_status[word]
+            else:
+                status = "points_updated" if critical else "exists"
+            ingest_counter[status].append(word)
+        for status, status_words in ingest_counter.items():
+            INGEST_WORDS.inc(len(status_words), status)
         return dict(ingest_counter)
 
-    def retrieve_all_words(self):
-        return self.db_mgr.get_all_words()
+    def retrieve_all_words(self, version=None):
+        return self.db_mgr.get_all_words(version=version)
     
-    def retrieve_word(self, word):
-        return self.db_mgr.get_word(word.lower())
-
-    def close(self):
-        self.db_mgr.close()
+    def retrieve_word(self, word, version=None):
+        return self.db_mgr.get_word(word.lower(), version=version)
 
 if __name__ == "__main__":
     words = ["belligerent","candid"]
@@ -75,6 +192,4 @@ if __name__ == "__main__":
     # Export to CSV
     ingestor.db_mgr.export_to_csv("data/vocab_11plus_export.csv")
     print("Exported vocab to data/vocab_11plus_export.csv")
-
-    ingestor.close()
     
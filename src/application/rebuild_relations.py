@@ -0,0 +1,25 @@
+import os
+import sys
+import time
+
+from logger import GLOBAL_LOGGER as log
+from src.application.vocab_db_mgr import VocabDBManager
+
+# Re-derive the word_relation synonym/antonym graph of a vocab database from its cards
+# python test.py src/application/rebuild_relations.py [data/vocab_11plus.db]
+def rebuild(db_path):
+    start = time.perf_counter()
+    # Opening the manager creates and backfills word_relation on databases that predate it
+    vocab_db_mgr = VocabDBManager(db_path=db_path)
+    relations = vocab_db_mgr.rebuild_relations()
+    vocab_db_mgr.close()
+    log.info("Word relations rebuilt", db_path=db_path, relations=relations,
+             elapsed_ms=round((time.perf_counter() - start) * 1000, 2))
+    return relations
+
+if __name__ == "__main__":
+    db_path = sys.argv[1] if len(sys.argv) > 1 else os.path.join("data","vocab_11plus.db")
+    if not os.path.exists(db_path):
+        print(f"Error: database not found: {db_path}")
+        sys.exit(1)
+    rebuild(db_path)
@@ -0,0 +1,31 @@
+import os
+import sys
+import time
+
+from logger import GLOBAL_LOGGER as log
+from src.application.vocab_db_mgr import VocabDBManager
+
+# Rebuild the vocab_fts full-text index of a vocab database
+# python test.py src/application/rebuild_search_index.py [data/vocab_11plus.db]
+def rebuild(db_path):
+    start = time.perf_counter()
+    # Opening the manager creates vocab_fts and its triggers on databases that predate them
+    vocab_db_mgr = VocabDBManager(db_path=db_path)
+    if not vocab_db_mgr.search_enabled:
+        log.error("FTS5 is not available in this SQLite build", db_path=db_path)
+        return False
+    if not vocab_db_mgr.search_index_created:
+        # A freshly created index was already filled from every row
+        vocab_db_mgr.rebuild_search_index()
+    indexed = vocab_db_mgr.db.query_fetch("SELECT count(*) AS n FROM vocab;")['n']
+    vocab_db_mgr.close()
+    log.info("Search index rebuilt", db_path=db_path, words=indexed,
+             elapsed_ms=round((time.perf_counter() - start) * 1000, 2))
+    return True
+
+if __name__ == "__main__":
+    db_path = sys.argv[1] if len(sys.argv) > 1 else os.path.join("data","vocab_11plus.db")
+    if not os.path.exists(db_path):
+        print(f"Error: database not found: {db_path}")
+        sys.exit(1)
+    sys.exit(0 if rebuild(db_path) else 1)
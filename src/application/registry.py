@@ -0,0 +1,237 @@
+import os
+import sys
+import time
+import threading
+
+from langchain_core.output_parsers import JsonOutputParser
+
+from logger import GLOBAL_LOGGER as log
+from exception.custom_exception import CustomException
+from prompt.prompt_library import PROMPT_REGISTRY
+from model.model import WordInfo, WordInfoList, Test1, PromptType
+from utils.model_loader import ModelLoader
+from utils.config_loader import load_config
+from utils.llm_cache import LLMResponseCache, CachedChain
+from utils.llm_metrics import LLMMetricsCallback
+from src.application.vocab_db_mgr import VocabDBManager
+from src.application.test_db_mgr import TestDBManager
+from src.application.test_job_db_mgr import TestJobDBManager
+from utils.db_manager import close_pool
+from utils.pdf_printer import PdfRenderService
+from utils.embeddings import HashedNgramEmbeddings
+
+VOCAB_DB_PATH = os.path.join("data","vocab_11plus.db")
+TESTSET_DB_PATH = os.path.join("data","vocab_testset.db")
+
+# Process-wide registry of LLM clients, chains, parsers and DB managers
+class ModelRegistry:
+    """
+    Lazily builds and caches the expensive objects shared by IngestWords, GenerateVocabTest
+    and test_generator. Nothing is created until first use (or warm_up), and every object
+    is created at most once per process.
+    """
+
+    def __init__(self, vocab_db_path=VOCAB_DB_PATH, testset_db_path=TESTSET_DB_PATH):
+        self.vocab_db_path = vocab_db_path
+        self.testset_db_path = testset_db_path
+        self._lock = threading.RLock()
+        self._config = None
+        self._loader = None
+        self._llm = None
+        self._embeddings = None
+        self._parsers = {}
+        self._chains = {}
+        self._llm_cache = None
+        self._vocab_db = None
+        self._test_db = None
+        self._job_db = None
+        self._pdf_service = None
+
+    def config(self) -> dict:
+        with self._lock:
+            if self._config is None:
+                self._config = load_config()
+            return self._config
+
+    def llm_config(self) -> dict:
+        """Config block of the active LLM provider (same LLM_PROVIDER resolution as ModelLoader)."""
+        provider_key = os.getenv("LLM_PROVIDER", "google")
+        return self.config().get("llm", {}).get(provider_key, {})
+
+    def loader(self) -> ModelLoader:
+        with self._lock:
+            if self._loader is None:
+                self._loader = ModelLoader()
+            return self._loader
+
+    def llm(self):
+        with self._lock:
+            if self._llm is None:
+                self._llm = self.loader().load_llm()
+            return self._llm
+
+    def embedding_config(self) -> dict:
+        """embedding_model config block, with EMBEDDING_PROVIDER overriding its provider."""
+        embedding_config = dict(self.config().get("embedding_model", {}))
+        embedding_config["provider"] = os.getenv("EMBEDDING_PROVIDER", embedding_config.get("provider", "google"))
+        return embedding_config
+
+    def embedding_model_id(self) -> str:
+        # Identifies the vector space, so stored vectors from another model are never mixed in
+        embedding_config = self.embedding_config()
+        if embedding_config["provider"] == "hashed":
+            return f"hashed:{embedding_config.get('dimensions', 256)}"
+        return f"{embedding_config['provider']}:{embedding_config.get('model_name')}"
+
+    def embeddings(self):
+        with self._lock:
+            if self._embeddings is None:
+                embedding_config = self.embedding_config()
+                if embedding_config["provider"] == "hashed":
+                    # Local backend: no API keys needed, so ModelLoader isn't involved
+                    self._embeddings = HashedNgramEmbeddings(dimensions=embedding_config.get("dimensions", 256))
+                else:
+                    self._embeddings = self.loader().load_embeddings()
+                log.info("Embeddings loaded", model=self.embedding_model_id())
+            return self._embeddings
+
+    def parser(self, pydantic_object) -> JsonOutputParser:
+        with self._lock:
+            if pydantic_object not in self._parsers:
+                self._parsers[pydantic_object] = JsonOutputParser(pydantic_object=pydantic_object)
+            return self._parsers[pydantic_object]
+
+    def llm_cache(self) -> LLMResponseCache | None:
+        """Shared LLM response cache, or None when llm_cache.enabled is false."""
+        with self._lock:
+            cache_config = self.config().get("llm_cache", {})
+            if self._llm_cache is None and cache_config.get("enabled", False):
+                self._llm_cache = LLMResponseCache(
+                    db_path=cache_config.get("db_path", os.path.join("data","llm_cache.db")),
+                    max_entries=cache_config.get("max_entries", 20000),
+                    max_age_days=cache_config.get("max_age_days", 90))
+            return self._llm_cache
+
+    def chain(self, prompt_type: PromptType, pydantic_object):
+        key = (prompt_type, pydantic_object)
+        with self._lock:
+            if key not in self._chains:
+                prompt = PROMPT_REGISTRY[prompt_type]
+                # Times every real model call (cache hits never reach it) under this chain's labels
+                metrics = LLMMetricsCallback(self.llm_config().get("provider", "unknown"), PromptType(prompt_type).value)
+                chain = prompt | self.llm().with_config(callbacks=[metrics]) | self.parser(pydantic_object)
+                cache = self.llm_cache()
+                if cache is not None:
+                    bypass = self.config().get("llm_cache", {}).get("bypass", False) \
+                        or os.getenv("LLM_CACHE_BYPASS", "0").lower() in ("1", "true", "yes")
+                    chain = CachedChain(chain, cache, prompt, prompt_type, self.llm_config(), bypass=bypass)
+                self._chains[key] = chain
+                log.info("Chain registered", prompt_type=str(prompt_type), model=pydantic_object.__name__)
+            return self._chains[key]
+
+    def _pool_options(self) -> dict:
+        db_config = self.config().get("database", {})
+        return {"pooled": True,
+                "pool_size": db_config.get("pool_size", 8),
+                "pool_timeout": db_config.get("pool_timeout", 30.0)}
+
+    def vocab_db(self) -> VocabDBManager:
+        with self._lock:
+            if self._vocab_db is None:
+                cache_config = self.config().get("vocab_cache", {})
+                self._vocab_db = VocabDBManager(db_path=self.vocab_db_path, **self._pool_options(),
+                                                cache_entries=cache_config.get("max_entries", 0),
+                                                cache_max_mb=cache_config.get("max_mb", 16))
+            return self._vocab_db
+
+    def test_db(self) -> TestDBManager:
+        with self._lock:
+            if self._test_db is None:
+                self._test_db = TestDBManager(db_path=self.testset_db_path, **self._pool_options())
+            return self._test_db
+
+    def job_db(self) -> TestJobDBManager:
+        with self._lock:
+            if self._job_db is None:
+                self._job_db = TestJobDBManager(db_path=self.testset_db_path, **self._pool_options())
+            return self._job_db
+
+    def pdf_service(self) -> PdfRenderService:
+        with self._lock:
+            if self._pdf_service is None:
+                self._pdf_service = PdfRenderService(workers=self.config().get("pdf", {}).get("workers"))
+            return self._pdf_service
+
+    def warm_up(self) -> dict:
+        """
+        Build DB managers, LLM client, chains and PDF workers up front.
+        Returns per-stage timings in milliseconds. A failure to build the LLM (e.g. missing
+        API keys) is logged but doesn't stop the DB managers from being usable.
+        """
+        timings = {}
+        start = time.perf_counter()
+
+        stage = time.perf_counter()
+        self.vocab_db()
+        self.test_db()
+        self.job_db()
+        timings["db_ms"] = round((time.perf_counter() - stage) * 1000, 2)
+
+        stage = time.perf_counter()
+        try:
+            self.chain(PromptType.RETRIEVE_VOCABINFO, WordInfo)
+            self.chain(PromptType.RETRIEVE_VOCABINFO_BATCH, WordInfoList)
+            self.chain(PromptType.TEST_VOCAB_TYPE1, Test1)
+            timings["llm_ms"] = round((time.perf_counter() - stage) * 1000, 2)
+        except Exception as e:
+            log.error("LLM warm-up failed, chains will be built on first use", error=str(e))
+            timings["llm_ms"] = None
+
+        stage = time.perf_counter()
+        self.pdf_service().warm_up()
+        timings["pdf_ms"] = round((time.perf_counter() - stage) * 1000, 2)
+
+        timings["total_ms"] = round((time.perf_counter() - start) * 1000, 2)
+        return timings
+
+    def close(self):
+        with self._lock:
+            try:
+                if self._vocab_db is not None:
+                    self._vocab_db.close()
+                    close_pool(self.vocab_db_path)
+                if self._test_db is not None or self._job_db is not None:
+                    close_pool(self.testset_db_path)
+                if self._llm_cache is not None:
+                    self._llm_cache.close()
+                if self._pdf_service is not None:
+                    self._pdf_service.shutdown()
+            except Exception as e:
+                log.error("Error closing registry DB managers", error=str(e))
+                raise CustomException("Error closing registry DB managers", sys)
+            finally:
+                self._vocab_db = None
+                self._test_db = None
+                self._job_db = None
+                self._llm_cache = None
+                self._pdf_service = None
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+def get_registry() -> ModelRegistry:
+    """Return the process-wide registry, creating it on first call."""
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = ModelRegistry()
+    return _registry
+
+
+if __name__ == "__main__":
+    registry = get_registry()
+    print("warm up timings : {}".format(registry.warm_up()))
+    print("words : {}".format(len(registry.vocab_db().get_all_words())))
+    registry.close()
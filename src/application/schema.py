@@ -0,0 +1,219 @@
+from utils.db_manager import Migration
+
+# Schema of the SQLite files, as ordered migrations recorded in each file's PRAGMA user_version.
+# Never edit a released migration: append a new one. Version 1 is the original schema, written
+# with IF NOT EXISTS so files created before migrations existed (user_version 0) pass through it.
+
+VOCAB_TABLE = """
+CREATE TABLE IF NOT EXISTS vocab (
+    word TEXT UNIQUE NOT NULL PRIMARY KEY COLLATE NOCASE,
+    meaning TEXT,
+    usage TEXT,
+    etymology TEXT,
+    word_break TEXT,
+    picture TEXT,
+    did_you_know_facts TEXT,
+    synonyms TEXT,
+    antonyms TEXT,
+    additional_facts TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    points INTEGER DEFAULT 10
+);
+"""
+
+VOCAB_TESTSET_TABLE = """
+CREATE TABLE IF NOT EXISTS vocab_testset (
+    testtype INTEGER NOT NULL,
+    testno INTEGER NOT NULL,
+    words TEXT NOT NULL,
+    location TEXT NOT NULL,
+    PRIMARY KEY (testtype,testno)
+);
+"""
+
+VOCAB_TESTJOB_TABLE = """
+CREATE TABLE IF NOT EXISTS vocab_testjob (
+    job_id TEXT PRIMARY KEY,
+    testtype INTEGER NOT NULL,
+    num_to_pick INTEGER NOT NULL,
+    status TEXT NOT NULL,
+    tests_produced INTEGER DEFAULT 0,
+    test_count INTEGER,
+    words_remaining INTEGER,
+    eta_seconds REAL,
+    error TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+"""
+
+# Change counter of the vocab file, read by every process for cache versions, ETags and Last-Modified.
+# epoch is random per file so a recreated file never reuses an old version string.
+VOCAB_META_TABLE = """
+CREATE TABLE IF NOT EXISTS vocab_meta (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    epoch TEXT NOT NULL,
+    version INTEGER NOT NULL DEFAULT 0,
+    modified_at TEXT NOT NULL DEFAULT (strftime('%Y-%m-%dT%H:%M:%SZ', 'now'))
+);
+"""
+
+# Bumps the change counter; run by the vocab triggers and by writes triggers can't see (FTS rebuild)
+VOCAB_META_BUMP = "UPDATE vocab_meta SET version = version + 1, modified_at = strftime('%Y-%m-%dT%H:%M:%SZ', 'now') WHERE id = 1;"
+
+VOCAB_META_TRIGGERS = tuple(
+    f"CREATE TRIGGER IF NOT EXISTS vocab_meta_{event.lower()} AFTER {event} ON vocab BEGIN {VOCAB_META_BUMP} END;"
+    for event in ("INSERT", "UPDATE", "DELETE"))
+
+# Card columns: every vocab column but points, which changes with each generated test. No cached
+# read depends on points, so only updates of these bump the vocab_meta version.
+VOCAB_CARD_COLUMNS = ("word", "meaning", "usage", "etymology", "word_break", "picture", "did_you_know_facts",
+                      "synonyms", "antonyms", "additional_facts", "created_at")
+
+VOCAB_META_CARD_UPDATE_TRIGGER = (f"CREATE TRIGGER IF NOT EXISTS vocab_meta_update AFTER UPDATE OF {', '.join(VOCAB_CARD_COLUMNS)} "
+                                  f"ON vocab BEGIN {VOCAB_META_BUMP} END;")
+
+# Last change sequence per word for the fields a similarity card embeds (word, meaning, synonyms),
+# so VocabSimilarityIndex re-embeds overwritten cards whichever process wrote them
+VOCAB_CHANGE_TABLE = """
+CREATE TABLE IF NOT EXISTS vocab_change (
+    word TEXT PRIMARY KEY COLLATE NOCASE,
+    seq INTEGER NOT NULL
+);
+"""
+
+_VOCAB_CHANGE_RECORD = ("INSERT OR REPLACE INTO vocab_change (word, seq) "
+                        "VALUES (new.word, (SELECT coalesce(max(seq), 0) + 1 FROM vocab_change));")
+
+VOCAB_CHANGE_TRIGGERS = (
+    f"CREATE TRIGGER IF NOT EXISTS vocab_change_insert AFTER INSERT ON vocab BEGIN {_VOCAB_CHANGE_RECORD} END;",
+    f"CREATE TRIGGER IF NOT EXISTS vocab_change_update AFTER UPDATE OF word, meaning, synonyms ON vocab "
+    f"BEGIN {_VOCAB_CHANGE_RECORD} END;",
+)
+
+# The statement firing a trigger imposes its conflict policy on the trigger body, so OR REPLACE
+# above fails under an upsert of an existing card; an upsert here holds under any outer policy
+_VOCAB_CHANGE_UPSERT = ("INSERT INTO vocab_change (word, seq) "
+                        "VALUES (new.word, (SELECT coalesce(max(seq), 0) + 1 FROM vocab_change)) "
+                        "ON CONFLICT (word) DO UPDATE SET seq = excluded.seq;")
+
+VOCAB_CHANGE_UPSERT_TRIGGERS = (
+    "DROP TRIGGER IF EXISTS vocab_change_insert;",
+    "DROP TRIGGER IF EXISTS vocab_change_update;",
+    f"CREATE TRIGGER IF NOT EXISTS vocab_change_insert AFTER INSERT ON vocab BEGIN {_VOCAB_CHANGE_UPSERT} END;",
+    f"CREATE TRIGGER IF NOT EXISTS vocab_change_update AFTER UPDATE OF word, meaning, synonyms ON vocab "
+    f"BEGIN {_VOCAB_CHANGE_UPSERT} END;",
+)
+
+# Full-text index of the card fields, with their bm25 weights, as an external-content FTS5 table
+# keyed on vocab.id: an implicit rowid may be renumbered by VACUUM, an INTEGER PRIMARY KEY never is
+SEARCH_COLUMNS = {'word': 10.0, 'meaning': 2.0, 'usage': 1.0, 'synonyms': 3.0, 'antonyms': 1.0}
+
+def search_index_statements() -> tuple:
+    """vocab_fts and the triggers that keep it in step with vocab."""
+    columns = ', '.join(SEARCH_COLUMNS)
+    new_values = ', '.join(f"new.{col}" for col in SEARCH_COLUMNS)
+    old_values = ', '.join(f"old.{col}" for col in SEARCH_COLUMNS)
+    return (f"""CREATE VIRTUAL TABLE IF NOT EXISTS vocab_fts USING fts5(
+                {columns}, content='vocab', content_rowid='id',
+                tokenize='unicode61 remove_diacritics 2', prefix='2 3');""",
+            f"""CREATE TRIGGER IF NOT EXISTS vocab_fts_insert AFTER INSERT ON vocab BEGIN
+                INSERT INTO vocab_fts (rowid, {columns}) VALUES (new.id, {new_values});
+                END;""",
+            f"""CREATE TRIGGER IF NOT EXISTS vocab_fts_delete AFTER DELETE ON vocab BEGIN
+                INSERT INTO vocab_fts (vocab_fts, rowid, {columns}) VALUES ('delete', old.id, {old_values});
+                END;""",
+            # Only content columns: points updates during test generation leave the index alone
+            f"""CREATE TRIGGER IF NOT EXISTS vocab_fts_update AFTER UPDATE OF {columns} ON vocab BEGIN
+                INSERT INTO vocab_fts (vocab_fts, rowid, {columns}) VALUES ('delete', old.id, {old_values});
+                INSERT INTO vocab_fts (rowid, {columns}) VALUES (new.id, {new_values});
+                END;""")
+
+SEARCH_INDEX_REBUILD = "INSERT INTO vocab_fts (vocab_fts) VALUES ('rebuild');"
+
+def _fts5_available(conn) -> bool:
+    return bool(conn.execute("SELECT sqlite_compileoption_used('ENABLE_FTS5');").fetchone()[0])
+
+def _rekey_search_index(conn):
+    # Without FTS5 there is no vocab_fts to move; VocabDBManager then runs with search disabled
+    if not _fts5_available(conn):
+        return
+    conn.execute("DROP TABLE IF EXISTS vocab_fts;")
+    for statement in search_index_statements():
+        conn.execute(statement)
+    conn.execute(SEARCH_INDEX_REBUILD)
+
+VOCAB_WITH_ID_TABLE = """
+CREATE TABLE vocab_with_id (
+    id INTEGER PRIMARY KEY,
+    word TEXT UNIQUE NOT NULL COLLATE NOCASE,
+    meaning TEXT,
+    usage TEXT,
+    etymology TEXT,
+    word_break TEXT,
+    picture TEXT,
+    did_you_know_facts TEXT,
+    synonyms TEXT,
+    antonyms TEXT,
+    additional_facts TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    points INTEGER DEFAULT 10
+);
+"""
+
+_VOCAB_ROW_COLUMNS = ', '.join((*VOCAB_CARD_COLUMNS, "points"))
+
+VOCAB_INDEXES = (
+    "CREATE INDEX IF NOT EXISTS idx_vocab_word_points ON vocab (word, points);",
+    "CREATE INDEX IF NOT EXISTS idx_vocab_points ON vocab (points, word);",
+    "CREATE INDEX IF NOT EXISTS idx_vocab_created_at ON vocab (created_at);",
+)
+
+# Copying into a new table drops vocab's indexes and triggers with the old table, so all are
+# recreated here. Existing rowids are kept as ids, and vocab_fts is rebuilt on them in the same
+# transaction, so no process ever sees the index pointing at other cards.
+VOCAB_ADD_ID = (
+    VOCAB_WITH_ID_TABLE,
+    f"INSERT INTO vocab_with_id (id, {_VOCAB_ROW_COLUMNS}) SELECT rowid, {_VOCAB_ROW_COLUMNS} FROM vocab ORDER BY rowid;",
+    "DROP TABLE vocab;",
+    "ALTER TABLE vocab_with_id RENAME TO vocab;",
+    *VOCAB_INDEXES,
+    VOCAB_META_TRIGGERS[0], VOCAB_META_CARD_UPDATE_TRIGGER, VOCAB_META_TRIGGERS[2],
+    *VOCAB_CHANGE_UPSERT_TRIGGERS,
+    _rekey_search_index,
+    VOCAB_META_BUMP,
+)
+
+# data/vocab_*.db. word_relation is built (and backfilled) by VocabDBManager, and so is vocab_fts
+# on files where it is missing; it can fall back when FTS5 is unavailable.
+VOCAB_MIGRATIONS = [
+    Migration(1, "vocab table", (VOCAB_TABLE,)),
+    # get_all_words_for_test reads only (word, points): scanning this index skips the card text
+    Migration(2, "covering index for test word selection", (VOCAB_INDEXES[0],)),
+    Migration(3, "points index for points-bucket filtering", (VOCAB_INDEXES[1],)),
+    Migration(4, "created_at index for recency queries", (VOCAB_INDEXES[2],)),
+    # Every writer (import scripts, other API workers) bumps the counter inside its own transaction
+    Migration(5, "vocab_meta change counter maintained by triggers",
+              (VOCAB_META_TABLE,
+               "INSERT OR IGNORE INTO vocab_meta (id, epoch) VALUES (1, lower(hex(randomblob(4))));",
+               *VOCAB_META_TRIGGERS)),
+    Migration(6, "vocab_change log of edits to embedded card fields",
+              (VOCAB_CHANGE_TABLE,
+               "CREATE INDEX IF NOT EXISTS idx_vocab_change_seq ON vocab_change (seq);",
+               *VOCAB_CHANGE_TRIGGERS)),
+    Migration(7, "vocab_change triggers as upserts", VOCAB_CHANGE_UPSERT_TRIGGERS),
+    # Points updates during test generation no longer invalidate every cached read
+    Migration(8, "vocab_meta bumped by card column updates only",
+              ("DROP TRIGGER IF EXISTS vocab_meta_update;", VOCAB_META_CARD_UPDATE_TRIGGER)),
+    Migration(9, "vocab.id INTEGER PRIMARY KEY, with vocab_fts keyed on it", VOCAB_ADD_ID),
+]
+
+# data/vocab_testset.db, shared by TestDBManager and TestJobDBManager: either may open it first
+TESTSET_MIGRATIONS = [
+    Migration(1, "vocab_testset and vocab_testjob tables", (VOCAB_TESTSET_TABLE, VOCAB_TESTJOB_TABLE)),
+    # Job recovery at startup lists active jobs oldest first
+    Migration(2, "status index for test jobs",
+              ("CREATE INDEX IF NOT EXISTS idx_vocab_testjob_status ON vocab_testjob (status, created_at);",)),
+    # Process ("host:pid") that claimed a running job, so recover() can tell orphaned jobs from live ones
+    Migration(3, "owner of running test jobs", ("ALTER TABLE vocab_testjob ADD COLUMN owner TEXT;",)),
+]
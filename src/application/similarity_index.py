@@ -0,0 +1,176 @@
+import os
+import sys
+import time
+import threading
+
+from logger import GLOBAL_LOGGER as log
+
+from src.application.registry import get_registry
+from utils.vector_index import VectorIndex, VectorStore
+
+# Nearest-neighbour lookup over vocab cards by embedding similarity
+class VocabSimilarityIndex:
+    """
+    Embeds each vocab card (word, meaning and synonyms) with the configured embedding model
+    and finds the cards closest to a word. Vectors are kept in data/<faiss_db.collection_name>.db
+    and loaded into an in-memory VectorIndex. sync() embeds, in batched embed_documents calls,
+    the cards added or whose text changed since the last sync (read from vocab_change, so writes
+    by any process are seen); only the first sync into an empty store embeds the whole vocab.
+    Embedding calls are paid, so the API runs sync() on a background thread only with
+    faiss_db.background_sync; otherwise each lookup syncs first (a no-op while the vocab is unchanged).
+    """
+
+    def __init__(self, registry=None):
+        self.registry = registry or get_registry()
+        self.vocab_db = self.registry.vocab_db()
+        faiss_config = self.registry.config().get("faiss_db", {})
+        self.store_path = os.path.join("data", f"{faiss_config.get('collection_name', 'vocab_vectors')}.db")
+        self.batch_size = faiss_config.get("batch_size", 100)
+        self.sync_interval = faiss_config.get("sync_interval", 5)
+        self.background_sync = faiss_config.get("background_sync", False)
+        self._store = None
+        self._index = None
+        self._synced_version = None
+        self._lock = threading.Lock()        # one sync at a time
+        self._load_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+    @staticmethod
+    def card_text(card) -> str:
+        # Keep in step with the columns the vocab_change_update trigger watches
+        text = f"{card['word']}: {card.get('meaning') or ''}"
+        if card.get('synonyms'):
+            text += f" Synonyms: {card['synonyms']}"
+        return text
+
+    def _load(self):
+        if self._index is None:
+            with self._load_lock:
+                if self._index is None:
+                    self._store = VectorStore(self.store_path, model=self.registry.embedding_model_id())
+                    keys, vectors = self._store.load()
+                    index = VectorIndex()
+                    index.add(keys, vectors)
+                    self._index = index
+                    log.info("Similarity index loaded", path=self.store_path, vectors=len(keys), backend=index.backend)
+        return self._index
+
+    def sync(self) -> int:
+        """Embed cards added or changed since the last sync (every card on the first); returns how many were embedded."""
+        with self._lock:
+            index = self._load()
+            version = self.vocab_db.version
+            if version == self._synced_version:
+                return 0
+            seq = self.vocab_db.last_change_seq()
+            synced_seq = self._store.get_meta("change_seq")
+            if synced_seq is None or int(synced_seq) > seq:
+                # First fill, or a store left from another vocab file: embed what isn't indexed yet
+                changed = [word.lower() for word in self.vocab_db.get_all_words() if word.lower() not in index]
+            else:
+                changed = [word.lower() for word in self.vocab_db.get_changed_words(int(synced_seq), seq)]
+            words = list(dict.fromkeys(changed))
+            embedded = 0
+            for start in range(0, len(words), self.batch_size):
+                if self._stop.is_set():
+                    # Shutting down: what was embedded is saved, the rest is picked up next time
+                    return embedded
+                cards = [card for card in self.vocab_db.get_words(words[start:start + self.batch_size]) if card]
+                if not cards:
+                    continue
+                vectors = self.registry.embeddings().embed_documents([self.card_text(card) for card in cards])
+                keys = [card['word'].lower() for card in cards]
+                self._store.save(keys, vectors)
+                index.add(keys, vectors)
+                embedded += len(keys)
+            self._store.set_meta("change_seq", seq)
+            self._synced_version = version
+            if embedded:
+                log.info("Similarity index updated", embedded=embedded, changed=len(changed), vectors=len(index))
+            return embedded
+
+    def start(self):
+        """Keep the index in sync from a background thread: now, every sync_interval seconds and on request."""
+        with self._load_lock:
+            if self._thread is not None:
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="similarity-sync", daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        delay = self.sync_interval
+        while not self._stop.is_set():
+            try:
+                self.sync()
+                delay = self.sync_interval
+            except Exception as e:
+                # e.g. no embedding API key: back off rather than failing every few seconds
+                delay = min(delay * 2, 600)
+                log.error("Similarity index sync failed", error=str(e), retry_in=delay)
+            self._wake.wait(delay)
+            self._wake.clear()
+
+    def similar(self, word, k=10) -> list[dict]:
+        """Up to k other vocab words closest to word, best first: [{'word', 'score'}]."""
+        if self._thread is None:
+            self.sync()
+        else:
+            # Served from the index as it stands; the sync thread picks up new cards
+            self._wake.set()
+        index = self._load()
+        word = word.lower()
+        vector = index.vector(word)
+        if vector is None:
+            # Not a vocab word (or not embedded yet): embed the word on its own
+            vector = self.registry.embeddings().embed_query(word)
+        return [{'word': key, 'score': score} for key, score in index.search(vector, k=k, exclude={word})]
+
+    def stats(self) -> dict:
+        index = self._index
+        return {"vectors": len(index) if index is not None else 0,
+                "backend": index.backend if index is not None else None,
+                "model": self.registry.embedding_model_id(),
+                "path": self.store_path,
+                "background_sync": self._thread is not None}
+
+    def close(self):
+        thread = self._thread
+        if thread is not None:
+            self._stop.set()
+            self._wake.set()
+            thread.join()
+            self._thread = None
+        with self._lock:
+            if self._store is not None:
+                self._store.close()
+            self._store = None
+            self._index = None
+            self._synced_version = None
+
+
+_index = None
+_index_lock = threading.Lock()
+
+def get_similarity_index() -> VocabSimilarityIndex:
+    """Return the process-wide similarity index, creating it on first call."""
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = VocabSimilarityIndex()
+    return _index
+
+
+# Fill (or top up) the similarity index without starting the API
+# python test.py src/application/similarity_index.py [word]
+if __name__ == "__main__":
+    index = get_similarity_index()
+    start = time.perf_counter()
+    added = index.sync()
+    print(f"added {added} vectors in {time.perf_counter() - start:.2f}s : {index.stats()}")
+    if len(sys.argv) > 1:
+        print(index.similar(sys.argv[1]))
+    index.close()
@@ -1,4 +1,5 @@
 from utils.db_manager import SQLiteManager
+from src.application.schema import TESTSET_MIGRATIONS
 import os
 import pandas as pd
 from logger import GLOBAL_LOGGER as log
@@ -6,30 +7,13 @@ from exception.custom_exception import CustomException
 from collections import defaultdict
 
 class TestDBManager:
-    def __init__(self, db_path=os.path.join("data","vocab_testset.db")):
+    def __init__(self, db_path=os.path.join("data","vocab_testset.db"), check_same_thread=True, pooled=False, pool_size=8, pool_timeout=30.0):
         self.db_path = db_path
-        self.db = SQLiteManager(db_path=db_path)
-        if not self.db.table_exists("vocab_testset"):
-            self.create_table()    
+        self.db = SQLiteManager(db_path=db_path, check_same_thread=check_same_thread,
+                                pooled=pooled, pool_size=pool_size, pool_timeout=pool_timeout)
+        self.schema_version = self.db.migrate(TESTSET_MIGRATIONS)
         self.testset_columns = self.db.get_column_names("vocab_testset")
 
-    def create_table(self):
-        try :
-            create_table_query = """
-            CREATE TABLE IF NOT EXISTS vocab_testset (
-            testtype INTEGER NOT NULL,
-            testno INTEGER NOT NULL,
-            words TEXT NOT NULL,
-            location TEXT NOT NULL,
-            PRIMARY KEY (testtype,testno)
-            );
-            """
-            self.db.query_execute(create_table_query)
-            log.info("vocab_testset table created")
-        except Exception as e:
-            log.error("Error creating vocab_testset table", error=str(e))
-            raise CustomException("Error creating vocab_testset table : ", e) from e
-
     def insert_test(self, dict_data):
         try :
             input_data = { col : dict_data[col] for col in self.testset_columns }
@@ -48,6 +32,10 @@ class TestDBManager:
         FROM vocab_testset WHERE testtype = ? GROUP BY testtype;"""
         return self.db.query_fetch(select_query, (test_type,))
     
+    def get_test(self, test_type, test_no):
+        select_query = "SELECT * FROM vocab_testset WHERE testtype = ? AND testno = ?;"
+        return self.db.query_fetch(select_query, (test_type, test_no))
+
     def get_all_tests(self, test_type):
         select_query = "SELECT * FROM vocab_testset where testtype = ?;"
         return self.db.query_fetch_all(select_query, (test_type,))
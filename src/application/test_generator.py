@@ -2,35 +2,36 @@ import os
 import sys
 import json
 from pathlib import Path
-from dotenv import load_dotenv
 
-from langchain_core.output_parsers import JsonOutputParser
 from langchain.output_parsers import OutputFixingParser
 
 from logger import GLOBAL_LOGGER as log
 from exception.custom_exception import CustomException
 from prompt.prompt_library import PROMPT_REGISTRY
 from model.model import Test1, PromptType
-from utils.model_loader import ModelLoader
+from src.application.registry import get_registry
 
 # Generate tests for vocab
 class test_generator:
-    def __init__(self, test_type=1):  
-        load_dotenv()
-        self.loader = ModelLoader()
-        self.llm = self.loader.load_llm()
+    def __init__(self, test_type=1, registry=None):
+        # LLM client, parser and chain are shared process-wide through the registry
+        self.registry = registry or get_registry()
+        self.llm = self.registry.llm()
         self.prompt = PROMPT_REGISTRY[PromptType.TEST_VOCAB_TYPE1]
-        self.parser = JsonOutputParser(pydantic_object=Test1)
+        self.parser = self.registry.parser(Test1)
         self.fixing_parser = OutputFixingParser.from_llm(parser=self.parser, llm=self.llm)
-        self.chain = self.prompt | self.llm | self.parser
+        self.chain = self.registry.chain(PromptType.TEST_VOCAB_TYPE1, Test1)
         log.info("test generator initialized", model=self.llm)
 
-    def generate_test(self, word_list) -> dict:
+    def generate_test(self, word_list, bypass_cache=False) -> dict:
         # Placeholder for enhancement logic
         # e.g., add synonyms, usage examples, etc.
         try:            
             input = {"words": ' '.join([word['word'] for word in word_list]),
                      "format_instruction": self.parser.get_format_instructions()}
+            if bypass_cache:
+                # Only cached chains understand bypass_cache
+                return self.chain.invoke(input, bypass_cache=True)
             return self.chain.invoke(input)
         except Exception as e:
             log.error(f"Error generating test for {word_list}", error=str(e))
@@ -0,0 +1,76 @@
+from utils.db_manager import SQLiteManager
+from src.application.schema import TESTSET_MIGRATIONS
+import os
+import uuid
+from logger import GLOBAL_LOGGER as log
+from exception.custom_exception import CustomException
+
+JOB_ACTIVE_STATUSES = ("queued", "running")
+JOB_FINAL_STATUSES = ("completed", "failed", "cancelled")
+
+class TestJobDBManager:
+    """Persisted state of background test generation jobs (vocab_testjob table)."""
+
+    def __init__(self, db_path=os.path.join("data","vocab_testset.db"), check_same_thread=True, pooled=False, pool_size=8, pool_timeout=30.0):
+        self.db_path = db_path
+        self.db = SQLiteManager(db_path=db_path, check_same_thread=check_same_thread,
+                                pooled=pooled, pool_size=pool_size, pool_timeout=pool_timeout)
+        self.schema_version = self.db.migrate(TESTSET_MIGRATIONS)
+
+    def create_job(self, test_type, num_to_pick):
+        try :
+            job_id = uuid.uuid4().hex
+            self.db.insert_json("vocab_testjob", {'job_id': job_id,
+                                                  'testtype': test_type,
+                                                  'num_to_pick': num_to_pick,
+                                                  'status': "queued"})
+            return self.get_job(job_id)
+        except Exception as e:
+            log.error(f"Error creating test job", error=str(e))
+            raise CustomException(f"Error creating test job : ", e) from e
+
+    def get_job(self, job_id):
+        select_query = "SELECT * FROM vocab_testjob WHERE job_id = ?;"
+        return self.db.query_fetch(select_query, (job_id,))
+
+    def get_jobs_by_status(self, statuses):
+        select_query = f"""SELECT * FROM vocab_testjob WHERE status IN ({', '.join(['?'] * len(statuses))})
+        ORDER BY created_at;"""
+        return self.db.query_fetch_all(select_query, tuple(statuses))
+
+    def update_job(self, job_id, **fields):
+        update_query = f"""UPDATE vocab_testjob SET {', '.join(f'{k} = ?' for k in fields)}, updated_at = CURRENT_TIMESTAMP
+        WHERE job_id = ?;"""
+        self.db.query_execute(update_query, tuple(fields.values()) + (job_id,))
+
+    def claim_job(self, job_id, owner) -> bool:
+        """Move a queued job to running for owner; False if another process claimed it first or it was cancelled."""
+        update_query = """UPDATE vocab_testjob SET status = 'running', owner = ?, error = NULL, updated_at = CURRENT_TIMESTAMP
+        WHERE job_id = ? AND status = 'queued';"""
+        return self.db.query_execute(update_query, (owner, job_id)) == 1
+
+    def requeue_job(self, job_id, owner) -> bool:
+        """Put a job running for owner back to queued; False if its state changed meanwhile."""
+        update_query = """UPDATE vocab_testjob SET status = 'queued', owner = NULL, updated_at = CURRENT_TIMESTAMP
+        WHERE job_id = ? AND status = 'running' AND owner IS ?;"""
+        return self.db.query_execute(update_query, (job_id, owner)) == 1
+
+    def cancel_job(self, job_id):
+        """Mark an active job cancelled; returns False if it already finished."""
+        update_query = f"""UPDATE vocab_testjob SET status = 'cancelled', updated_at = CURRENT_TIMESTAMP
+        WHERE job_id = ? AND status IN ({', '.join(['?'] * len(JOB_ACTIVE_STATUSES))});"""
+        self.db.query_execute(update_query, (job_id,) + JOB_ACTIVE_STATUSES)
+        job = self.get_job(job_id)
+        return bool(job) and job['status'] == "cancelled"
+
+    def close(self):
+        self.db.close()
+
+if __name__ == "__main__":
+    job_db_mgr = TestJobDBManager(db_path=os.path.join("data","vocab_testset.db"))
+    job = job_db_mgr.create_job(1, 20)
+    print(job)
+    job_db_mgr.update_job(job['job_id'], status="running", tests_produced=1, words_remaining=10)
+    print(job_db_mgr.get_jobs_by_status(JOB_ACTIVE_STATUSES))
+    print(job_db_mgr.cancel_job(job['job_id']))
+    job_db_mgr.close()
@@ -0,0 +1,160 @@
+import os
+import time
+import socket
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from logger import GLOBAL_LOGGER as log
+
+from src.application.generate_vocabtest import GenerateVocabTest
+from src.application.registry import get_registry
+from src.application.test_job_db_mgr import JOB_ACTIVE_STATUSES
+
+# Runs POST /api/vocabtest generation in the background
+class TestJobRunner:
+    """
+    Background runner for test generation jobs. Job state lives in the vocab_testjob table, so a
+    job interrupted by a crash or restart is picked up again by recover(); generation resumes from
+    the points and tests already committed. Jobs run one at a time, whatever their test type:
+    every type samples from and writes back the same vocab.points, so two generators running
+    together would overwrite each other's point changes. A job is run by whichever process
+    claims it first (claim_job), so several uvicorn workers can share the table.
+    """
+
+    def __init__(self, registry=None):
+        self.registry = registry or get_registry()
+        self.job_db = self.registry.job_db()
+        # A single worker is what serialises the jobs of this process
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="testjob")
+        self.owner = f"{socket.gethostname()}:{os.getpid()}"
+        self._cancel_events = {}
+        self._lock = threading.Lock()
+        self._shutting_down = False
+
+    def submit(self, test_type, num_to_pick=20):
+        job = self.job_db.create_job(test_type, num_to_pick)
+        self._schedule(job['job_id'])
+        log.info("Test job queued", job_id=job['job_id'], test_type=test_type, num_to_pick=num_to_pick)
+        return job
+
+    def _schedule(self, job_id):
+        with self._lock:
+            self._cancel_events[job_id] = threading.Event()
+        self.executor.submit(self._run, job_id)
+
+    def get(self, job_id):
+        return self.job_db.get_job(job_id)
+
+    def cancel(self, job_id):
+        cancelled = self.job_db.cancel_job(job_id)
+        with self._lock:
+            event = self._cancel_events.get(job_id)
+        if cancelled and event:
+            event.set()
+        return cancelled
+
+    def recover(self):
+        """
+        Schedule queued jobs, after re-queueing running ones whose owner process has died.
+        Safe to call from every worker process: each job still runs only where it is claimed.
+        """
+        for job in self.job_db.get_jobs_by_status(("running",)):
+            if self._orphaned(job['owner']):
+                self.job_db.requeue_job(job['job_id'], job['owner'])
+        jobs = self.job_db.get_jobs_by_status(("queued",))
+        for job in jobs:
+            self._schedule(job['job_id'])
+        if jobs:
+            log.info("Recovered test jobs", jobs=[job['job_id'] for job in jobs])
+        return len(jobs)
+
+    def _orphaned(self, owner):
+        # Jobs from before owners were recorded have none; another host's processes can't be checked
+        if not owner:
+            return True
+        host, _, pid = owner.rpartition(":")
+        if host != socket.gethostname() or int(pid) == os.getpid():
+            return False
+        try:
+            os.kill(int(pid), 0)
+        except ProcessLookupError:
+            return True
+        except PermissionError:
+            return False
+        return False
+
+    def _run(self, job_id):
+        cancel_event = self._cancel_events[job_id]
+        try:
+            # Another worker process may have claimed it, or it was cancelled while queued
+            if not cancel_event.is_set() and self.job_db.claim_job(job_id, self.owner):
+                self._execute(self.job_db.get_job(job_id), cancel_event)
+        finally:
+            with self._lock:
+                self._cancel_events.pop(job_id, None)
+
+    def _execute(self, job, cancel_event):
+        job_id = job['job_id']
+        try:
+            # Tests produced before a crash still count towards this job
+            base_produced = job['tests_produced'] or 0
+            start = time.perf_counter()
+
+            def on_progress(progress):
+                produced = progress['tests_produced']
+                elapsed = time.perf_counter() - start
+                eta = round(elapsed / produced * progress['tests_remaining'], 1) if produced else None
+                self.job_db.update_job(job_id,
+                                       tests_produced=base_produced + produced,
+                                       words_remaining=progress['words_remaining'],
+                                       eta_seconds=eta)
+
+            generator = GenerateVocabTest(test_type=job['testtype'], registry=self.registry)
+            result = generator.generate_tests(num_to_pick=job['num_to_pick'],
+                                              progress_callback=on_progress,
+                                              should_stop=cancel_event.is_set)
+            if result['status'] == "success":
+                self.job_db.update_job(job_id, status="completed", test_count=result['test_count'],
+                                       words_remaining=0, eta_seconds=0)
+            elif result['status'] == "cancelled" and self._shutting_down \
+                    and self.job_db.get_job(job_id)['status'] != "cancelled":
+                # Stopped by shutdown rather than by the user: recover() resumes it on next start
+                self.job_db.update_job(job_id, status="queued", owner=None, test_count=result['test_count'])
+            elif result['status'] == "cancelled":
+                self.job_db.update_job(job_id, status="cancelled", test_count=result['test_count'])
+            else:
+                self.job_db.update_job(job_id, status="failed", error=result.get('error'))
+            log.info("Test job finished", job_id=job_id, status=result['status'])
+        except Exception as e:
+            log.error("Test job failed", job_id=job_id, error=str(e))
+            self.job_db.update_job(job_id, status="failed", error=str(e))
+
+    def shutdown(self):
+        # Running jobs stop at the next test boundary and go back to 'queued' for recover()
+        self._shutting_down = True
+        with self._lock:
+            for event in self._cancel_events.values():
+                event.set()
+        self.executor.shutdown(wait=True, cancel_futures=True)
+
+
+_runner = None
+_runner_lock = threading.Lock()
+
+def get_job_runner() -> TestJobRunner:
+    """Return the process-wide job runner, creating it on first call."""
+    global _runner
+    if _runner is None:
+        with _runner_lock:
+            if _runner is None:
+                _runner = TestJobRunner()
+    return _runner
+
+
+if __name__ == "__main__":
+    runner = get_job_runner()
+    job = runner.submit(test_type=1, num_to_pick=20)
+    while runner.get(job['job_id'])['status'] in JOB_ACTIVE_STATUSES:
+        print(runner.get(job['job_id']))
+        time.sleep(2)
+    print(runner.get(job['job_id']))
@@ -0,0 +1,100 @@
+import os
+import json
+import hashlib
+import threading
+
+from logger import GLOBAL_LOGGER as log
+
+from src.application.registry import get_registry
+from utils.lru_cache import BoundedLRUCache
+from utils.pdf_printer import render_pdf_bytes
+
+TEST_PDF_PARTS = ("definitions", "usage", "answers", "booklet")
+
+# Serves one part of a generated test as a PDF
+class TestPdfStore:
+    """
+    Looks up the PDF for (test type, test no, part). A file already rendered under data/test_sets
+    is returned by path so it can be streamed as is (renders appear there only once complete, via
+    os.replace); otherwise, e.g. while the worker is still rendering, the part is rendered in memory from
+    the test's JSON manifest and kept in an LRU cache. Cache keys include the manifest's mtime,
+    so a test regenerated under the same number is never served stale.
+    """
+
+    def __init__(self, registry=None):
+        self.registry = registry or get_registry()
+        self.test_db_mgr = self.registry.test_db()
+        self.test_loc = os.path.join("data","test_sets")
+        pdf_config = self.registry.config().get("pdf", {})
+        self.cache = BoundedLRUCache(max_entries=pdf_config.get("cache_entries", 256),
+                                     max_bytes=pdf_config.get("cache_max_mb", 64) * 1024 * 1024,
+                                     sizeof=lambda item: len(item['content']))
+
+    def get_pdf(self, test_type, test_no, part):
+        """{'path' | 'content', 'etag'} for the requested part, or None if there is no such test or part."""
+        if part not in TEST_PDF_PARTS:
+            return None
+        test = self.test_db_mgr.get_test(test_type, test_no)
+        if not test:
+            return None
+
+        path = os.path.join(self.test_loc, f"test-{test_type}-{test_no}-{part}.pdf")
+        if os.path.exists(path):
+            stat = os.stat(path)
+            return {'path': path, 'etag': _etag(f"{path}:{stat.st_size}:{stat.st_mtime_ns}".encode())}
+
+        # Tests generated before manifests were written have nothing to render from
+        manifest_path = test['location']
+        if not manifest_path.endswith(".json") or not os.path.exists(manifest_path):
+            return None
+        key = (test_type, test_no, part, os.stat(manifest_path).st_mtime_ns)
+        item = self.cache.get(key)
+        if item is None:
+            item = self._render(manifest_path, part)
+            if item is None:
+                return None
+            self.cache.put(key, item)
+        return item
+
+    def _render(self, manifest_path, part):
+        with open(manifest_path, encoding="utf-8") as f:
+            manifest = json.load(f)
+        title = f"test-{manifest['testtype']}-{manifest['testno']}"
+        if part == "booklet":
+            content = render_pdf_bytes("booklet", [{'title': title, 'sections': manifest['sections']}], title)
+        else:
+            section = next((section for section in manifest['sections'] if section['part'] == part), None)
+            if section is None:
+                return None
+            content = render_pdf_bytes(section['kind'], section['data'], section['title'])
+        log.info("Rendered test pdf", test=title, part=part, size=len(content))
+        # Rendering is deterministic, so the content hash is a strong validator across re-renders
+        return {'content': content, 'etag': _etag(content)}
+
+    def stats(self) -> dict:
+        return self.cache.stats()
+
+
+def _etag(data: bytes) -> str:
+    return '"{}"'.format(hashlib.sha256(data).hexdigest()[:32])
+
+
+_store = None
+_store_lock = threading.Lock()
+
+def get_test_pdf_store() -> TestPdfStore:
+    """Return the process-wide test PDF store, creating it on first call."""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = TestPdfStore()
+    return _store
+
+
+if __name__ == "__main__":
+    store = get_test_pdf_store()
+    for part in TEST_PDF_PARTS:
+        pdf = store.get_pdf(1, 1, part)
+        print(part, pdf['path'] if pdf and 'path' in pdf else len(pdf['content']) if pdf else None)
+    print("stats : {}".format(store.stats()))
@@ -1,103 +1,480 @@
 from utils.db_manager import SQLiteManager
+from utils.lru_cache import BoundedLRUCache
+from utils.fuzzy_index import TrigramIndex
+from utils.exporter import iter_export, write_export, format_for_path
+from src.application.schema import (VOCAB_MIGRATIONS, VOCAB_META_BUMP, VOCAB_CARD_COLUMNS,
+                                    SEARCH_COLUMNS, SEARCH_INDEX_REBUILD, search_index_statements)
 import os
-import pandas as pd
+import re
+import json
+import threading
+from datetime import datetime, timezone
 from logger import GLOBAL_LOGGER as log
 from exception.custom_exception import CustomException
 from collections import defaultdict
 
+_MISSING = object()
+
 class VocabDBManager:
-    def __init__(self, db_path=os.path.join("data","vocab.db")):
+    """
+    vocab table access. With cache_entries > 0, get_word and get_all_words are served from an
+    in-process LRU cache keyed by version, the vocab_meta change counter that triggers bump on
+    every card write (points updates excluded), so writes by other processes (import scripts,
+    other API workers) are seen on the next read. Callers that already read the version (e.g.
+    for an ETag) pass it in, and a hit then costs no query. Cached results are shared between
+    callers and must not be mutated.
+    """
+
+    def __init__(self, db_path=os.path.join("data","vocab.db"), check_same_thread=True, pooled=False, pool_size=8, pool_timeout=30.0,
+                 cache_entries=0, cache_max_mb=16):
         self.db_path = db_path
-        self.db = SQLiteManager(db_path=db_path)
-        if not self.db.table_exists("vocab"):
-            self.create_table()    
+        self.db = SQLiteManager(db_path=db_path, check_same_thread=check_same_thread,
+                                pooled=pooled, pool_size=pool_size, pool_timeout=pool_timeout)
+        # Creates the vocab table on a new file and brings older files up to the current schema
+        self.schema_version = self.db.migrate(VOCAB_MIGRATIONS)
         self.vocab_columns = self.db.get_column_names("vocab")
+        self.cache = BoundedLRUCache(max_entries=cache_entries, max_bytes=cache_max_mb * 1024 * 1024,
+                                     sizeof=_approx_size) if cache_entries else None
+        # True when this manager created vocab_fts and indexed the existing rows while opening
+        self.search_index_created = False
+        self.search_enabled = self._ensure_search_index()
+        self._ensure_relations()
+        self._suggest_index = None
+        self._suggest_lock = threading.Lock()
+
+    def change_state(self) -> tuple[str, datetime]:
+        """(version, last modified) of the vocab file, shared by every process writing to it."""
+        row = self.db.query_fetch("SELECT epoch, version, modified_at FROM vocab_meta WHERE id = 1;")
+        last_modified = datetime.strptime(row['modified_at'], "%Y-%m-%dT%H:%M:%SZ").replace(tzinfo=timezone.utc)
+        return f"{row['epoch']}-{row['version']}", last_modified
+
+    @property
+    def version(self) -> str:
+        return self.change_state()[0]
+
+    @property
+    def last_modified(self) -> datetime:
+        return self.change_state()[1]
+
+    def _bump_version(self):
+        # The triggers have already bumped vocab_meta; entries of older versions are just never hit
+        # again, so clearing only frees their memory early
+        if self.cache is not None:
+            self.cache.clear()
+
+    def _cached(self, key, load, version=None):
+        if self.cache is None:
+            return load()
+        if version is None:
+            version = self.version
+        value = self.cache.get((version, key), _MISSING)
+        if value is _MISSING:
+            # The version was read before loading, so a write landing meanwhile only makes this entry
+            # newer than its key, and readers after that write look up the new version anyway
+            value = load()
+            self.cache.put((version, key), value)
+        return value
+
+    def _ensure_search_index(self) -> bool:
+        """Create vocab_fts and its sync triggers if missing, indexing existing rows; False if FTS5 is unavailable."""
+        if self.db.table_exists("vocab_fts"):
+            return True
+        try:
+            self.create_search_index()
+            self.rebuild_search_index()
+            self.search_index_created = True
+            return True
+        except Exception as e:
+            log.warning("Full-text search disabled, FTS5 index could not be created", error=str(e))
+            return False
+
+    def create_search_index(self):
+        try :
+            with self.db.transaction() as conn:
+                # External-content table keyed on vocab.id: the text lives only in vocab
+                for statement in search_index_statements():
+                    conn.execute(statement)
+            log.info("vocab_fts search index created")
+        except Exception as e:
+            log.error("Error creating vocab_fts search index", error=str(e))
+            raise CustomException("Error creating vocab_fts search index : ", e) from e
+
+    def rebuild_search_index(self):
+        """Re-index every vocab row, e.g. after rows were written with the triggers missing."""
+        self.db.query_execute(SEARCH_INDEX_REBUILD)
+        self.db.query_execute("INSERT INTO vocab_fts (vocab_fts) VALUES ('optimize');")
+        # No vocab row changed, so no trigger fired, but cached search results may differ now
+        self.db.query_execute(VOCAB_META_BUMP)
+        self._bump_version()
+        log.info("vocab_fts search index rebuilt")
 
-    def create_table(self):
+    # Relation kinds kept in word_relation, and the card column each is parsed from
+    RELATION_COLUMNS = {'synonym': 'synonyms', 'antonym': 'antonyms'}
+
+    def _ensure_relations(self):
+        """Create word_relation if missing, backfilling it from the existing rows."""
+        if self.db.table_exists("word_relation"):
+            return
+        self.create_relation_table()
+        self.rebuild_relations()
+
+    def create_relation_table(self):
         try :
-            create_table_query = """
-            CREATE TABLE IF NOT EXISTS vocab (
-            word TEXT UNIQUE NOT NULL PRIMARY KEY COLLATE NOCASE,
-            meaning TEXT,
-            usage TEXT,
-            etymology TEXT,
-            word_break TEXT,
-            picture TEXT,
-            did_you_know_facts TEXT,
-            synonyms TEXT,
-            antonyms TEXT,
-            additional_facts TEXT,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            points INTEGER DEFAULT 10
-        );
-            """
-            self.db.query_execute(create_table_query)
-            log.info("Vocab table created")
+            with self.db.transaction() as conn:
+                conn.execute("""CREATE TABLE IF NOT EXISTS word_relation (
+                                word TEXT NOT NULL COLLATE NOCASE,
+                                related TEXT NOT NULL COLLATE NOCASE,
+                                kind TEXT NOT NULL,
+                                PRIMARY KEY (word, kind, related)
+                                ) WITHOUT ROWID;""")
+                # Reverse lookups: the words whose cards list this one
+                conn.execute("CREATE INDEX IF NOT EXISTS idx_word_relation_related ON word_relation (related, kind, word);")
+            log.info("word_relation table created")
         except Exception as e:
-            log.error("Error creating vocab table", error=str(e))
-            raise CustomException("Error creating vocab table : ", e) from e
+            log.error("Error creating word_relation table", error=str(e))
+            raise CustomException("Error creating word_relation table : ", e) from e
+
+    @staticmethod
+    def parse_related(text) -> list[str]:
+        """Distinct lower-cased terms of a comma separated synonyms/antonyms field."""
+        terms = (term.strip().lower() for term in re.split(r"[,;]", text or ""))
+        return list(dict.fromkeys(term for term in terms if term and term != 'none'))
+
+    def _relation_rows(self, card):
+        word = card['word'].lower()
+        return [(word, related, kind) for kind, column in self.RELATION_COLUMNS.items()
+                for related in self.parse_related(card.get(column)) if related != word]
+
+    def _write_relations(self, conn, cards):
+        # Replace the relations of these words with the ones parsed from their cards, in the
+        # caller's transaction so a card is never committed without them
+        conn.executemany("DELETE FROM word_relation WHERE word = ?;", [(card['word'].lower(),) for card in cards])
+        conn.executemany("INSERT OR IGNORE INTO word_relation (word, related, kind) VALUES (?, ?, ?);",
+                         [relation for card in cards for relation in self._relation_rows(card)])
+
+    def rebuild_relations(self, chunk_size=1000) -> int:
+        """Re-derive word_relation from the synonyms and antonyms of every vocab row; returns relations written."""
+        written = 0
+        with self.db.transaction() as conn:
+            conn.execute("DELETE FROM word_relation;")
+            cursor = conn.execute("SELECT word, synonyms, antonyms FROM vocab;")
+            while rows := cursor.fetchmany(chunk_size):
+                relations = [relation for row in rows for relation in self._relation_rows(dict(row))]
+                conn.executemany("INSERT OR IGNORE INTO word_relation (word, related, kind) VALUES (?, ?, ?);", relations)
+                written += len(relations)
+            # word_relation has no change triggers: cached related words must still be refreshed
+            conn.execute(VOCAB_META_BUMP)
+        self._bump_version()
+        log.info("word_relation rebuilt", relations=written)
+        return written
+
+    # Above this many matches bm25 ranking alone costs tens of ms at 100k words, so broad queries
+    # return the same matches unranked, in id (insertion) order
+    SEARCH_RANK_CAP = 2000
+
+    @staticmethod
+    def _search_terms(query):
+        return re.findall(r"\w+", query.lower())
+
+    @staticmethod
+    def _match_expression(terms):
+        # Every term must match, the last one as a prefix so results narrow as the user types
+        return ' '.join([f'"{term}"' for term in terms[:-1]] + [f'"{terms[-1]}"*'])
+
+    def search(self, query, limit=20, offset=0):
+        """Cards matching query across the indexed fields, best bm25 first (unranked for very broad queries): {'results': [...], 'has_more': bool}."""
+        terms = self._search_terms(query)
+        if not self.search_enabled or not terms:
+            return {'results': [], 'has_more': False}
+        return self._cached(("search", tuple(terms), limit, offset), lambda: self._search(terms, limit, offset))
+
+    def _search(self, terms, limit, offset):
+        match = self._match_expression(terms)
+        # Prefixes of one character aren't in the FTS prefix index (prefix='2 3') and match most of the vocab
+        broad = len(terms[-1]) < 2 or self.db.query_fetch(
+            "SELECT count(*) AS n FROM (SELECT rowid FROM vocab_fts WHERE vocab_fts MATCH ? LIMIT ?);",
+            (match, self.SEARCH_RANK_CAP + 1))['n'] > self.SEARCH_RANK_CAP
+        # One extra row tells the caller whether another page exists
+        if broad:
+            rows = self.db.query_fetch_all("""SELECT vocab.word, vocab.meaning, NULL AS score FROM (
+                SELECT rowid FROM vocab_fts WHERE vocab_fts MATCH ? ORDER BY rowid LIMIT ? OFFSET ?) AS matched
+            JOIN vocab ON vocab.id = matched.rowid ORDER BY matched.rowid;""", (match, limit + 1, offset))
+        else:
+            weights = ', '.join(str(weight) for weight in SEARCH_COLUMNS.values())
+            # Rank inside the FTS table first and join vocab only for the page being returned
+            rows = self.db.query_fetch_all(f"""SELECT vocab.word, vocab.meaning, ranked.score FROM (
+                SELECT rowid, bm25(vocab_fts, {weights}) AS score FROM vocab_fts
+                WHERE vocab_fts MATCH ? ORDER BY score LIMIT ? OFFSET ?) AS ranked
+            JOIN vocab ON vocab.id = ranked.rowid ORDER BY ranked.score;""", (match, limit + 1, offset))
+        return {'results': rows[:limit], 'has_more': len(rows) > limit}
+
+    def _vocab_row(self, dict_data, critical=False):
+        input_data = { col : dict_data[col] for col in self.vocab_columns if col not in ['id', 'created_at', 'points'] }
+        input_data['points'] = 10 if not critical else 15
+        input_data['word'] = input_data['word'].lower()
+        return input_data
 
     def insert_word(self, dict_data, critical=False):
         try :
-            input_data = { col : dict_data[col] for col in self.vocab_columns if col not in ['created_at', 'points'] }
-            input_data['points'] = 10 if not critical else 15
-            input_data['word'] = input_data['word'].lower()
-            self.db.insert_json("vocab", input_data)
+            input_data = self._vocab_row(dict_data, critical)
+            with self.db.transaction() as conn:
+                self.db.insert_many("vocab", [input_data], conn=conn)
+                self._write_relations(conn, [input_data])
+            self._bump_version()
+            self._index_words([input_data['word']])
         except Exception as e:
             log.error(f"Error inserting word {dict_data["word"]}", error=str(e))
             raise CustomException(f"Error inserting word {dict_data["word"]} : ", e) from e
 
-    def get_word(self, word):
-        select_query = "SELECT * FROM vocab WHERE word = ?;"
-        return self.db.query_fetch(select_query, (word,))
+    def insert_words(self, word_list, critical=False, overwrite=True):
+        """
+        Insert many enriched words in one transaction.
+        Words already present (word is COLLATE NOCASE) get their content overwritten when
+        overwrite is True, keeping their points unless critical; otherwise they are skipped.
+        Returns the number of rows written.
+        """
+        try :
+            rows = [self._vocab_row(dict_data, critical) for dict_data in word_list]
+            # Cards and their relations commit together, so a failure can't leave stale relations behind
+            with self.db.transaction() as conn:
+                if not overwrite:
+                    written = self.db.insert_many("vocab", rows, on_conflict="ignore", conn=conn)
+                else:
+                    update_columns = [col for col in rows[0] if col not in ['word', 'points']] if rows else []
+                    if critical:
+                        update_columns.append('points')
+                    written = self.db.upsert_many("vocab", rows, conflict_columns=['word'],
+                                                  update_columns=update_columns, conn=conn)
+                if written:
+                    if overwrite or written == len(rows):
+                        # Every row's content is now what is stored (later duplicates win, as in the upsert)
+                        cards = list({row['word']: row for row in rows}.values())
+                    else:
+                        # Some rows were ignored: their words keep the relations of the stored cards
+                        cards = [dict(card) for card in conn.execute(
+                            "SELECT word, synonyms, antonyms FROM vocab WHERE word IN (SELECT value FROM json_each(?));",
+                            (json.dumps([row['word'] for row in rows]),))]
+                    self._write_relations(conn, cards)
+            if written:
+                self._bump_version()
+                self._index_words([row['word'] for row in rows])
+            return written
+        except Exception as e:
+            log.error(f"Error inserting {len(word_list)} words", error=str(e))
+            raise CustomException(f"Error inserting {len(word_list)} words : ", e) from e
+
+    def get_word(self, word, version=None):
+        """The card of a word (points left out: they change with every test) or None."""
+        columns = [column for column in VOCAB_CARD_COLUMNS if column in self.vocab_columns]
+        select_query = f"SELECT {', '.join(columns)} FROM vocab WHERE word = ?;"
+        return self._cached(("word", word.lower()), lambda: self.db.query_fetch(select_query, (word,)), version)
+    
+    # Stay well under SQLite's bound-variable limit (999 on older builds); bigger lists use a temp table
+    IN_QUERY_LIMIT = 900
+
+    def get_words(self, words):
+        """Fetch the cards for many words in one query, in input order (None for unknown words)."""
+        if not words:
+            return []
+        keys = list(dict.fromkeys(word.lower() for word in words))
+        if len(keys) <= self.IN_QUERY_LIMIT:
+            select_query = f"SELECT * FROM vocab WHERE word IN ({', '.join(['?'] * len(keys))});"
+            rows = self.db.query_fetch_all(select_query, tuple(keys))
+        else:
+            with self.db.transaction() as conn:
+                conn.execute("CREATE TEMP TABLE IF NOT EXISTS wanted_words (word TEXT PRIMARY KEY COLLATE NOCASE);")
+                conn.execute("DELETE FROM temp.wanted_words;")
+                conn.executemany("INSERT OR IGNORE INTO temp.wanted_words (word) VALUES (?);", [(key,) for key in keys])
+                rows = [dict(row) for row in conn.execute(
+                    "SELECT vocab.* FROM vocab JOIN temp.wanted_words AS w ON w.word = vocab.word;").fetchall()]
+                conn.execute("DELETE FROM temp.wanted_words;")
+        cards = {row['word'].lower(): row for row in rows}
+        return [cards.get(word.lower()) for word in words]
     
-    def get_all_words(self):
+    def get_all_words(self, version=None):
         select_query = "SELECT word FROM vocab;"
-        return [word_dict['word'] for word_dict in self.db.query_fetch_all(select_query)]
+        return self._cached(("all_words",),
+                            lambda: [word_dict['word'] for word_dict in self.db.query_fetch_all(select_query)], version)
 
-    def export_to_csv(self, export_path):
+    def last_change_seq(self) -> int:
+        """Latest vocab_change sequence: word, meaning or synonyms of some card changed at each step."""
+        return self.db.query_fetch("SELECT coalesce(max(seq), 0) AS seq FROM vocab_change;")['seq']
+
+    def get_changed_words(self, after_seq, upto_seq):
+        """Words whose word, meaning or synonyms changed in (after_seq, upto_seq], oldest change first."""
+        select_query = "SELECT word FROM vocab_change WHERE seq > ? AND seq <= ? ORDER BY seq;"
+        return [row['word'] for row in self.db.query_fetch_all(select_query, (after_seq, upto_seq))]
+
+    def _export_source(self, chunk_size):
+        # Columns in table order, a chunked cursor over them and their declared types
+        # id is internal (the search index key), so exports keep the card columns only
+        table_info = [column for column in self.db.query_fetch_all("PRAGMA table_info(vocab);") if column['name'] != 'id']
+        columns = [column['name'] for column in table_info]
+        chunks = self.db.iter_chunks(f"SELECT {', '.join(columns)} FROM vocab ORDER BY word;", chunk_size=chunk_size)
+        return columns, chunks, {column['name']: column['type'] for column in table_info}
+
+    def iter_export(self, fmt="csv", chunk_size=1000):
+        """Stream the vocab table in the given export format as bytes, reading chunk_size rows at a time."""
+        columns, chunks, column_types = self._export_source(chunk_size)
+        return iter_export(columns, chunks, fmt, column_types)
+
+    def export(self, export_path, fmt=None, chunk_size=1000) -> int:
+        """Write the vocab table to export_path (format from the extension unless given); returns rows written."""
+        fmt = fmt or format_for_path(export_path)
         try:
-            select_query = "SELECT * FROM vocab;"
-            word_dict = self.db.query_fetch_all(select_query)
-            if not word_dict:
+            columns, chunks, column_types = self._export_source(chunk_size)
+            rows = write_export(columns, chunks, fmt, export_path, column_types)
+            if not rows:
                 log.warning("No data found in vocab table to export")
-            df = pd.DataFrame(word_dict)
-            df.to_csv(export_path, index=False)
-            log.info(f"Vocab table exported to {export_path}")
+            return rows
         except Exception as e:
-            log.error("Error exporting vocab table to CSV", error=str(e))
-            raise CustomException("Error exporting vocab table to CSV", e) from e
-        
+            log.error("Error exporting vocab table", error=str(e), format=fmt)
+            raise CustomException(f"Error exporting vocab table to {fmt}", e) from e
+
+    def export_to_csv(self, export_path):
+        return self.export(export_path, fmt="csv")
 
     def get_all_words_for_test(self):
-        select_query = "SELECT word, points FROM vocab;"
+        # Ordered by word so the scan reads only the covering idx_vocab_word_points, not the card text
+        select_query = "SELECT word, points FROM vocab ORDER BY word;"
         vocab_words = self.db.query_fetch_all(select_query)
         return vocab_words
-    
+
+    def get_words_by_points(self, min_points=0, max_points=None):
+        """Words (with points) whose points fall in [min_points, max_points]; served by idx_vocab_points."""
+        select_query = "SELECT word, points FROM vocab WHERE points >= ?"
+        params = [min_points]
+        if max_points is not None:
+            select_query += " AND points <= ?"
+            params.append(max_points)
+        return self.db.query_fetch_all(select_query + " ORDER BY points, word;", tuple(params))
+
+    def get_points_summary(self):
+        """{points: word count}, e.g. to see how far test generation has worked through the vocab."""
+        rows = self.db.query_fetch_all("SELECT points, count(*) AS words FROM vocab GROUP BY points;")
+        return {row['points']: row['words'] for row in rows}
+
+    def get_recent_words(self, limit=20):
+        """The most recently added words, newest first."""
+        select_query = "SELECT word, created_at FROM vocab ORDER BY created_at DESC LIMIT ?;"
+        return self.db.query_fetch_all(select_query, (limit,))
+
+    # Above this many words the update goes through a temp-table join instead of executemany
+    POINTS_TEMP_TABLE_THRESHOLD = 5000
+
     def updated_words_points_for_test(self, vocab_words):
         if not vocab_words or len(vocab_words) == 0:
             return None
-        update_query = """UPDATE vocab 
-                        SET points = CASE word
-                        """
-        for word_dict in vocab_words:
-            update_query += f"""
-                            WHEN '{word_dict['word']}' THEN {word_dict['points']}
-                        """
-        update_query += """
-                        END
-                        WHERE word IN ({});""".format(','.join(["'{}'".format(word_dict['word']) for word_dict in vocab_words]))
-        self.db.query_execute(update_query)
+        params = [(word_dict['points'], word_dict['word']) for word_dict in vocab_words]
+        if len(params) < self.POINTS_TEMP_TABLE_THRESHOLD:
+            # Constant SQL text, so sqlite3 reuses its cached prepared statement across calls
+            self.db.execute_many("UPDATE vocab SET points = ? WHERE word = ?;", params)
+        else:
+            self._update_points_via_temp_table(params)
+        # No version bump: points are not part of any cached read
         return True
-    
+
+    def _update_points_via_temp_table(self, params):
+        with self.db.transaction() as conn:
+            conn.execute("""CREATE TEMP TABLE IF NOT EXISTS points_update (
+                            word TEXT PRIMARY KEY COLLATE NOCASE,
+                            points INTEGER NOT NULL);""")
+            conn.execute("DELETE FROM temp.points_update;")
+            conn.executemany("INSERT OR REPLACE INTO temp.points_update (points, word) VALUES (?, ?);", params)
+            conn.execute("""UPDATE vocab
+                            SET points = (SELECT u.points FROM temp.points_update AS u WHERE u.word = vocab.word)
+                            WHERE word IN (SELECT word FROM temp.points_update);""")
+            conn.execute("DELETE FROM temp.points_update;")
+
     def reset_words_points_for_test(self):
         update_query = """UPDATE vocab SET points = 10 WHERE TRUE;"""
         self.db.query_execute(update_query)
         return True
 
+    def get_related(self, word, kind=None, in_vocab=False) -> dict:
+        """
+        Words related to word in either direction (listed on its card, or listing it on theirs):
+        {'synonyms': [...], 'antonyms': [...]}. kind keeps one relation kind, in_vocab keeps vocab words only.
+        """
+        def load():
+            kind_filter = "AND kind = :kind" if kind else ""
+            query = f"""SELECT related AS other, kind FROM word_relation WHERE word = :word {kind_filter}
+                        UNION
+                        SELECT word AS other, kind FROM word_relation WHERE related = :word {kind_filter}"""
+            if in_vocab:
+                query = f"SELECT r.other, r.kind FROM ({query}) AS r JOIN vocab ON vocab.word = r.other"
+            rows = self.db.query_fetch_all(f"{query} ORDER BY other;", {'word': word.lower(), 'kind': kind})
+            related = {column: [] for relation_kind, column in self.RELATION_COLUMNS.items() if kind in (None, relation_kind)}
+            for row in rows:
+                related[self.RELATION_COLUMNS[row['kind']]].append(row['other'])
+            return related
+        return self._cached(("related", word.lower(), kind, in_vocab), load)
+
+    def get_distractors(self, words, k=3) -> dict:
+        """
+        Up to k vocab words per word to offer as wrong answers: its antonyms first, then antonyms of
+        its synonyms; random order within each group. Never one of words or a synonym of any of them,
+        so a distractor can't be a right answer elsewhere in the same test. One indexed query for
+        all words, no vocab scan. Returns {word: [distractors]}.
+        """
+        query = """WITH picked(word) AS (SELECT DISTINCT lower(value) FROM json_each(:words)),
+                    synonym(word, other) AS (
+                        SELECT r.word, r.related FROM word_relation AS r JOIN picked ON r.word = picked.word AND r.kind = 'synonym'
+                        UNION SELECT r.related, r.word FROM word_relation AS r JOIN picked ON r.related = picked.word AND r.kind = 'synonym'),
+                    candidate(word, other, hop) AS (
+                        SELECT r.word, r.related, 1 FROM word_relation AS r JOIN picked ON r.word = picked.word AND r.kind = 'antonym'
+                        UNION ALL SELECT r.related, r.word, 1 FROM word_relation AS r JOIN picked ON r.related = picked.word AND r.kind = 'antonym'
+                        UNION ALL SELECT s.word, r.related, 2 FROM synonym AS s JOIN word_relation AS r ON r.word = s.other AND r.kind = 'antonym'
+                        UNION ALL SELECT s.word, r.word, 2 FROM synonym AS s JOIN word_relation AS r ON r.related = s.other AND r.kind = 'antonym'),
+                    ranked AS (
+                        SELECT candidate.word, vocab.word AS distractor,
+                               ROW_NUMBER() OVER (PARTITION BY candidate.word ORDER BY MIN(candidate.hop), random()) AS n
+                        FROM candidate JOIN vocab ON vocab.word = candidate.other
+                        WHERE vocab.word NOT IN (SELECT word FROM picked) AND vocab.word NOT IN (SELECT other FROM synonym)
+                        GROUP BY candidate.word, vocab.word)
+                   SELECT word, distractor FROM ranked WHERE n <= :k ORDER BY word, n;"""
+        keys = list(dict.fromkeys(word.lower() for word in words))
+        distractors = {key: [] for key in keys}
+        for row in self.db.query_fetch_all(query, {'words': json.dumps(keys), 'k': k}):
+            distractors[row['word']].append(row['distractor'])
+        return {word: distractors[word.lower()] for word in words}
+
+    def _index_words(self, words):
+        # Waits out an index build in progress so words inserted during it are not missed
+        with self._suggest_lock:
+            if self._suggest_index is not None:
+                self._suggest_index.add_many(words)
+
+    def suggestion_index(self) -> TrigramIndex:
+        """Approximate-match index over every vocab word, built on first use."""
+        if self._suggest_index is None:
+            with self._suggest_lock:
+                if self._suggest_index is None:
+                    self._suggest_index = TrigramIndex(self.get_all_words())
+                    log.info("Word suggestion index built", words=len(self._suggest_index))
+        return self._suggest_index
+
+    def suggest(self, word, k=5, max_distance=None):
+        """Closest known words to a word that isn't in the vocab: [{'word', 'distance'}]."""
+        return self.suggestion_index().suggest(word, k=k, max_distance=max_distance)
+
+    def cache_stats(self) -> dict:
+        stats = self.cache.stats() if self.cache is not None else {"enabled": False}
+        stats["version"] = self.version
+        return stats
+
     def close(self):
         self.db.close()
 
+
+def _approx_size(value) -> int:
+    # Rough payload size for the cache byte bound: string lengths of the row values / words
+    if value is None:
+        return 0
+    if isinstance(value, dict):
+        return sum(len(str(v)) for v in value.values())
+    return sum(len(str(v)) for v in value)
+
 if __name__ == "__main__":
     vocab_db_mgr = VocabDBManager(db_path=os.path.join("data","vocab_11plus.db"))
 
@@ -139,6 +516,9 @@ if __name__ == "__main__":
     # fetch all words for test
     get_all_words_for_test = vocab_db_mgr.get_all_words_for_test()
     print("get_all_words_for_test : {}".format(get_all_words_for_test))
+    print("get_words_by_points(15) : {}".format(vocab_db_mgr.get_words_by_points(15)))
+    print("get_points_summary : {}".format(vocab_db_mgr.get_points_summary()))
+    print("get_recent_words : {}".format(vocab_db_mgr.get_recent_words(limit=3)))
 
     # reset words points for test
     reset_words_points_for_test = vocab_db_mgr.reset_words_points_for_test()
@@ -2,37 +2,101 @@ import os
 import sys
 import json
 from pathlib import Path
-from dotenv import load_dotenv
-
-from langchain_core.output_parsers import JsonOutputParser
 
 from logger import GLOBAL_LOGGER as log
 from exception.custom_exception import CustomException
 from prompt.prompt_library import PROMPT_REGISTRY
-from model.model import WordInfo, PromptType
-from utils.model_loader import ModelLoader
+from model.model import WordInfo, WordInfoList, PromptType
+from src.application.registry import get_registry
 
 # Enhance vocab info - for maintenance
 class vocab_enhancer:
-    def __init__(self):
-        load_dotenv()
-        self.loader = ModelLoader()
-        self.llm = self.loader.load_llm()
+    def __init__(self, registry=None):
+        # LLM client, parser and chain are shared process-wide through the registry
+        self.registry = registry or get_registry()
+        self.llm = self.registry.llm()
         self.prompt = PROMPT_REGISTRY[PromptType.RETRIEVE_VOCABINFO]
-        self.parser = JsonOutputParser(pydantic_object=WordInfo)
-        self.chain = self.prompt | self.llm | self.parser
-        log.info("vocab enhancer initialized", model=self.llm)
+        self.parser = self.registry.parser(WordInfo)
+        self.chain = self.registry.chain(PromptType.RETRIEVE_VOCABINFO, WordInfo)
+        self.batch_chain = self.registry.chain(PromptType.RETRIEVE_VOCABINFO_BATCH, WordInfoList)
+        self.batch_size = self._batch_size()
+        log.info("vocab enhancer initialized", model=self.llm, batch_size=self.batch_size)
+
+    def _batch_size(self) -> int:
+        # As many words as fit in one response, given the expected tokens per enriched word
+        ingestion_config = self.registry.config().get("ingestion", {})
+        if not ingestion_config.get("batch_enrichment", True):
+            return 1
+        max_tokens = self.registry.llm_config().get("max_output_tokens", 2048)
+        tokens_per_word = ingestion_config.get("tokens_per_word", 450)
+        max_batch_size = ingestion_config.get("max_batch_size", 20)
+        return max(1, min(max_batch_size, max_tokens // tokens_per_word))
+
+    def make_batches(self, words) -> list[list[str]]:
+        return [words[i:i + self.batch_size] for i in range(0, len(words), self.batch_size)]
 
-    def enhance_word_info(self, word) -> dict:
+    def enhance_word_info(self, word, bypass_cache=False) -> dict:
         # Placeholder for enhancement logic
         # e.g., add synonyms, usage examples, etc.
         try:
             input = {"input_word": word}
-            return self.chain.invoke(input)
+            return self._invoke(self.chain, input, bypass_cache)
         except Exception as e:
             log.error(f"Error enhancing word info for {word}", error=str(e))
             raise CustomException(f"Error enhancing word info for {word}", sys)
-    
+
+    @staticmethod
+    def _invoke(chain, input, bypass_cache=False):
+        # Only cached chains understand bypass_cache
+        if bypass_cache:
+            return chain.invoke(input, bypass_cache=True)
+        return chain.invoke(input)
+
+    def enhance_word_infos(self, words, bypass_cache=False) -> dict:
+        """
+        Enrich several words with one LLM call per batch.
+        Returns {word: word_info}; words missing from or malformed in a batch response are
+        retried individually, and map to None if that also fails.
+        """
+        word_infos = {}
+        for batch in self.make_batches(list(words)):
+            word_infos.update(self._enhance_batch(batch, bypass_cache))
+        return word_infos
+
+    def _enhance_batch(self, batch, bypass_cache=False) -> dict:
+        matched = {}
+        if len(batch) > 1:
+            try:
+                response = self._invoke(self.batch_chain, {"input_words": "\n".join(batch)}, bypass_cache)
+            except Exception as e:
+                log.error(f"Error enhancing word batch {batch}", error=str(e))
+                response = []
+            wanted = {word.lower(): word for word in batch}
+            for item in response if isinstance(response, list) else []:
+                if not isinstance(item, dict):
+                    continue
+                key = str(item.get("input_word") or item.get("word") or "").strip().lower()
+                if key in wanted and wanted[key] not in matched and self._is_well_formed(item):
+                    matched[wanted[key]] = {k: v for k, v in item.items() if k != "input_word"}
+
+        for word in batch:
+            if word in matched:
+                continue
+            if len(batch) > 1:
+                log.info(f"Word '{word}' missing or malformed in batch response, retrying individually")
+            try:
+                matched[word] = self.enhance_word_info(word, bypass_cache)
+            except CustomException:
+                matched[word] = None
+        return matched
+
+    @staticmethod
+    def _is_well_formed(item) -> bool:
+        # A non-existent word comes back as word None with empty fields, which is a valid answer
+        if item.get("word") in (None, "None", ""):
+            return True
+        return all(field.lower() in item for field in WordInfo.model_fields)
+
 if __name__ == "__main__":
     words = ["abandon", "benevolent", "candid"]
     vocab_mgr = vocab_enhancer()
@@ -40,4 +104,5 @@ if __name__ == "__main__":
         print(f"Details for word: {word}")
         print(vocab_mgr.enhance_word_info(word))
         print("\n")
+    print(vocab_mgr.enhance_word_infos(words))
     print("Ingestion complete.")
\ No newline at end of file
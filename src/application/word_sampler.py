@@ -0,0 +1,114 @@
+import numpy as np
+
+from logger import GLOBAL_LOGGER as log
+
+# Integer selection weights by points (0.749 / 0.25 / 0.001 scaled by 1000 so sums stay exact)
+HIGH_POINTS_WEIGHT = 749   # points >= 10
+MID_POINTS_WEIGHT = 250    # points == 5
+LOW_POINTS_WEIGHT = 1      # anything else (0)
+POINTS_PER_PICK = 5        # points a word loses each time it is picked
+
+def weights_for_points(points: np.ndarray) -> np.ndarray:
+    weights = np.full(points.shape, LOW_POINTS_WEIGHT, dtype=np.int64)
+    weights[points == 5] = MID_POINTS_WEIGHT
+    weights[points >= 10] = HIGH_POINTS_WEIGHT
+    return weights
+
+
+class FenwickTree:
+    """Binary indexed tree over integer weights: point update and prefix search in O(log n)."""
+
+    def __init__(self, values: np.ndarray):
+        self.n = len(values)
+        # Plain Python ints: scalar access is much cheaper than indexing a NumPy array
+        tree = [0] + [int(v) for v in values]
+        for i in range(1, self.n + 1):
+            parent = i + (i & -i)
+            if parent <= self.n:
+                tree[parent] += tree[i]
+        self.tree = tree
+        self.total = int(values.sum()) if self.n else 0
+        self._top_bit = 1 << (self.n.bit_length() - 1) if self.n else 0
+
+    def add(self, index, delta):
+        self.total += delta
+        i = index + 1
+        while i <= self.n:
+            self.tree[i] += delta
+            i += i & -i
+
+    def find(self, target):
+        """Smallest index whose inclusive prefix sum exceeds target (0 <= target < total)."""
+        pos = 0
+        step = self._top_bit
+        tree = self.tree
+        while step:
+            nxt = pos + step
+            if nxt <= self.n and tree[nxt] <= target:
+                pos = nxt
+                target -= tree[nxt]
+            step >>= 1
+        return pos
+
+
+class WeightedWordSampler:
+    """
+    Weighted sampler over the vocab for test generation.
+    Points and weights live in NumPy arrays with a Fenwick tree over the weights, so drawing k
+    distinct words costs O(k log n), a points change is an O(log n) update, and the stop
+    criterion (no word left with points to lose) is an O(1) counter check.
+    """
+
+    def __init__(self, words_for_test: list[dict], rng=None):
+        self.words = [item['word'] for item in words_for_test]
+        self.points = np.fromiter((item['points'] for item in words_for_test), dtype=np.int64, count=len(self.words))
+        self.weights = weights_for_points(self.points)
+        self._tree = FenwickTree(self.weights)
+        self.eligible_count = int((self.points >= POINTS_PER_PICK).sum())
+        # Picks still needed to bring every word below POINTS_PER_PICK, for progress estimates
+        self.pending_draws = int((self.points // POINTS_PER_PICK).sum())
+        self.rng = rng or np.random.default_rng()
+        log.info("Word sampler built", words=len(self.words), eligible=self.eligible_count)
+
+    def __len__(self):
+        return len(self.words)
+
+    @property
+    def stop_criteria(self) -> bool:
+        return self.eligible_count == 0
+
+    def sample(self, k) -> list[int]:
+        """Draw min(k, n) distinct indices, each draw proportional to the remaining weights."""
+        k = min(k, len(self.words))
+        picked = []
+        for _ in range(k):
+            i = self._tree.find(int(self.rng.integers(self._tree.total)))
+            picked.append(i)
+            self._tree.add(i, -int(self.weights[i]))  # out of the running for the rest of this draw
+        for i in picked:
+            self._tree.add(i, int(self.weights[i]))
+        return picked
+
+    def set_points(self, index, points):
+        was_eligible = self.points[index] >= POINTS_PER_PICK
+        self.pending_draws += int(points // POINTS_PER_PICK) - int(self.points[index] // POINTS_PER_PICK)
+        self.points[index] = points
+        new_weight = weights_for_points(np.array([points]))[0]
+        self._tree.add(index, int(new_weight - self.weights[index]))
+        self.weights[index] = new_weight
+        self.eligible_count += int(points >= POINTS_PER_PICK) - int(was_eligible)
+
+    def pick(self, k) -> list[dict]:
+        """Sample k distinct words and take POINTS_PER_PICK points off each (floored at 0)."""
+        picked_words = []
+        for i in self.sample(k):
+            self.set_points(i, max(0, int(self.points[i]) - POINTS_PER_PICK))
+            picked_words.append({'word': self.words[i], 'points': int(self.points[i])})
+        return picked_words
+
+
+if __name__ == "__main__":
+    words = [{'word': f"word{i}", 'points': [0, 5, 10, 15][i % 4]} for i in range(20)]
+    sampler = WeightedWordSampler(words)
+    while not sampler.stop_criteria:
+        print(sampler.pick(5), sampler.eligible_count)
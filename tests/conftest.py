@@ -0,0 +1,33 @@
+import pytest
+
+from src.application.vocab_db_mgr import VocabDBManager
+
+
+@pytest.fixture
+def vocab_db(tmp_path):
+    db = VocabDBManager(db_path=str(tmp_path / "vocab.db"), check_same_thread=False, cache_entries=100)
+    yield db
+    db.close()
+
+
+@pytest.fixture
+def count_queries(monkeypatch):
+    """count_queries(manager) -> a list that gets one entry per connection checkout of manager.db."""
+    def install(manager):
+        checkouts = []
+        connection = manager.db.connection
+
+        def counted():
+            checkouts.append(1)
+            return connection()
+        monkeypatch.setattr(manager.db, "connection", counted)
+        return checkouts
+    return install
+
+
+@pytest.fixture
+def registry(tmp_path):
+    from src.application.registry import ModelRegistry
+    registry = ModelRegistry(vocab_db_path=str(tmp_path / "vocab.db"), testset_db_path=str(tmp_path / "testset.db"))
+    yield registry
+    registry.close()
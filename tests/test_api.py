@@ -0,0 +1,46 @@
+import pytest
+from fastapi.testclient import TestClient
+
+import src.application.registry as registry_module
+from api.main import app
+from utils.fake_llm import fake_word_info
+
+
+@pytest.fixture
+def client(registry, monkeypatch):
+    monkeypatch.setattr(registry_module, "_registry", registry)
+    # No lifespan: nothing is warmed up, recovered or synced in the background
+    return TestClient(app)
+
+
+def test_words_etag_and_304(client, registry):
+    registry.vocab_db().insert_words([fake_word_info("candid")])
+    first = client.get("/api/words")
+    assert first.status_code == 200 and first.json() == ["candid"]
+    etag = first.headers["etag"]
+    cached = client.get("/api/words", headers={"If-None-Match": etag})
+    assert cached.status_code == 304 and cached.headers["etag"] == etag
+    assert client.get("/api/words", headers={"If-Modified-Since": first.headers["last-modified"]}).status_code == 304
+
+    registry.vocab_db().insert_words([fake_word_info("mirth")])
+    changed = client.get("/api/words", headers={"If-None-Match": etag})
+    assert changed.status_code == 200 and changed.headers["etag"] != etag
+    assert sorted(changed.json()) == ["candid", "mirth"]
+
+
+def test_points_updates_keep_the_word_etag(client, registry):
+    registry.vocab_db().insert_words([fake_word_info("candid")])
+    etag = client.get("/api/word", params={"word": "Candid"}).headers["etag"]
+    registry.vocab_db().updated_words_points_for_test([{'word': "candid", 'points': 5}])
+    assert client.get("/api/word", params={"word": "candid"}, headers={"If-None-Match": etag}).status_code == 304
+
+
+def test_unknown_word_gets_suggestions(client, registry):
+    registry.vocab_db().insert_words([fake_word_info("benevolent")])
+    assert client.get("/api/word", params={"word": "benevolant"}).json() == {"suggestions": ["benevolent"]}
+
+
+@pytest.mark.parametrize("body", [{}, {'test_type': None}, {'test_type': "1"}, {'test_type': True},
+                                  {'test_type': 1, 'num_to_pick': 0}])
+def test_post_test_rejects_bad_input(client, body):
+    assert client.post("/api/vocabtest", json=body).status_code == 422
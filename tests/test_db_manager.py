@@ -0,0 +1,81 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from exception.custom_exception import CustomException
+from utils.db_manager import Migration, SQLiteConnectionPool, SQLiteManager
+
+
+def test_iter_chunks_can_resume_on_other_threads(tmp_path):
+    db = SQLiteManager(db_path=str(tmp_path / "t.db"), check_same_thread=False)
+    db.query_fetch("PRAGMA journal_mode=WAL;")   # as the pool sets it, so a reader doesn't block writers
+    db.query_execute("CREATE TABLE t (n INTEGER);")
+    db.execute_many("INSERT INTO t VALUES (?);", [(n,) for n in range(10)])
+    chunks = db.iter_chunks("SELECT n FROM t ORDER BY n;", chunk_size=3)
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        first = executor.submit(next, chunks).result()
+        # Neither the manager lock nor its connection is held between chunks
+        assert executor.submit(db.query_execute, "INSERT INTO t VALUES (10);").result() == 1
+        rest = [executor.submit(list, chunks).result()]
+    assert [n for (n,) in first] == [0, 1, 2]
+    assert [n for chunk in rest[0] for (n,) in chunk] == list(range(3, 10))
+    db.close()
+
+
+def test_pool_is_bounded_and_reuses_connections(tmp_path):
+    pool = SQLiteConnectionPool(str(tmp_path / "p.db"), size=2, timeout=0.05)
+    first, second = pool.acquire(), pool.acquire()
+    with pytest.raises(CustomException):
+        pool.acquire()
+    pool.release(second)
+    assert pool.acquire() is second   # most recently returned first
+    stats = pool.stats()
+    assert (stats['open'], stats['in_use'], stats['checkouts'], stats['waits']) == (2, 2, 3, 0)
+    assert first.execute("PRAGMA journal_mode;").fetchone()[0] == "wal"
+    pool.close_all()
+
+
+def test_pool_waiter_gets_a_released_connection(tmp_path):
+    pool = SQLiteConnectionPool(str(tmp_path / "p.db"), size=1, timeout=5)
+    conn = pool.acquire()
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        waiter = executor.submit(pool.acquire)
+        time.sleep(0.05)
+        pool.release(conn)
+        assert waiter.result() is conn
+    assert pool.stats()['waits'] == 1
+    pool.close_all()
+
+
+MIGRATIONS = [
+    Migration(1, "t table", ("CREATE TABLE t (n INTEGER);",)),
+    Migration(2, "t index", ("CREATE INDEX idx_t_n ON t (n);",)),
+]
+
+
+def test_migrate_applies_new_versions_once(tmp_path):
+    db = SQLiteManager(db_path=str(tmp_path / "m.db"))
+    assert db.migrate(MIGRATIONS[:1]) == 1
+    assert db.migrate(MIGRATIONS) == 2
+    assert db.migrate(MIGRATIONS) == 2   # CREATE INDEX would fail if run again
+    assert db.user_version() == 2
+    assert db.table_exists("t")
+    db.close()
+
+
+def test_failed_migration_keeps_the_last_good_version(tmp_path):
+    db = SQLiteManager(db_path=str(tmp_path / "m.db"))
+    broken = MIGRATIONS + [Migration(3, "broken", ("ALTER TABLE t ADD COLUMN m INTEGER;", "NOT SQL;"))]
+    with pytest.raises(CustomException):
+        db.migrate(broken)
+    assert db.user_version() == 2
+    assert [row['name'] for row in db.query_fetch_all("PRAGMA table_info(t);")] == ["n"]
+    db.close()
+
+
+def test_migrate_leaves_a_newer_schema_alone(tmp_path):
+    db = SQLiteManager(db_path=str(tmp_path / "m.db"))
+    db.migrate(MIGRATIONS)
+    assert db.migrate(MIGRATIONS[:1]) == 2
+    db.close()
@@ -0,0 +1,32 @@
+from utils.fuzzy_index import TrigramIndex, edit_distance
+from utils.fake_llm import fake_word_info
+
+
+def test_edit_distance():
+    assert edit_distance("kitten", "sitting") == 3
+    assert edit_distance("abundant", "abundnat") == 1   # adjacent swap
+    assert edit_distance("", "abc") == 3
+    assert edit_distance("benevolent", "cat", max_distance=2) == 3
+
+
+def test_suggest_closest_first():
+    index = TrigramIndex(["benevolent", "malevolent", "abundant", "abandon", "diligent"])
+    assert index.suggest("benevolant")[0] == {'word': "benevolent", 'distance': 1}
+    assert [hit['word'] for hit in index.suggest("abundnat")] == ["abundant"]
+    assert index.suggest("dilligent", max_distance=1) == [{'word': "diligent", 'distance': 1}]
+    assert index.suggest("zzzzzz") == []
+
+
+def test_short_words_and_later_adds():
+    index = TrigramIndex(["cat", "cot"])
+    index.add("crypt")
+    assert {hit['word'] for hit in index.suggest("cit")} == {"cat", "cot"}
+    assert index.suggest("cript") == [{'word': "crypt", 'distance': 1}]
+    assert "crypt" in index and len(index) == 3
+
+
+def test_vocab_suggestions_include_new_words(vocab_db):
+    vocab_db.insert_words([fake_word_info("benevolent")])
+    assert vocab_db.suggest("benevolant")[0]['word'] == "benevolent"
+    vocab_db.insert_word(fake_word_info("malevolent"))
+    assert [hit['word'] for hit in vocab_db.suggest("malevolant")][0] == "malevolent"
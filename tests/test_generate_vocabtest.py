@@ -0,0 +1,8 @@
+from src.application.generate_vocabtest import GenerateVocabTest
+
+
+def test_listing_tests_does_not_scan_the_vocab(registry, monkeypatch):
+    def scan():
+        raise AssertionError("vocab scanned")
+    monkeypatch.setattr(registry.vocab_db(), "get_all_words_for_test", scan)
+    assert GenerateVocabTest(test_type=1, registry=registry).retrieve_test() == []
@@ -0,0 +1,45 @@
+import json
+
+from src.application.import_vocab import VocabImporter, _JsonItemReader
+from utils.fake_llm import fake_word_info
+
+
+def card(word):
+    return {key.capitalize(): value for key, value in fake_word_info(word).items()}
+
+
+def test_malformed_array_item_is_reported_and_skipped(vocab_db, tmp_path):
+    path = tmp_path / "cards.json"
+    path.write_text("[" + json.dumps(card("candid")) + ', {"Word": "oops", "Meaning": nope}, '
+                    + json.dumps(card("mirth")) + ", 42]", encoding="utf-8")
+    report = VocabImporter(vocab_db).import_file(str(path))
+    assert report['inserted'] == 2
+    assert report['invalid'] == 2
+    assert report['errors'][0].startswith("item 2: not valid JSON")
+    assert report['errors'][1].startswith("item 4: expected an object")
+    assert sorted(vocab_db.get_all_words()) == ["candid", "mirth"]
+
+
+def test_malformed_object_entry_is_skipped(vocab_db, tmp_path):
+    path = tmp_path / "cards.json"
+    cards = {word: {k: v for k, v in card(word).items() if k != "Word"} for word in ("candid", "mirth")}
+    text = json.dumps(cards)
+    text = text.replace('"mirth": {', '"broken": {"Meaning": "x" "y"}, "mirth": {')
+    path.write_text(text, encoding="utf-8")
+    report = VocabImporter(vocab_db).import_file(str(path))
+    assert (report['inserted'], report['invalid']) == (2, 1)
+    assert report['errors'][0].startswith("entry 'broken': not valid JSON")
+
+
+def test_a_bad_item_does_not_read_ahead(tmp_path):
+    # Items after the bad one are only read when iteration gets to them
+    path = tmp_path / "cards.json"
+    path.write_text('[{"a": "x, ]"}, {"b": nope}, ' + ", ".join(['{"c": 1}'] * 2000) + "]", encoding="utf-8")
+    with open(path, encoding="utf-8") as f:
+        reader = _JsonItemReader(f, read_size=64)
+        items = iter(reader)
+        assert next(items) == ("item 1", {"a": "x, ]"})
+        position, error = next(items)
+        assert position == "item 2" and isinstance(error, json.JSONDecodeError)
+        assert len(reader.buffer) < 256
+        assert sum(1 for _ in items) == 2000
@@ -0,0 +1,41 @@
+import os
+import socket
+import subprocess
+import sys
+
+from src.application import test_jobs
+
+
+def dead_owner():
+    process = subprocess.Popen([sys.executable, "-c", "pass"])
+    process.wait()
+    return f"{socket.gethostname()}:{process.pid}"
+
+
+def test_a_queued_job_is_claimed_once(registry):
+    job_db = registry.job_db()
+    job = job_db.create_job(1, 20)
+    assert job_db.claim_job(job['job_id'], "host:1")
+    assert not job_db.claim_job(job['job_id'], "host:2")
+    assert job_db.get_job(job['job_id'])['owner'] == "host:1"
+
+
+def test_a_cancelled_job_is_never_claimed(registry):
+    job_db = registry.job_db()
+    job = job_db.create_job(1, 20)
+    job_db.cancel_job(job['job_id'])
+    assert not job_db.claim_job(job['job_id'], "host:1")
+
+
+def test_recover_requeues_only_orphaned_jobs(registry, monkeypatch):
+    runner = test_jobs.TestJobRunner(registry=registry)
+    scheduled = []
+    monkeypatch.setattr(runner, "_schedule", scheduled.append)
+    job_db = registry.job_db()
+    orphan, live, queued = (job_db.create_job(1, 20) for _ in range(3))
+    job_db.claim_job(orphan['job_id'], dead_owner())
+    job_db.claim_job(live['job_id'], f"{socket.gethostname()}:{os.getppid()}")
+    assert runner.recover() == 2
+    assert sorted(scheduled) == sorted([orphan['job_id'], queued['job_id']])
+    assert job_db.get_job(live['job_id'])['status'] == "running"
+    runner.executor.shutdown()
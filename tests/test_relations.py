@@ -0,0 +1,53 @@
+import pytest
+
+from exception.custom_exception import CustomException
+from utils.fake_llm import fake_word_info
+
+
+def card(word, synonyms="", antonyms=""):
+    return fake_word_info(word) | {'synonyms': synonyms, 'antonyms': antonyms}
+
+
+def test_distractors_for_all_words_in_one_query(vocab_db, count_queries):
+    vocab_db.insert_words([card("happy", synonyms="glad", antonyms="sad, gloomy"),
+                           card("glad", antonyms="miserable"),
+                           card("brave", antonyms="timid, sad"),
+                           card("sad"), card("gloomy"), card("miserable"), card("timid")])
+    checkouts = count_queries(vocab_db)
+    distractors = vocab_db.get_distractors(["Happy", "brave"], k=3)
+    assert len(checkouts) == 1
+    # Antonyms first, then antonyms of synonyms; glad is a synonym of a test word so never offered
+    assert sorted(distractors["Happy"][:2]) == ["gloomy", "sad"]
+    assert distractors["Happy"][2] == "miserable"
+    assert sorted(distractors["brave"]) == ["sad", "timid"]
+
+
+def test_distractors_exclude_the_test_words(vocab_db):
+    vocab_db.insert_words([card("happy", antonyms="sad"), card("sad", antonyms="happy")])
+    assert vocab_db.get_distractors(["happy", "sad"]) == {"happy": [], "sad": []}
+
+
+def test_insert_word_is_atomic_with_its_relations(vocab_db, monkeypatch):
+    def fail(card):
+        raise ValueError("relations")
+    monkeypatch.setattr(vocab_db, "_relation_rows", fail)
+    with pytest.raises(CustomException):
+        vocab_db.insert_word(card("happy", antonyms="sad"))
+    assert vocab_db.get_word("happy") is None
+
+
+def test_insert_words_is_atomic_with_relations(vocab_db, monkeypatch):
+    vocab_db.insert_words([card("happy", antonyms="sad")])
+    monkeypatch.setattr(vocab_db, "_relation_rows", lambda card: 1 / 0)
+    with pytest.raises(CustomException):
+        vocab_db.insert_words([card("happy", antonyms="gloomy")])
+    monkeypatch.undo()
+    assert vocab_db.get_word("happy")['antonyms'] == "sad"
+    assert vocab_db.get_related("happy")['antonyms'] == ["sad"]
+
+
+def test_ignored_rows_keep_their_stored_relations(vocab_db):
+    vocab_db.insert_words([card("happy", antonyms="sad")])
+    vocab_db.insert_words([card("happy", antonyms="gloomy"), card("brave", antonyms="timid")], overwrite=False)
+    assert vocab_db.get_related("happy")['antonyms'] == ["sad"]
+    assert vocab_db.get_related("brave")['antonyms'] == ["timid"]
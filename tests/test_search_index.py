@@ -0,0 +1,48 @@
+import sqlite3
+
+from src.application.schema import VOCAB_TABLE
+from src.application.vocab_db_mgr import VocabDBManager
+from utils.fake_llm import fake_word_info
+
+
+def words(result):
+    return [row['word'] for row in result['results']]
+
+
+def test_search_follows_edits(vocab_db):
+    vocab_db.insert_words([fake_word_info(word) for word in ("candid", "mirth")])
+    assert words(vocab_db.search("cand")) == ["candid"]
+    vocab_db.insert_words([fake_word_info("mirth") | {'meaning': "glee and candour"}])
+    assert words(vocab_db.search("glee")) == ["mirth"]
+    vocab_db.db.query_execute("DELETE FROM vocab WHERE word = 'candid';")
+    assert words(vocab_db.search("candid")) == []
+
+
+def test_search_survives_vacuum(vocab_db):
+    vocab_db.insert_words([fake_word_info(word) for word in ("aardvark", "badger", "cheetah")])
+    vocab_db.db.query_execute("DELETE FROM vocab WHERE word = 'aardvark';")
+    vocab_db.db.query_execute("VACUUM;")
+    assert words(vocab_db.search("badger")) == ["badger"]
+    assert words(vocab_db.search("cheetah")) == ["cheetah"]
+
+
+def test_legacy_file_gets_ids_from_rowids(tmp_path):
+    path = str(tmp_path / "legacy.db")
+    conn = sqlite3.connect(path)
+    conn.execute(VOCAB_TABLE)
+    conn.executemany("INSERT INTO vocab (word, meaning) VALUES (?, ?);", [("candid", "frank"), ("mirth", "glee")])
+    rowids = dict(conn.execute("SELECT word, rowid FROM vocab;").fetchall())
+    conn.commit()
+    conn.close()
+
+    db = VocabDBManager(db_path=path)
+    assert db.vocab_columns[0] == "id"
+    assert {row['word']: row['id'] for row in db.db.query_fetch_all("SELECT id, word FROM vocab;")} == rowids
+    assert words(db.search("glee")) == ["mirth"]
+    db.close()
+
+
+def test_word_matches_rank_above_meaning_matches(vocab_db):
+    vocab_db.insert_words([fake_word_info("mirth") | {'meaning': "glee; not to be confused with a candid remark"},
+                           fake_word_info("candid")])
+    assert words(vocab_db.search("candid")) == ["candid", "mirth"]
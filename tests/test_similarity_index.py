@@ -0,0 +1,33 @@
+import pytest
+
+from src.application.similarity_index import VocabSimilarityIndex
+from utils.fake_llm import fake_word_info
+
+
+@pytest.fixture
+def similarity(registry, tmp_path, monkeypatch):
+    monkeypatch.setenv("EMBEDDING_PROVIDER", "hashed")
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "data").mkdir()
+    index = VocabSimilarityIndex(registry=registry)
+    yield index
+    index.close()
+
+
+def test_sync_embeds_only_changed_cards(similarity, registry, monkeypatch):
+    vocab_db = registry.vocab_db()
+    vocab_db.insert_words([fake_word_info(word) for word in ("candid", "frank", "mirth")])
+    assert similarity.sync() == 3
+
+    def scan():
+        raise AssertionError("full vocab scan")
+    monkeypatch.setattr(vocab_db, "get_all_words", scan)
+    vocab_db.updated_words_points_for_test([{'word': "candid", 'points': 5}])
+    assert similarity.sync() == 0
+    vocab_db.insert_words([fake_word_info("candid") | {'meaning': "honest"}, fake_word_info("glee")])
+    assert similarity.sync() == 2
+    assert {hit['word'] for hit in similarity.similar("candid", k=3)} == {"frank", "mirth", "glee"}
+
+
+def test_background_sync_is_off_by_default(similarity):
+    assert similarity.background_sync is False
@@ -0,0 +1,60 @@
+import numpy as np
+import pytest
+
+from exception.custom_exception import CustomException
+from utils.vector_index import VectorIndex, VectorStore
+
+
+def brute_force(matrix, keys, query, k):
+    normed = matrix / np.linalg.norm(matrix, axis=1, keepdims=True)
+    scores = normed @ (query / np.linalg.norm(query))
+    return [keys[i] for i in np.argsort(-scores)[:k]]
+
+
+def test_search_matches_brute_force():
+    rng = np.random.default_rng(0)
+    keys = [f"w{i}" for i in range(300)]
+    matrix = rng.normal(size=(300, 16))
+    index = VectorIndex(use_faiss=False)
+    assert index.add(keys, matrix) == 300
+    query = rng.normal(size=16)
+    assert [key for key, _ in index.search(query, k=5)] == brute_force(matrix, keys, query, 5)
+    assert [key for key, _ in index.search(matrix[0], k=3, exclude={"w0"})] == \
+        [key for key in brute_force(matrix, keys, matrix[0], 4) if key != "w0"]
+
+
+def test_replacing_a_vector():
+    index = VectorIndex(use_faiss=False)
+    index.add(["a", "b"], [[1, 0], [0, 1]])
+    assert index.add(["a"], [[0, 2]]) == 0
+    assert len(index) == 2
+    assert {key for key, score in index.search([0, 1], k=2) if score == 1.0} == {"a", "b"}
+    with pytest.raises(CustomException):
+        index.add(["c"], [[1, 0, 0]])
+
+
+def test_faiss_agrees_with_numpy():
+    pytest.importorskip("faiss")
+    rng = np.random.default_rng(1)
+    keys, matrix = [f"w{i}" for i in range(200)], rng.normal(size=(200, 8))
+    numpy_index, faiss_index = VectorIndex(use_faiss=False), VectorIndex(use_faiss=True)
+    numpy_index.add(keys, matrix)
+    faiss_index.add(keys, matrix)
+    query = rng.normal(size=8)
+    assert [key for key, _ in faiss_index.search(query, k=10)] == [key for key, _ in numpy_index.search(query, k=10)]
+
+
+def test_store_round_trip(tmp_path):
+    store = VectorStore(str(tmp_path / "v.db"), model="hashed:4")
+    store.save(["a", "b"], np.eye(2, 4, dtype=np.float32))
+    store.set_meta("change_seq", 7)
+    store.close()
+    store = VectorStore(str(tmp_path / "v.db"), model="hashed:4")
+    keys, vectors = store.load()
+    assert sorted(keys) == ["a", "b"] and vectors.shape == (2, 4)
+    assert int(store.get_meta("change_seq")) == 7
+    store.close()
+    # Vectors of another embedding model are dropped
+    store = VectorStore(str(tmp_path / "v.db"), model="hashed:8")
+    assert store.load()[0] == [] and store.get_meta("change_seq") is None
+    store.close()
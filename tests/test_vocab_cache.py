@@ -0,0 +1,39 @@
+from src.application.vocab_db_mgr import VocabDBManager
+from utils.fake_llm import fake_word_info
+
+
+def test_hit_with_version_does_not_touch_the_db(vocab_db, count_queries):
+    vocab_db.insert_words([fake_word_info("candid")])
+    version = vocab_db.version
+    card = vocab_db.get_word("candid", version=version)
+    checkouts = count_queries(vocab_db)
+    assert vocab_db.get_word("Candid", version=version) is card
+    assert vocab_db.get_all_words(version=version) == vocab_db.get_all_words(version=version)
+    assert len(checkouts) == 1   # the first get_all_words only
+
+
+def test_miss_without_version_reads_the_version_once(vocab_db, count_queries):
+    vocab_db.insert_words([fake_word_info("candid")])
+    checkouts = count_queries(vocab_db)
+    vocab_db.get_word("candid")
+    assert len(checkouts) == 2   # version, then the card
+
+
+def test_points_updates_keep_the_version(vocab_db):
+    vocab_db.insert_words([fake_word_info("candid")])
+    version = vocab_db.version
+    vocab_db.updated_words_points_for_test([{'word': "candid", 'points': 5}])
+    vocab_db.reset_words_points_for_test()
+    assert vocab_db.version == version
+    assert 'points' not in vocab_db.get_word("candid")
+
+
+def test_write_by_another_manager_invalidates(vocab_db):
+    vocab_db.insert_words([fake_word_info("candid")])
+    assert vocab_db.get_all_words() == ["candid"]
+    other = VocabDBManager(db_path=vocab_db.db_path)
+    card = fake_word_info("candid") | {'meaning': "frank"}
+    other.insert_words([card, fake_word_info("mirth")])
+    other.close()
+    assert sorted(vocab_db.get_all_words()) == ["candid", "mirth"]
+    assert vocab_db.get_word("candid")['meaning'] == "frank"
@@ -0,0 +1,51 @@
+import numpy as np
+
+from src.application.word_sampler import (FenwickTree, WeightedWordSampler, weights_for_points,
+                                          HIGH_POINTS_WEIGHT, MID_POINTS_WEIGHT, LOW_POINTS_WEIGHT)
+
+
+def sampler(points, seed=0):
+    return WeightedWordSampler([{'word': f"w{i}", 'points': p} for i, p in enumerate(points)],
+                               rng=np.random.default_rng(seed))
+
+
+def test_weights_by_points():
+    assert weights_for_points(np.array([0, 5, 10, 15])).tolist() == \
+        [LOW_POINTS_WEIGHT, MID_POINTS_WEIGHT, HIGH_POINTS_WEIGHT, HIGH_POINTS_WEIGHT]
+
+
+def test_fenwick_find_matches_prefix_sums():
+    values = np.array([3, 0, 5, 1, 0, 7, 2])
+    tree = FenwickTree(values)
+    prefix = np.cumsum(values)
+    for target in range(int(values.sum())):
+        assert tree.find(target) == int(np.searchsorted(prefix, target, side="right"))
+    tree.add(1, 4)
+    assert tree.total == 22 and tree.find(3) == 1
+
+
+def test_draws_follow_the_weights():
+    s = sampler([15, 5, 0])
+    counts = np.bincount([s.sample(1)[0] for _ in range(20000)], minlength=3) / 20000
+    expected = np.array([HIGH_POINTS_WEIGHT, MID_POINTS_WEIGHT, LOW_POINTS_WEIGHT]) / 1000
+    assert np.allclose(counts, expected, atol=0.015)
+
+
+def test_sample_is_distinct_and_capped():
+    s = sampler([10] * 5)
+    assert sorted(s.sample(10)) == [0, 1, 2, 3, 4]
+    assert s._tree.total == 5 * HIGH_POINTS_WEIGHT   # weights restored after the draw
+
+
+def test_pick_takes_points_until_the_stop_criteria():
+    s = sampler([15, 10, 5, 0])
+    assert (s.eligible_count, s.pending_draws) == (3, 6)
+    picks = 0
+    while not s.stop_criteria:
+        picked = s.pick(2)
+        picks += 1
+        assert len({word['word'] for word in picked}) == 2
+        assert s.eligible_count == int((s.points >= 5).sum())
+        assert s.pending_draws == int((s.points // 5).sum())
+        assert s._tree.total == int(weights_for_points(s.points).sum())
+    assert s.points.min() >= 0 and picks <= 6
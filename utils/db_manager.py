@@ -1,31 +1,206 @@
 import os
 import sys
+import time
+import queue
 import sqlite3
 import json
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import NamedTuple
 from logger import GLOBAL_LOGGER as log
 from exception.custom_exception import CustomException
+from utils.metrics import DB_QUERY_SECONDS, statement_kind
+
+class SQLiteConnectionPool:
+    """
+    Bounded pool of SQLite connections that can be checked out from any thread.
+    Connections are opened lazily up to `size`; callers beyond that wait up to `timeout`
+    seconds for one to be returned. Checkout counts and wait times are kept for sizing.
+    """
+
+    def __init__(self, db_path, size=8, timeout=30.0, wal=True):
+        self.db_path = db_path
+        self.size = size
+        self.timeout = timeout
+        self.wal = wal
+        self._idle = queue.LifoQueue()  # LIFO keeps the hottest connections in use
+        self._all = []
+        self._lock = threading.Lock()
+        self._checkouts = 0
+        self._waits = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, check_same_thread=False, timeout=self.timeout)
+        conn.row_factory = sqlite3.Row
+        if self.wal:
+            # WAL lets pooled readers run alongside a writer
+            conn.execute("PRAGMA journal_mode=WAL;")
+        return conn
+
+    def acquire(self):
+        waited = 0.0
+        try:
+            conn = self._idle.get_nowait()
+        except queue.Empty:
+            conn = None
+            with self._lock:
+                if len(self._all) < self.size:
+                    conn = self._connect()
+                    self._all.append(conn)
+            if conn is None:
+                # Pool exhausted: only this blocking path counts as a wait
+                start = time.perf_counter()
+                try:
+                    conn = self._idle.get(timeout=self.timeout)
+                except queue.Empty:
+                    log.error("Timed out waiting for a pooled connection", db_path=self.db_path, size=self.size)
+                    raise CustomException(f"No connection available for {self.db_path} after {self.timeout}s", sys)
+                waited = time.perf_counter() - start
+        with self._lock:
+            self._checkouts += 1
+            if waited:
+                self._waits += 1
+                self._wait_total += waited
+                self._wait_max = max(self._wait_max, waited)
+        return conn
+
+    def release(self, conn):
+        self._idle.put(conn)
+
+    @contextmanager
+    def connection(self):
+        conn = self.acquire()
+        try:
+            yield conn
+        finally:
+            self.release(conn)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"db_path": self.db_path,
+                    "size": self.size,
+                    "open": len(self._all),
+                    "idle": self._idle.qsize(),
+                    "in_use": len(self._all) - self._idle.qsize(),
+                    "checkouts": self._checkouts,
+                    "waits": self._waits,
+                    "wait_avg_ms": round(self._wait_total / self._waits * 1000, 3) if self._waits else 0.0,
+                    "wait_max_ms": round(self._wait_max * 1000, 3)}
+
+    def close_all(self):
+        with self._lock:
+            while True:
+                try:
+                    self._idle.get_nowait()
+                except queue.Empty:
+                    break
+            for conn in self._all:
+                conn.close()
+            self._all = []
+
+
+# One pool per database file, shared by every pooled SQLiteManager in the process
+_POOLS = {}
+_POOLS_LOCK = threading.Lock()
+
+def get_pool(db_path, size=8, timeout=30.0, wal=True) -> SQLiteConnectionPool:
+    key = os.path.abspath(db_path)
+    with _POOLS_LOCK:
+        if key not in _POOLS:
+            _POOLS[key] = SQLiteConnectionPool(db_path, size=size, timeout=timeout, wal=wal)
+        return _POOLS[key]
+
+def close_pool(db_path):
+    with _POOLS_LOCK:
+        pool = _POOLS.pop(os.path.abspath(db_path), None)
+    if pool:
+        pool.close_all()
+
+def all_pool_stats() -> list[dict]:
+    with _POOLS_LOCK:
+        pools = list(_POOLS.values())
+    return [pool.stats() for pool in pools]
+
+
+class Migration(NamedTuple):
+    """
+    One schema step: statements that take a database file from version - 1 to version. A statement
+    is SQL text, or a callable taking the connection for steps that depend on the SQLite build.
+    """
+    version: int
+    description: str
+    statements: tuple
+
 
 class SQLiteManager:
-    def __init__(self, db_path="vocab.db"):
+    def __init__(self, db_path="vocab.db", check_same_thread=True, pooled=False, pool_size=8, pool_timeout=30.0):
         self.db_path = db_path
-        self.conn = sqlite3.connect(db_path)
-        self.conn.row_factory = sqlite3.Row  # Ensures fetch returns dict-like rows
+        self.pool = None
+        self.conn = None
+        self._lock = threading.RLock()
+        if pooled:
+            # Statements check out a connection from the process-wide pool for this file
+            self.pool = get_pool(db_path, size=pool_size, timeout=pool_timeout)
+        else:
+            # check_same_thread=False lets one manager be shared across threads (e.g. FastAPI threadpool);
+            # statements are then serialised through self._lock
+            self.conn = sqlite3.connect(db_path, check_same_thread=check_same_thread)
+            self.conn.row_factory = sqlite3.Row  # Ensures fetch returns dict-like rows
+
+    @contextmanager
+    def connection(self):
+        """Yield a connection for one unit of work; pending changes are rolled back on error."""
+        if self.pool is not None:
+            with self.pool.connection() as conn:
+                try:
+                    yield conn
+                except Exception:
+                    conn.rollback()
+                    raise
+        else:
+            with self._lock:
+                try:
+                    yield self.conn
+                except Exception:
+                    self.conn.rollback()
+                    raise
+
+    @contextmanager
+    def transaction(self):
+        """Yield a connection for several statements that must commit (or roll back) together."""
+        try:
+            with self.connection() as conn:
+                yield conn
+                conn.commit()
+        except Exception as e:
+            log.error(f"Database transaction failed: {e}", db_path=self.db_path)
+            raise CustomException("Database transaction failed", sys)
+
+    def pool_stats(self):
+        return self.pool.stats() if self.pool is not None else None
 
     def get_column_names(self, table_name):
         """Return a list of column names for the given table."""
         try:
             query = f"PRAGMA table_info({table_name});"
-            cursor = self.conn.execute(query)
-            columns = [row[1] for row in cursor.fetchall()]  # row[1] = column name
+            with self.connection() as conn:
+                cursor = conn.execute(query)
+                columns = [row[1] for row in cursor.fetchall()]  # row[1] = column name
             return columns
         except Exception as e:
             log.error(f"Error fetching column names: {e}", table_name=table_name)
             raise CustomException("Failed to fetch column names", sys)
 
     def query_fetch(self, query, params=None):
+        start = time.perf_counter()
         try:
-            cursor = self.conn.execute(query, params or ())
-            row = cursor.fetchone()
+            with self.connection() as conn:
+                cursor = conn.execute(query, params or ())
+                row = cursor.fetchone()
+            DB_QUERY_SECONDS.observe(time.perf_counter() - start, statement_kind(query))
             if row:
                 return dict(row)  # Return as JSON-like dict
             return None
@@ -35,18 +210,52 @@ class SQLiteManager:
 
     def query_fetch_all(self, query, params=None):
         """Fetch all rows as JSON-like list of dicts"""
+        start = time.perf_counter()
         try:
-            cursor = self.conn.execute(query, params or ())
-            rows = cursor.fetchall()
+            with self.connection() as conn:
+                cursor = conn.execute(query, params or ())
+                rows = cursor.fetchall()
+            DB_QUERY_SECONDS.observe(time.perf_counter() - start, statement_kind(query))
             return [dict(row) for row in rows]
         except Exception as e:
             log.error(f"Database error: {e}", query=query)
             raise CustomException("Database fetch all failed", sys)
 
-    def query_execute(self, query, params=None):
+    def iter_chunks(self, query, params=None, chunk_size=1000):
+        """
+        Yield lists of at most chunk_size row tuples from one cursor,
+        so a large result is never held in memory at once. The rows come from a dedicated read-only
+        connection opened for this generator and closed when it is exhausted or closed, so a slow
+        consumer (e.g. a StreamingResponse resumed on other threads) never holds the pool or the lock.
+        """
+        try:
+            conn = sqlite3.connect(f"{Path(self.db_path).resolve().as_uri()}?mode=ro", uri=True, check_same_thread=False)
+        except Exception as e:
+            log.error(f"Database error: {e}", query=query)
+            raise CustomException("Database chunked fetch failed", sys)
+        try:
+            cursor = conn.execute(query, params or ())
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+                yield rows
+        except Exception as e:
+            log.error(f"Database error: {e}", query=query)
+            raise CustomException("Database chunked fetch failed", sys)
+        finally:
+            # Also releases the read snapshot when the consumer stops early
+            conn.close()
+
+    def query_execute(self, query, params=None) -> int:
+        """Run one statement and commit; returns rows changed."""
+        start = time.perf_counter()
         try:
-            self.conn.execute(query, params or ())
-            self.conn.commit()
+            with self.connection() as conn:
+                cursor = conn.execute(query, params or ())
+                conn.commit()
+            DB_QUERY_SECONDS.observe(time.perf_counter() - start, statement_kind(query))
+            return cursor.rowcount
         except Exception as e:
             log.error(f"Database error: {e}", query=query)
             raise CustomException("Database execute failed", sys)
@@ -58,6 +267,61 @@ class SQLiteManager:
         query = f"INSERT INTO {table} ({keys}) VALUES ({placeholders});"
         self.query_execute(query, tuple(data.values()))
 
+    def execute_many(self, query, seq_of_params, conn=None) -> int:
+        """
+        Run one statement for every parameter tuple inside a single transaction; returns rows changed.
+        With conn (from transaction()) it joins that transaction and commits with it.
+        """
+        start = time.perf_counter()
+        try:
+            if conn is not None:
+                cursor = conn.executemany(query, seq_of_params)
+            else:
+                with self.connection() as conn:
+                    cursor = conn.executemany(query, seq_of_params)
+                    conn.commit()
+            DB_QUERY_SECONDS.observe(time.perf_counter() - start, statement_kind(query))
+            return cursor.rowcount
+        except Exception as e:
+            log.error(f"Database error: {e}", query=query)
+            raise CustomException("Database execute many failed", sys)
+
+    def insert_many(self, table, rows: list[dict], on_conflict=None, conn=None) -> int:
+        """
+        Insert JSON-like dicts (all with the same keys) in one transaction (conn's, when given).
+        on_conflict: None to fail on a constraint violation, "ignore" to skip conflicting rows,
+        "replace" to overwrite them. Returns the number of rows written.
+        """
+        if not rows:
+            return 0
+        verbs = {None: "INSERT", "ignore": "INSERT OR IGNORE", "replace": "INSERT OR REPLACE"}
+        if on_conflict not in verbs:
+            raise ValueError(f"Unsupported on_conflict: {on_conflict}")
+        keys = list(rows[0].keys())
+        placeholders = ', '.join(['?'] * len(keys))
+        query = f"{verbs[on_conflict]} INTO {table} ({', '.join(keys)}) VALUES ({placeholders});"
+        return self.execute_many(query, [tuple(row[k] for k in keys) for row in rows], conn=conn)
+
+    def upsert_many(self, table, rows: list[dict], conflict_columns: list[str], update_columns: list[str] = None,
+                    conn=None) -> int:
+        """
+        Insert JSON-like dicts in one transaction (conn's, when given), updating update_columns
+        (default: every non-conflict column) of rows that clash on conflict_columns. Returns rows written.
+        """
+        if not rows:
+            return 0
+        keys = list(rows[0].keys())
+        if update_columns is None:
+            update_columns = [k for k in keys if k not in conflict_columns]
+        placeholders = ', '.join(['?'] * len(keys))
+        query = f"INSERT INTO {table} ({', '.join(keys)}) VALUES ({placeholders})"
+        if update_columns:
+            set_clause = ', '.join([f"{k} = excluded.{k}" for k in update_columns])
+            query += f" ON CONFLICT({', '.join(conflict_columns)}) DO UPDATE SET {set_clause};"
+        else:
+            query += f" ON CONFLICT({', '.join(conflict_columns)}) DO NOTHING;"
+        return self.execute_many(query, [tuple(row[k] for k in keys) for row in rows], conn=conn)
+
     def update_json(self, table, data: dict, where: dict):
         """Update a table using JSON-like dicts for SET and WHERE"""
         set_clause = ', '.join([f"{k} = ?" for k in data.keys()])
@@ -69,8 +333,14 @@ class SQLiteManager:
         """Close the connection and delete the database file from disk."""
         try:
             self.close()
+            if self.pool is not None:
+                close_pool(self.db_path)
+                self.pool = None
             if os.path.exists(self.db_path):
                 os.remove(self.db_path)
+                for suffix in ("-wal", "-shm"):
+                    if os.path.exists(self.db_path + suffix):
+                        os.remove(self.db_path + suffix)
                 log.info(f"Database file '{self.db_path}' deleted successfully.")
             else:
                 log.warning(f"Database file '{self.db_path}' does not exist.")
@@ -78,6 +348,51 @@ class SQLiteManager:
             log.error(f"Failed to delete database: {e}", db_path=self.db_path)
             raise CustomException("Failed to delete database", sys)
         
+    def user_version(self) -> int:
+        with self.connection() as conn:
+            return conn.execute("PRAGMA user_version;").fetchone()[0]
+
+    def migrate(self, migrations: list[Migration]) -> int:
+        """
+        Apply the migrations newer than the file's PRAGMA user_version, in ascending version order,
+        and return the resulting version. Each migration commits together with its version bump
+        in one IMMEDIATE transaction, so a failure leaves the file at the last good version and
+        processes starting at the same time apply every migration exactly once.
+        """
+        target = migrations[-1].version if migrations else 0
+        current = self.user_version()
+        if current >= target:
+            if current > target:
+                log.warning("Database schema is newer than this code", db_path=self.db_path,
+                            version=current, latest_known=target)
+            return current
+        for migration in migrations:
+            if migration.version <= current:
+                continue
+            start = time.perf_counter()
+            try:
+                with self.connection() as conn:
+                    # DDL does not open a transaction implicitly; take the write lock before re-reading the version
+                    conn.execute("BEGIN IMMEDIATE;")
+                    current = conn.execute("PRAGMA user_version;").fetchone()[0]
+                    if migration.version <= current:
+                        conn.rollback()
+                        continue
+                    for statement in migration.statements:
+                        if callable(statement):
+                            statement(conn)
+                        else:
+                            conn.execute(statement)
+                    conn.execute(f"PRAGMA user_version = {int(migration.version)};")
+                    conn.commit()
+                current = migration.version
+                log.info("Schema migration applied", db_path=self.db_path, version=migration.version,
+                         description=migration.description, elapsed_ms=round((time.perf_counter() - start) * 1000, 2))
+            except Exception as e:
+                log.error(f"Schema migration failed: {e}", db_path=self.db_path, version=migration.version)
+                raise CustomException(f"Schema migration {migration.version} ({migration.description}) failed", sys)
+        return current
+
     def table_exists(self, table_name):
         """Check if a table exists in the database."""
         try:
@@ -88,7 +403,10 @@ class SQLiteManager:
             raise CustomException("Failed to check table existence", sys)
     
     def close(self):
-        self.conn.close()
+        # Pooled connections belong to the process-wide pool and stay open for other managers
+        if self.conn is not None:
+            with self._lock:
+                self.conn.close()
 
 
 if __name__ == "__main__":
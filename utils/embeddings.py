@@ -0,0 +1,66 @@
+import re
+import zlib
+from functools import lru_cache
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9']+")
+
+def _feature_slot(feature: str, dimensions: int):
+    # crc32 rather than hash() so vectors are identical across processes and runs
+    digest = zlib.crc32(feature.encode("utf-8"))
+    return digest % dimensions, 1.0 if digest & 0x80000000 else -1.0
+
+
+@lru_cache(maxsize=1 << 16)
+def _token_features(token: str, dimensions: int, trigram_weight: float):
+    # (slots, weights) of a token and its padded trigrams; vocab text repeats tokens heavily
+    slot, sign = _feature_slot(f"w:{token}", dimensions)
+    slots, weights = [slot], [sign]
+    padded = f"#{token}#"
+    for i in range(len(padded) - 2):
+        slot, sign = _feature_slot(padded[i:i + 3], dimensions)
+        slots.append(slot)
+        weights.append(sign * trigram_weight)
+    return tuple(slots), tuple(weights)
+
+
+class HashedNgramEmbeddings(Embeddings):
+    """
+    Deterministic local embeddings: every word token and its padded character trigrams are
+    hashed into `dimensions` signed buckets and the result is L2-normalised. Needs no model
+    download or API key, so vector indexes can be built and benchmarked offline. Similarity
+    is lexical (shared words and word parts), not semantic.
+    """
+
+    def __init__(self, dimensions=256, trigram_weight=0.5):
+        self.dimensions = dimensions
+        self.trigram_weight = trigram_weight
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        # All features of the batch are summed in one bincount over (row, slot) cells
+        cells, weights = [], []
+        for row, text in enumerate(texts):
+            offset = row * self.dimensions
+            for token in TOKEN_PATTERN.findall(text.lower()):
+                slots, token_weights = _token_features(token, self.dimensions, self.trigram_weight)
+                cells.extend([offset + slot for slot in slots])
+                weights.extend(token_weights)
+        vectors = np.bincount(np.asarray(cells, dtype=np.int64), weights=weights,
+                              minlength=len(texts) * self.dimensions).reshape(len(texts), self.dimensions)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return (vectors / norms).astype(np.float32).tolist()
+
+    def embed_query(self, text: str) -> list[float]:
+        return self.embed_documents([text])[0]
+
+
+if __name__ == "__main__":
+    embeddings = HashedNgramEmbeddings(dimensions=64)
+    generous, kind, cryptic = embeddings.embed_documents(["benevolent: kind and generous",
+                                                          "benign: gentle and kind",
+                                                          "cryptic: mysterious or obscure"])
+    print("benevolent ~ benign  : {:.3f}".format(float(np.dot(generous, kind))))
+    print("benevolent ~ cryptic : {:.3f}".format(float(np.dot(generous, cryptic))))
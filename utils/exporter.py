@@ -0,0 +1,137 @@
+import io
+import os
+import sys
+import csv
+import json
+import importlib.util
+
+from logger import GLOBAL_LOGGER as log
+from exception.custom_exception import CustomException
+
+# format -> (media type, file extension)
+EXPORT_FORMATS = {"csv": ("text/csv", ".csv"),
+                  "jsonl": ("application/x-ndjson", ".jsonl"),
+                  "parquet": ("application/vnd.apache.parquet", ".parquet")}
+
+# format -> module it needs beyond the core requirements (the 'parquet' extra in pyproject.toml)
+OPTIONAL_DEPENDENCIES = {"parquet": "pyarrow"}
+
+def format_available(fmt) -> bool:
+    """Whether fmt is a known export format whose optional dependency, if any, is installed."""
+    module = OPTIONAL_DEPENDENCIES.get(fmt)
+    return fmt in EXPORT_FORMATS and (module is None or importlib.util.find_spec(module) is not None)
+
+def format_for_path(path) -> str:
+    """Export format implied by a file extension, defaulting to csv."""
+    extension = os.path.splitext(path)[1].lower()
+    return next((fmt for fmt, (_, ext) in EXPORT_FORMATS.items() if ext == extension), "csv")
+
+
+def iter_export(columns, chunks, fmt, column_types=None):
+    """
+    Encode row chunks (lists of tuples in `columns` order) as one export file, yielding bytes
+    as each chunk is written. Only one chunk is in memory at a time, whatever the row count.
+    column_types maps a column to its SQLite declared type and is used for the Parquet schema.
+    """
+    if fmt == "csv":
+        return _iter_csv(columns, chunks)
+    if fmt == "jsonl":
+        return _iter_jsonl(columns, chunks)
+    if fmt == "parquet":
+        return _iter_parquet(columns, chunks, column_types or {})
+    raise CustomException(f"Unsupported export format: {fmt}", sys)
+
+
+def write_export(columns, chunks, fmt, path, column_types=None) -> int:
+    """Stream an export to path (via a temp file, so readers never see half a file); returns rows written."""
+    counter = {'rows': 0}
+
+    def counted():
+        for rows in chunks:
+            counter['rows'] += len(rows)
+            yield rows
+
+    tmp_path = f"{path}.tmp"
+    try:
+        with open(tmp_path, "wb") as f:
+            for data in iter_export(columns, counted(), fmt, column_types):
+                f.write(data)
+        os.replace(tmp_path, path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    log.info("Export written", path=path, format=fmt, rows=counter['rows'])
+    return counter['rows']
+
+
+def _iter_csv(columns, chunks):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    for rows in chunks:
+        writer.writerows(rows)
+        yield buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
+
+
+def _iter_jsonl(columns, chunks):
+    for rows in chunks:
+        lines = [json.dumps(dict(zip(columns, row)), ensure_ascii=False) for row in rows]
+        yield ("\n".join(lines) + "\n").encode("utf-8")
+
+
+class _ChunkSink(io.RawIOBase):
+    # Write-only file object the Parquet writer flushes into; drained after every row group
+    def __init__(self):
+        self._parts = []
+        self._position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._parts.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def drain(self) -> bytes:
+        data = b"".join(self._parts)
+        self._parts = []
+        return data
+
+
+def _iter_parquet(columns, chunks, column_types):
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise CustomException("Parquet export needs pyarrow (pip install '.[parquet]')", e) from e
+
+    arrow_types = {"INTEGER": pa.int64(), "REAL": pa.float64()}
+    schema = pa.schema([(column, arrow_types.get(str(column_types.get(column, "")).upper(), pa.string()))
+                        for column in columns])
+    sink = _ChunkSink()
+    writer = pq.ParquetWriter(sink, schema)
+    try:
+        # One row group per chunk keeps the writer's buffer to a single chunk
+        for rows in chunks:
+            writer.write_table(pa.Table.from_arrays(
+                [pa.array(values, type=field.type) for values, field in zip(zip(*rows), schema)], schema=schema))
+            yield sink.drain()
+    finally:
+        writer.close()
+    yield sink.drain()
+
+
+if __name__ == "__main__":
+    columns = ["word", "points"]
+    chunks = [[("abundant", 10), ("benevolent", None)], [("cryptic", 7)]]
+    for fmt in ("csv", "jsonl"):
+        print(b"".join(iter_export(columns, iter(chunks), fmt)).decode())
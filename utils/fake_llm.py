@@ -0,0 +1,159 @@
+import sys
+import json
+import math
+import time
+import zlib
+import random
+import threading
+from typing import Any
+
+from pydantic import PrivateAttr
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+from exception.custom_exception import CustomException
+
+LATENCY_DISTRIBUTIONS = ("fixed", "uniform", "normal", "lognormal")
+MALFORMED_KINDS = ("truncated", "prose", "missing_field")
+Z_99 = 2.326   # standard normal 99th percentile
+
+USAGE_TEMPLATES = ["Everyone agreed that the {word} was the best part of the day.",
+                   "She paused to think about the word {word} before she answered.",
+                   "The old map showed a {word} near the edge of the forest."]
+QUESTION_TEMPLATES = ["Everyone agreed that the ________ was the best part of the day.",
+                      "She paused, then wrote ________ as the answer to the last clue.",
+                      "The old map showed a ________ near the edge of the forest."]
+
+def _pick(options, word):
+    # Stable per word (crc32, not hash()), so every run and process gets the same text
+    return options[zlib.crc32(word.encode("utf-8")) % len(options)]
+
+def fake_word_info(word: str) -> dict:
+    """A WordInfo-shaped card (the prompt's lower-case field names) derived only from the word."""
+    return {'word': word,
+            'meaning': f"A made-up meaning of '{word}', returned by the fake LLM provider.",
+            'usage': _pick(USAGE_TEMPLATES, word).format(word=word),
+            'etymology': f"Coined from the {len(word)} letters of '{word}'.",
+            'word_break': "-".join(word[i:i + 3] for i in range(0, len(word), 3)),
+            'picture': f"A sketch of a {word} on a classroom whiteboard.",
+            'did_you_know_facts': f"'{word}' starts with '{word[:1]}' and ends with '{word[-1:]}'.",
+            'synonyms': f"{word}ish, {word}like",
+            'antonyms': f"un{word}",
+            'additional_facts': "1) No homographs, homonyms or homophones. 2) Generated offline."}
+
+def fake_test(words: list[str]) -> list[dict]:
+    """Test1-shaped questions, one per word, in the order given."""
+    return [{'word': word, 'question': _pick(QUESTION_TEMPLATES, word)} for word in words]
+
+def fake_response(prompt: str):
+    """The JSON the real model is asked for, recognised from the prompt's input markers."""
+    if "input_words :" in prompt:
+        words = [line.strip() for line in prompt.rsplit("input_words :", 1)[1].splitlines() if line.strip()]
+        return [{'input_word': word, **fake_word_info(word)} for word in words]
+    if "input_word :" in prompt:
+        return fake_word_info(prompt.rsplit("input_word :", 1)[1].strip())
+    if "Words :" in prompt:
+        return fake_test(prompt.rsplit("Words :", 1)[1].split())
+    return {}
+
+
+class FakeChatModel(BaseChatModel):
+    """
+    Offline chat model for load and latency testing (LLM_PROVIDER=fake). Answers the vocab and
+    test prompts with schema-valid JSON derived from their input words, after a simulated delay
+    drawn from latency_distribution with median latency_ms and 99th percentile latency_p99_ms.
+    failure_rate of calls raise, and malformed_rate return broken output (truncated JSON, prose,
+    or a card/question missing a field). Draws come from one seeded RNG shared by all threads.
+    """
+
+    model_name: str = "fake-llm"
+    latency_distribution: str = "fixed"
+    latency_ms: float = 0.0
+    latency_p99_ms: float | None = None
+    failure_rate: float = 0.0
+    malformed_rate: float = 0.0
+    seed: int | None = None
+
+    _rng: random.Random | None = PrivateAttr(default=None)
+    _rng_lock: Any = PrivateAttr(default_factory=threading.Lock)
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake"
+
+    @property
+    def _identifying_params(self) -> dict:
+        return {"model_name": self.model_name, "latency_distribution": self.latency_distribution,
+                "latency_ms": self.latency_ms, "latency_p99_ms": self.latency_p99_ms,
+                "failure_rate": self.failure_rate, "malformed_rate": self.malformed_rate}
+
+    def _draw(self):
+        """(delay seconds, fail?, malformed kind or None) for one call."""
+        with self._rng_lock:
+            if self._rng is None:
+                self._rng = random.Random(self.seed)
+            rng = self._rng
+            median = self.latency_ms
+            spread = max(0.0, (self.latency_p99_ms or median) - median)
+            if self.latency_distribution == "fixed" or not spread:
+                delay_ms = median
+            elif self.latency_distribution == "uniform":
+                # Centred on the median, wide enough that 99% of draws fall below p99
+                half_width = spread / 0.98
+                delay_ms = rng.uniform(median - half_width, median + half_width)
+            elif self.latency_distribution == "normal":
+                delay_ms = rng.gauss(median, spread / Z_99)
+            elif self.latency_distribution == "lognormal":
+                # Right-skewed like real model latency: a long tail above the median
+                delay_ms = median * math.exp(rng.gauss(0.0, math.log(self.latency_p99_ms / median) / Z_99)) if median > 0 else 0.0
+            else:
+                raise ValueError(f"Unsupported latency distribution: {self.latency_distribution}")
+            fail = rng.random() < self.failure_rate
+            malformed = rng.choice(MALFORMED_KINDS) if rng.random() < self.malformed_rate else None
+        return max(0.0, delay_ms) / 1000, fail, malformed
+
+    @staticmethod
+    def _malform(response, text, kind):
+        if kind == "truncated":
+            return text[:max(1, len(text) // 2)]
+        if kind == "prose":
+            return "I'm sorry, I can't produce that in JSON right now. Here is a summary instead."
+        # missing_field: valid JSON that fails the schema
+        item = response[0] if isinstance(response, list) and response else response
+        if isinstance(item, dict) and item:
+            item.pop('question' if 'question' in item else 'meaning', None)
+        return "```json\n" + json.dumps(response, ensure_ascii=False, indent=2) + "\n```"
+
+    def _generate(self, messages: list[BaseMessage], stop=None, run_manager=None, **kwargs) -> ChatResult:
+        prompt = "\n".join(str(message.content) for message in messages)
+        delay, fail, malformed = self._draw()
+        if delay:
+            time.sleep(delay)
+        if fail:
+            raise CustomException(f"Fake LLM {self.model_name}: injected failure", sys)
+        response = fake_response(prompt)
+        text = "```json\n" + json.dumps(response, ensure_ascii=False, indent=2) + "\n```"
+        if malformed:
+            text = self._malform(response, text, malformed)
+        # ~4 characters per token, close enough for throughput and token accounting
+        usage = {"input_tokens": math.ceil(len(prompt) / 4), "output_tokens": math.ceil(len(text) / 4)}
+        usage["total_tokens"] = usage["input_tokens"] + usage["output_tokens"]
+        message = AIMessage(content=text, usage_metadata=usage,
+                            response_metadata={"model_name": self.model_name, "latency_ms": round(delay * 1000, 3),
+                                               "malformed": malformed})
+        return ChatResult(generations=[ChatGeneration(message=message)],
+                          llm_output={"model_name": self.model_name, "token_usage": usage})
+
+
+if __name__ == "__main__":
+    from langchain_core.output_parsers import JsonOutputParser
+    from prompt.prompt_library import PROMPT_REGISTRY
+
+    llm = FakeChatModel(latency_distribution="lognormal", latency_ms=20, latency_p99_ms=200, seed=7)
+    chain = PROMPT_REGISTRY["retrieve_vocabinfo_batch_prompt"] | llm | JsonOutputParser()
+    print(chain.invoke({"input_words": "candid\nmirth"}))
+    chain = PROMPT_REGISTRY["TestVocab_type1_prompt"] | llm | JsonOutputParser()
+    print(chain.invoke({"words": "candid mirth", "format_instruction": ""}))
+
+# python test.py utils/fake_llm.py
@@ -0,0 +1,139 @@
+import threading
+from collections import defaultdict
+
+def trigrams(word: str) -> set[str]:
+    # Padded so short words and word starts/ends still produce trigrams
+    padded = f"$${word}$"
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def edit_distance(a: str, b: str, max_distance: int = None) -> int:
+    """
+    Optimal string alignment distance (insert, delete, substitute, swap adjacent letters).
+    With max_distance, any distance above it is reported as max_distance + 1.
+    Bit-parallel (Hyyro 2003): one pass over b with a's DP column packed into an int.
+    """
+    if max_distance is not None and abs(len(a) - len(b)) > max_distance:
+        return max_distance + 1
+    m = len(a)
+    if m == 0:
+        distance = len(b)
+    else:
+        match_masks = {}
+        for i, char in enumerate(a):
+            match_masks[char] = match_masks.get(char, 0) | (1 << i)
+        mask = (1 << m) - 1
+        high = 1 << (m - 1)
+        vp, vn, d0, previous_match, distance = mask, 0, 0, 0, m
+        for char in b:
+            match = match_masks.get(char, 0)
+            transposed = ((~d0 & match) << 1) & previous_match
+            d0 = ((((match & vp) + vp) ^ vp) | match | vn | transposed) & mask
+            hp = vn | (~(d0 | vp) & mask)
+            hn = d0 & vp
+            if hp & high:
+                distance += 1
+            elif hn & high:
+                distance -= 1
+            hp = ((hp << 1) | 1) & mask
+            hn = (hn << 1) & mask
+            vp = hn | (~(d0 | hp) & mask)
+            vn = d0 & hp
+            previous_match = match
+    if max_distance is not None and distance > max_distance:
+        return max_distance + 1
+    return distance
+
+
+class TrigramIndex:
+    """
+    In-memory approximate-match index over a set of words.
+    Candidates come from a trigram inverted index, then are confirmed with a bit-parallel
+    edit distance, so a lookup touches a small slice of the vocab.
+    """
+
+    def __init__(self, words=()):
+        self._words = []
+        self._ids = {}
+        self._gram_counts = []
+        self._postings = defaultdict(list)
+        self._by_length = defaultdict(list)
+        self._lock = threading.Lock()
+        self.add_many(words)
+
+    def __len__(self):
+        return len(self._words)
+
+    def __contains__(self, word):
+        return word.lower() in self._ids
+
+    def add(self, word):
+        self.add_many([word])
+
+    def add_many(self, words):
+        with self._lock:
+            for word in words:
+                word = word.lower()
+                if word in self._ids:
+                    continue
+                word_id = len(self._words)
+                self._words.append(word)
+                self._ids[word] = word_id
+                grams = trigrams(word)
+                self._gram_counts.append(len(grams))
+                for gram in grams:
+                    self._postings[gram].append(word_id)
+                self._by_length[len(word)].append(word_id)
+
+    @staticmethod
+    def auto_distance(query) -> int:
+        # Two edits on a short word match half the vocab and defeat the trigram filter
+        return 1 if len(query) < 8 else 2
+
+    def suggest(self, query, k=5, max_distance=None) -> list[dict]:
+        """
+        Up to k indexed words within max_distance edits of query, closest first: [{'word', 'distance'}].
+        max_distance defaults to auto_distance(query).
+        """
+        query = query.lower()
+        if max_distance is None:
+            max_distance = self.auto_distance(query)
+        grams = trigrams(query)
+        # One edit changes at most four padded trigrams, so words within max_distance share
+        # all but 4 * max_distance of the query's trigrams, and of their own
+        slack = 4 * max_distance
+        with self._lock:
+            if len(grams) > slack:
+                shared = {}
+                for gram in grams:
+                    for word_id in self._postings.get(gram, ()):
+                        shared[word_id] = shared.get(word_id, 0) + 1
+                min_shared = len(grams) - slack
+                words, gram_counts = self._words, self._gram_counts
+                candidates = [(word_id, count) for word_id, count in shared.items()
+                              if count >= min_shared and count >= gram_counts[word_id] - slack
+                              and abs(len(words[word_id]) - len(query)) <= max_distance]
+            else:
+                # Too short for the trigram filter to prune anything: scan words of a similar length
+                candidates = [(word_id, 0) for length in range(max(0, len(query) - max_distance), len(query) + max_distance + 1)
+                              for word_id in self._by_length.get(length, ())]
+            candidates = [(self._words[word_id], count) for word_id, count in candidates]
+
+        matches = []
+        for word, count in candidates:
+            if word == query:
+                continue
+            distance = edit_distance(query, word, max_distance)
+            if distance <= max_distance:
+                matches.append((distance, -count, word))
+        matches.sort()
+        return [{'word': word, 'distance': distance} for distance, _, word in matches[:k]]
+
+
+if __name__ == "__main__":
+    index = TrigramIndex(["benevolent", "malevolent", "abundant", "abandon", "cryptic", "diligent", "eloquent"])
+    print(index.suggest("benevolant"))
+    print(index.suggest("abundnat"))
+    print(index.suggest("dilligent", max_distance=1))
+    index.add("crypt")
+    print(index.suggest("cript"))
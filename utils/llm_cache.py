@@ -0,0 +1,162 @@
+import os
+import sys
+import json
+import time
+import hashlib
+import threading
+
+from logger import GLOBAL_LOGGER as log
+from exception.custom_exception import CustomException
+from utils.db_manager import SQLiteManager
+
+class LLMResponseCache:
+    """
+    Persistent, content-addressed cache of parsed LLM responses.
+    Keys are a hash of prompt template, provider/model, temperature and input variables,
+    so any change to one of them is a miss. Entries are evicted by age and, beyond
+    max_entries, least recently used first.
+    """
+
+    EVICT_EVERY = 100  # puts between eviction sweeps
+
+    def __init__(self, db_path=os.path.join("data","llm_cache.db"), max_entries=20000, max_age_days=90):
+        self.db_path = db_path
+        self.max_entries = max_entries
+        self.max_age_seconds = max_age_days * 24 * 3600 if max_age_days else None
+        self.db = SQLiteManager(db_path=db_path, check_same_thread=False)
+        self.create_table()
+        self.hits = 0
+        self.misses = 0
+        self._puts = 0
+        self._counter_lock = threading.Lock()
+        self.evict()
+
+    def create_table(self):
+        try:
+            create_table_query = """
+            CREATE TABLE IF NOT EXISTS llm_cache (
+            key TEXT PRIMARY KEY,
+            prompt_type TEXT,
+            response TEXT NOT NULL,
+            created_at REAL NOT NULL,
+            last_used_at REAL NOT NULL
+            );
+            """
+            self.db.query_execute(create_table_query)
+            self.db.query_execute("CREATE INDEX IF NOT EXISTS idx_llm_cache_last_used ON llm_cache (last_used_at);")
+        except Exception as e:
+            log.error("Error creating llm_cache table", error=str(e))
+            raise CustomException("Error creating llm_cache table : ", e) from e
+
+    @staticmethod
+    def make_key(prompt_template: str, provider: str, model_name: str, temperature, inputs: dict) -> str:
+        payload = json.dumps([prompt_template, provider, model_name, temperature, inputs],
+                             sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key):
+        row = self.db.query_fetch("SELECT response, created_at FROM llm_cache WHERE key = ?;", (key,))
+        now = time.time()
+        if row and (self.max_age_seconds is None or now - row['created_at'] <= self.max_age_seconds):
+            self.db.query_execute("UPDATE llm_cache SET last_used_at = ? WHERE key = ?;", (now, key))
+            with self._counter_lock:
+                self.hits += 1
+            return json.loads(row['response'])
+        with self._counter_lock:
+            self.misses += 1
+        return None
+
+    def put(self, key, response, prompt_type=None):
+        now = time.time()
+        self.db.query_execute(
+            "INSERT OR REPLACE INTO llm_cache (key, prompt_type, response, created_at, last_used_at) VALUES (?, ?, ?, ?, ?);",
+            (key, prompt_type, json.dumps(response, ensure_ascii=False), now, now))
+        with self._counter_lock:
+            self._puts += 1
+            sweep = self._puts % self.EVICT_EVERY == 0
+        if sweep:
+            self.evict()
+
+    def evict(self) -> int:
+        """Drop expired entries, then the least recently used ones beyond max_entries."""
+        try:
+            removed = 0
+            if self.max_age_seconds is not None:
+                cutoff = time.time() - self.max_age_seconds
+                removed += self.db.query_fetch("SELECT count(*) AS n FROM llm_cache WHERE created_at < ?;", (cutoff,))['n']
+                self.db.query_execute("DELETE FROM llm_cache WHERE created_at < ?;", (cutoff,))
+            if self.max_entries:
+                count = self.db.query_fetch("SELECT count(*) AS n FROM llm_cache;")['n']
+                if count > self.max_entries:
+                    removed += count - self.max_entries
+                    self.db.query_execute("""DELETE FROM llm_cache WHERE key IN (
+                        SELECT key FROM llm_cache ORDER BY last_used_at ASC LIMIT ?);""", (count - self.max_entries,))
+            if removed:
+                log.info("LLM cache evicted entries", removed=removed)
+            return removed
+        except Exception as e:
+            log.error("Error evicting LLM cache entries", error=str(e))
+            raise CustomException("Error evicting LLM cache entries", sys)
+
+    def stats(self) -> dict:
+        entries = self.db.query_fetch("SELECT count(*) AS n FROM llm_cache;")['n']
+        lookups = self.hits + self.misses
+        return {"entries": entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0}
+
+    def clear(self):
+        self.db.query_execute("DELETE FROM llm_cache;")
+
+    def close(self):
+        self.db.close()
+
+
+def _template_text(prompt) -> str:
+    # ChatPromptTemplate keeps the raw template on each message prompt
+    parts = [getattr(getattr(message, "prompt", None), "template", None) for message in getattr(prompt, "messages", [])]
+    parts = [part for part in parts if part]
+    return "\n".join(parts) if parts else repr(prompt)
+
+
+class CachedChain:
+    """
+    Wraps a prompt | llm | parser chain so identical invocations are served from LLMResponseCache.
+    invoke(..., bypass_cache=True), or bypass=True for every call, forces a fresh generation
+    and refreshes the cached entry.
+    """
+
+    def __init__(self, chain, cache: LLMResponseCache, prompt, prompt_type, llm_config: dict, bypass=False):
+        self.chain = chain
+        self.cache = cache
+        self.bypass = bypass
+        self.prompt_type = str(getattr(prompt_type, "value", prompt_type))
+        self._template = _template_text(prompt)
+        self._provider = llm_config.get("provider")
+        self._model_name = llm_config.get("model_name")
+        self._temperature = llm_config.get("temperature")
+
+    def invoke(self, input, config=None, bypass_cache=False, **kwargs):
+        key = LLMResponseCache.make_key(self._template, self._provider, self._model_name, self._temperature, input)
+        if not (bypass_cache or self.bypass):
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+        result = self.chain.invoke(input, config, **kwargs)
+        if result:
+            self.cache.put(key, result, self.prompt_type)
+        return result
+
+    def __getattr__(self, name):
+        return getattr(self.chain, name)
+
+
+if __name__ == "__main__":
+    cache = LLMResponseCache(db_path=os.path.join("data","test_llm_cache.db"), max_entries=2)
+    key = LLMResponseCache.make_key("template {x}", "google", "gemini", 0.7, {"x": 1})
+    print("miss : {}".format(cache.get(key)))
+    cache.put(key, {"word": "page"}, "retrieve_vocabinfo_prompt")
+    print("hit : {}".format(cache.get(key)))
+    print("stats : {}".format(cache.stats()))
+    cache.close()
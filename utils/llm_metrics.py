@@ -0,0 +1,54 @@
+import time
+from typing import Any
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+from utils.metrics import LLM_REQUEST_SECONDS, LLM_TOKENS
+
+class LLMMetricsCallback(BaseCallbackHandler):
+    """
+    LangChain callback timing each chat model call of one chain and recording its token usage
+    (usage_metadata on the message, else llm_output token_usage). Attached per chain by the registry,
+    so provider and prompt_type are fixed per handler.
+    """
+
+    def __init__(self, provider: str, prompt_type: str):
+        self.provider = provider
+        self.prompt_type = prompt_type
+        self._started = {}
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, **kwargs: Any) -> None:
+        self._started[run_id] = time.perf_counter()
+
+    def on_llm_start(self, serialized, prompts, *, run_id, **kwargs: Any) -> None:
+        self._started[run_id] = time.perf_counter()
+
+    def _elapsed(self, run_id):
+        start = self._started.pop(run_id, None)
+        return None if start is None else time.perf_counter() - start
+
+    def on_llm_end(self, response, *, run_id, **kwargs: Any) -> None:
+        elapsed = self._elapsed(run_id)
+        if elapsed is not None:
+            LLM_REQUEST_SECONDS.observe(elapsed, self.provider, self.prompt_type, "ok")
+        prompt_tokens, completion_tokens = _token_usage(response)
+        if prompt_tokens is not None:
+            LLM_TOKENS.observe(prompt_tokens, self.provider, self.prompt_type, "prompt")
+        if completion_tokens is not None:
+            LLM_TOKENS.observe(completion_tokens, self.provider, self.prompt_type, "completion")
+
+    def on_llm_error(self, error, *, run_id, **kwargs: Any) -> None:
+        elapsed = self._elapsed(run_id)
+        if elapsed is not None:
+            LLM_REQUEST_SECONDS.observe(elapsed, self.provider, self.prompt_type, "error")
+
+def _token_usage(response):
+    """(prompt tokens, completion tokens) of an LLMResult, None where the provider did not report them."""
+    for generations in response.generations or []:
+        for generation in generations:
+            usage = getattr(getattr(generation, "message", None), "usage_metadata", None)
+            if usage:
+                return usage.get("input_tokens"), usage.get("output_tokens")
+    usage = (response.llm_output or {}).get("token_usage") or {}
+    return (usage.get("prompt_tokens", usage.get("input_tokens")),
+            usage.get("completion_tokens", usage.get("output_tokens")))
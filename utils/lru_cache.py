@@ -0,0 +1,83 @@
+import threading
+from collections import OrderedDict
+
+class BoundedLRUCache:
+    """
+    Thread-safe in-memory LRU cache bounded by entry count and, optionally, total value size.
+    Values are sized with len() unless a sizeof callable is given. A value larger than
+    max_bytes on its own is not cached.
+    """
+
+    def __init__(self, max_entries=256, max_bytes=None, sizeof=len):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof
+        self._entries = OrderedDict()
+        self._sizes = {}
+        self._lock = threading.Lock()
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, default=None):
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+            return default
+
+    def put(self, key, value, size=None):
+        size = self.sizeof(value) if size is None else size
+        with self._lock:
+            self._discard(key)
+            if self.max_bytes is not None and size > self.max_bytes:
+                return
+            self._entries[key] = value
+            self._sizes[key] = size
+            self.total_bytes += size
+            while len(self._entries) > self.max_entries or \
+                    (self.max_bytes is not None and self.total_bytes > self.max_bytes):
+                self._discard(next(iter(self._entries)))
+
+    def invalidate(self, key):
+        with self._lock:
+            self._discard(key)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._sizes.clear()
+            self.total_bytes = 0
+
+    def _discard(self, key):
+        if key in self._entries:
+            del self._entries[key]
+            self.total_bytes -= self._sizes.pop(key)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {"entries": len(self._entries),
+                "bytes": self.total_bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0}
+
+
+if __name__ == "__main__":
+    cache = BoundedLRUCache(max_entries=2, max_bytes=10)
+    cache.put("a", b"12345")
+    cache.put("b", b"123")
+    print("a : {}".format(cache.get("a")))
+    cache.put("c", b"1234")   # evicts b, the least recently used
+    print("b : {}".format(cache.get("b")))
+    print("stats : {}".format(cache.stats()))
@@ -0,0 +1,222 @@
+import math
+import time
+import threading
+from bisect import bisect_left
+from functools import lru_cache
+
+# In-process Prometheus-style metrics, exposed in the text exposition format by GET /metrics.
+# An observation is a dict lookup, a bisect and one uncontended lock, so it can sit on the DB hot path.
+# Values are per process (each API worker keeps its own, like /api/db/pool).
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+LLM_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.0, 4.0, 8.0, 16.0, 32.0, 64.0)
+TOKEN_BUCKETS = (64, 128, 256, 512, 1024, 2048, 4096, 8192, 16384)
+DB_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+PDF_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+HTTP_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+def _escape(value) -> str:
+    return str(value).replace("\\", r"\\").replace("\n", r"\n").replace('"', r'\"')
+
+def _format_labels(names, values, extra="") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+def _format_value(value) -> str:
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """Monotonic counter per label values; inc(amount, *labelvalues)."""
+
+    kind = "counter"
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, *labelvalues):
+        with self._lock:
+            self._values[labelvalues] = self._values.get(labelvalues, 0) + amount
+
+    def samples(self):
+        with self._lock:
+            values = dict(self._values)
+        return [(self.name, labels, "", value) for labels, value in sorted(values.items())]
+
+    def reset(self):
+        with self._lock:
+            self._values.clear()
+
+
+class _Series:
+    __slots__ = ("counts", "total")
+
+    def __init__(self, size):
+        self.counts = [0] * size    # per bucket, +Inf last; the count is their sum
+        self.total = 0.0
+
+
+class Histogram:
+    """
+    Cumulative histogram per label values with fixed upper bounds; observe(value, *labelvalues).
+    Bucket counts are kept per bucket and only summed when rendered.
+    """
+
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=HTTP_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, *labelvalues):
+        # Hot path: explicit acquire/release is measurably cheaper than `with` here
+        series = self._series.get(labelvalues)
+        if series is None:
+            with self._lock:
+                series = self._series.setdefault(labelvalues, _Series(len(self.buckets) + 1))
+        index = bisect_left(self.buckets, value)
+        self._lock.acquire()
+        try:
+            series.counts[index] += 1
+            series.total += value
+        finally:
+            self._lock.release()
+
+    def samples(self):
+        with self._lock:
+            snapshot = {labels: (list(series.counts), series.total) for labels, series in self._series.items()}
+        samples = []
+        for labels, (counts, total) in sorted(snapshot.items()):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (math.inf,), counts):
+                cumulative += bucket_count
+                samples.append((self.name + "_bucket", labels, f'le="{_format_value(bound)}"', cumulative))
+            samples.append((self.name + "_sum", labels, "", total))
+            samples.append((self.name + "_count", labels, "", cumulative))
+        return samples
+
+    def reset(self):
+        with self._lock:
+            self._series.clear()
+
+
+class MetricsRegistry:
+    """Named metrics rendered together in the Prometheus text format."""
+
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric):
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Metric already registered: {metric.name}")
+            self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name, documentation, labelnames=()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=HTTP_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for name, labels, extra, value in metric.samples():
+                lines.append(f"{name}{_format_labels(metric.labelnames, labels, extra)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+    def reset(self):
+        with self._lock:
+            metrics = list(self._metrics.values())
+        for metric in metrics:
+            metric.reset()
+
+
+REGISTRY = MetricsRegistry()
+
+LLM_REQUEST_SECONDS = REGISTRY.histogram(
+    "vocab_llm_request_seconds", "LLM call latency by provider, prompt type and outcome.",
+    ("provider", "prompt_type", "status"), LLM_BUCKETS)
+LLM_TOKENS = REGISTRY.histogram(
+    "vocab_llm_tokens", "Prompt and completion tokens per LLM call.",
+    ("provider", "prompt_type", "kind"), TOKEN_BUCKETS)
+DB_QUERY_SECONDS = REGISTRY.histogram(
+    "vocab_db_query_seconds", "SQLiteManager statement latency by statement kind.", ("kind",), DB_BUCKETS)
+PDF_RENDER_SECONDS = REGISTRY.histogram(
+    "vocab_pdf_render_seconds", "PDF render time by kind (text, table, booklet).", ("kind",), PDF_BUCKETS)
+HTTP_REQUEST_SECONDS = REGISTRY.histogram(
+    "vocab_http_request_seconds", "HTTP request latency by method, route template and status.",
+    ("method", "route", "status"), HTTP_BUCKETS)
+INGEST_WORDS = REGISTRY.counter(
+    "vocab_ingest_words_total", "Words ingested by outcome (inserted, exists, points_updated, suspected_typo, failed).",
+    ("status",))
+
+STATEMENT_KINDS = {"select", "insert", "update", "delete", "replace", "create", "drop", "alter", "pragma", "with", "begin"}
+
+@lru_cache(maxsize=1024)
+def statement_kind(query: str) -> str:
+    """Leading SQL keyword of a statement (select, insert, ...) as a bounded label; cached per query text."""
+    keyword = query.lstrip().split(None, 1)[0].lower() if query and query.strip() else ""
+    return keyword if keyword in STATEMENT_KINDS else "other"
+
+def render() -> str:
+    return REGISTRY.render()
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording vocab_http_request_seconds. The route label is the matched route
+    template (/api/vocabtest/jobs/{job_id}, not the concrete path; query strings as in
+    /api/word?word= are never part of it) so it stays bounded; anything without an API route
+    (static files, 404s) is 'unmatched'. Time runs until the last body chunk is sent.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        start = time.perf_counter()
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            # The router fills scope['route'] in place once a route matches
+            route = getattr(scope.get("route"), "path", None) or "unmatched"
+            HTTP_REQUEST_SECONDS.observe(time.perf_counter() - start, scope["method"], route, str(status))
+
+
+if __name__ == "__main__":
+    for query in ("SELECT * FROM vocab;", "  insert into vocab VALUES (?)", "VACUUM;"):
+        DB_QUERY_SECONDS.observe(0.0004, statement_kind(query))
+    INGEST_WORDS.inc(3, "inserted")
+    print(render())
+
+# python test.py utils/metrics.py
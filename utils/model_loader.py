@@ -7,12 +7,17 @@ from logger import GLOBAL_LOGGER as log
 from exception.custom_exception import CustomException
 from langchain_google_genai import GoogleGenerativeAIEmbeddings, ChatGoogleGenerativeAI
 from langchain_groq import ChatGroq
+from utils.fake_llm import FakeChatModel
 
 
 class ApiKeyManager:
     REQUIRED_KEYS = ["GROQ_API_KEY", "GOOGLE_API_KEY", "OPENAI_API_KEY"]
+    # Key each hosted provider needs; local providers (fake) need none
+    PROVIDER_KEYS = {"google": "GOOGLE_API_KEY", "groq": "GROQ_API_KEY", "openai": "OPENAI_API_KEY"}
 
-    def __init__(self):
+    def __init__(self, required_keys=None):
+        # Every known key is loaded if present, but only required_keys (default: all) must be
+        self.required_keys = self.REQUIRED_KEYS if required_keys is None else list(required_keys)
         self.api_keys = {}
         raw = os.getenv("API_KEYS")
 
@@ -35,7 +40,7 @@ class ApiKeyManager:
                     log.info(f"Loaded {key} from individual env var")
 
         # Final check
-        missing = [k for k in self.REQUIRED_KEYS if not self.api_keys.get(k)]
+        missing = [k for k in self.required_keys if not self.api_keys.get(k)]
         if missing:
             log.error("Missing required API keys", missing_keys=missing)
             raise CustomException("Missing API keys", sys)
@@ -61,9 +66,14 @@ class ModelLoader:
         else:
             log.info("Running in PRODUCTION mode")
 
-        self.api_key_mgr = ApiKeyManager()
         self.config = load_config()
         log.info("YAML config loaded", config_keys=list(self.config.keys()))
+        # Only the active LLM provider's key is checked up front; the embeddings key when embeddings load
+        provider_key = ApiKeyManager.PROVIDER_KEYS.get(self._llm_config().get("provider"))
+        self.api_key_mgr = ApiKeyManager(required_keys=[provider_key] if provider_key else [])
+
+    def _llm_config(self) -> dict:
+        return self.config["llm"].get(os.getenv("LLM_PROVIDER", "google"), {})
 
 
     def load_embeddings(self):
@@ -113,6 +123,11 @@ class ModelLoader:
                 temperature=temperature,
             )
 
+        elif provider == "fake":
+            # Offline, deterministic answers with simulated latency/failures for load testing
+            options = ["latency_distribution", "latency_ms", "latency_p99_ms", "failure_rate", "malformed_rate", "seed"]
+            return FakeChatModel(model_name=model_name, **{k: llm_config[k] for k in options if k in llm_config})
+
         # elif provider == "openai":
         #     return ChatOpenAI(
         #         model=model_name,
@@ -1,51 +1,151 @@
 from reportlab.lib.pagesizes import A4
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Table, TableStyle
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Table, TableStyle, PageBreak, Flowable
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.units import inch
 from reportlab.lib import colors
+import io
+import os
+import time
+import threading
+import multiprocessing
+from contextlib import contextmanager
+from concurrent.futures import Future, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from utils.metrics import PDF_RENDER_SECONDS
 
-def save_text_to_pdf(text: str, filename: str = "styled_output.pdf", title: str = None):
-    # Create PDF document
-    doc = SimpleDocTemplate(
-        filename,
-        pagesize=A4,
-        rightMargin=0.75*inch,
-        leftMargin=0.75*inch,
-        topMargin=1*inch,
-        bottomMargin=1*inch,
-    )
-
-    # Define custom style
-    custom_style = ParagraphStyle(
-        name="Custom",
-        fontName="Helvetica",     # Options: 'Times-Roman', 'Courier', 'Helvetica'
-        fontSize=16,              # Font size
-        leading=22,               # Line spacing (usually 120-140% of font size)
-        spaceAfter=12,            # Space after each paragraph
-    )
-
-    # Prepare content for PDF
+# Page geometry and styles are built once per process and shared by every render
+PAGE_MARGINS = dict(
+    pagesize=A4,
+    rightMargin=0.75*inch,
+    leftMargin=0.75*inch,
+    topMargin=1*inch,
+    bottomMargin=1*inch,
+)
+
+TEXT_STYLE = ParagraphStyle(
+    name="Custom",
+    fontName="Helvetica",     # Options: 'Times-Roman', 'Courier', 'Helvetica'
+    fontSize=16,              # Font size
+    leading=22,               # Line spacing (usually 120-140% of font size)
+    spaceAfter=12,            # Space after each paragraph
+)
+
+TEXT_TITLE_STYLE = ParagraphStyle(
+    name="Title",
+    fontName="Helvetica-Bold",
+    fontSize=20,
+    alignment=1,  # Center alignment
+    spaceAfter=20,
+)
+
+TABLE_TEXT_STYLE = ParagraphStyle(
+    name="TableText",
+    fontName="Helvetica",
+    fontSize=12,
+    leading=14,
+    alignment=0,  # Left alignment
+)
+
+TABLE_HEADER_STYLE = ParagraphStyle(
+    name="TableHeader",
+    fontName="Helvetica-Bold",
+    fontSize=14,
+    leading=16,
+    alignment=1,  # Center alignment
+)
+
+TABLE_TITLE_STYLE = ParagraphStyle(
+    name="Title",
+    fontName="Helvetica-Bold",
+    fontSize=18,
+    alignment=1,  # Center alignment
+    spaceAfter=20,
+)
+
+TABLE_STYLE = TableStyle([
+    # Header row styling - white background, black text
+    ('BACKGROUND', (0, 0), (-1, 0), colors.white),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.black),
+    ('ALIGN', (0, 0), (-1, -1), 'LEFT'),  # Left align for better text wrapping
+
+    # Data rows styling - white background
+    ('BACKGROUND', (0, 1), (-1, -1), colors.white),
+
+    # Grid lines
+    ('GRID', (0, 0), (-1, -1), 1, colors.black),
+
+    # Padding
+    ('VALIGN', (0, 0), (-1, -1), 'TOP'),  # Top align for better text wrapping
+    ('LEFTPADDING', (0, 0), (-1, -1), 8),
+    ('RIGHTPADDING', (0, 0), (-1, -1), 8),
+    ('TOPPADDING', (0, 0), (-1, -1), 6),
+    ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
+])
+
+# Calculate available width for table (A4 width minus margins), split 40% / 60% between the two columns
+TABLE_COL_WIDTHS = [(A4[0] - 0.75 * 2 * inch) * 0.4, (A4[0] - 0.75 * 2 * inch) * 0.6]
+
+
+def text_flowables(text: str, title: str = None) -> list:
     flowables = []
-    
+
     # Add title if provided
     if title:
-        title_style = ParagraphStyle(
-            name="Title",
-            fontName="Helvetica-Bold",
-            fontSize=20,
-            alignment=1,  # Center alignment
-            spaceAfter=20,
-        )
-        title_paragraph = Paragraph(title, title_style)
-        flowables.append(title_paragraph)
+        flowables.append(Paragraph(title, TEXT_TITLE_STYLE))
 
     # Split text into paragraphs
-    paragraphs = text.split("\n")
-    text_paragraphs = [Paragraph(p, custom_style) for p in paragraphs if p.strip()]
-    flowables.extend(text_paragraphs)
+    flowables.extend(Paragraph(p, TEXT_STYLE) for p in text.split("\n") if p.strip())
+    return flowables
 
+
+def table_flowables(data: list[dict], title: str = None) -> list:
+    """Title and table flowables for a list of 2-key dictionaries; empty if the data can't be tabled."""
+    if not data:
+        print("No data provided")
+        return []
+
+    # Get the two keys from the first dictionary
+    keys = list(data[0].keys())
+    if len(keys) != 2:
+        print("Error: Each dictionary must contain exactly 2 keys")
+        return []
+
+    # Header row, then data rows, with wrapped text
+    table_data = [[Paragraph(str(key), TABLE_HEADER_STYLE) for key in keys]]
+    table_data.extend([Paragraph(str(item[key]), TABLE_TEXT_STYLE) for key in keys] for item in data)
+
+    # Create table with specified column widths
+    table = Table(table_data, colWidths=TABLE_COL_WIDTHS)
+    table.setStyle(TABLE_STYLE)
+
+    content = []
+    if title:
+        content.append(Paragraph(title, TABLE_TITLE_STYLE))
+    content.append(table)
+    return content
+
+
+@contextmanager
+def _atomic_pdf(filename):
+    """
+    Path to build a PDF at, moved over filename only once the build completes, so the API never
+    serves (or hashes an ETag from) a file a worker is still writing.
+    """
+    tmp_path = f"{filename}.{os.getpid()}.tmp"
+    try:
+        yield tmp_path
+        os.replace(tmp_path, filename)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def save_text_to_pdf(text: str, filename: str = "styled_output.pdf", title: str = None):
     # Build PDF
-    doc.build(flowables)
+    with _atomic_pdf(filename) as target:
+        doc = SimpleDocTemplate(target, **PAGE_MARGINS)
+        doc.build(text_flowables(text, title))
     print(f"PDF saved as {filename}")
 
 
@@ -58,114 +158,204 @@ def save_dict_list_to_pdf(data: list[dict], filename: str = "table_output.pdf",
         filename: Output PDF filename
         title: Optional title to display at the top of the PDF
     """
-    if not data:
-        print("No data provided")
-        return
-    
-    # Get the two keys from the first dictionary
-    keys = list(data[0].keys())
-    if len(keys) != 2:
-        print("Error: Each dictionary must contain exactly 2 keys")
+    content = table_flowables(data, title)
+    if not content:
         return
-    
-    # Create PDF document
-    doc = SimpleDocTemplate(
-        filename,
-        pagesize=A4,
-        rightMargin=0.75*inch,
-        leftMargin=0.75*inch,
-        topMargin=1*inch,
-        bottomMargin=1*inch,
-    )
-    
-    # Calculate available width for table (A4 width minus margins)
-    page_width = A4[0]
-    available_width = page_width - (0.75 * 2 * inch)  # Subtract left and right margins
-    
-    # Define column widths (split available width between two columns)
-    col_widths = [available_width * 0.4, available_width * 0.6]  # 40% and 60% of available width
-    
-    # Create paragraph style for wrapped text
-    text_style = ParagraphStyle(
-        name="TableText",
-        fontName="Helvetica",
-        fontSize=12,
-        leading=14,
-        alignment=0,  # Left alignment
-    )
-    
-    # Prepare table data with wrapped text
-    table_data = []
-    
-    # Add header row with wrapped text
-    header_row = []
-    for key in keys:
-        header_style = ParagraphStyle(
-            name="TableHeader",
-            fontName="Helvetica-Bold",
-            fontSize=14,
-            leading=16,
-            alignment=1,  # Center alignment
-        )
-        header_row.append(Paragraph(str(key), header_style))
-    table_data.append(header_row)
-    
-    # Add data rows with wrapped text
-    for item in data:
-        row = []
-        for key in keys:
-            row.append(Paragraph(str(item[key]), text_style))
-        table_data.append(row)
-    
-    # Create table with specified column widths
-    table = Table(table_data, colWidths=col_widths)
-    
-    # Prepare content for PDF
-    content = []
-    
-    # Add title if provided
-    if title:
-        title_style = ParagraphStyle(
-            name="Title",
-            fontName="Helvetica-Bold",
-            fontSize=18,
-            alignment=1,  # Center alignment
-            spaceAfter=20,
-        )
-        title_paragraph = Paragraph(title, title_style)
-        content.append(title_paragraph)
-    
-    # Add table to content
-    content.append(table)
-    
-    # Define table style
-    table_style = TableStyle([
-        # Header row styling - white background, black text
-        ('BACKGROUND', (0, 0), (-1, 0), colors.white),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.black),
-        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),  # Left align for better text wrapping
-        
-        # Data rows styling - white background
-        ('BACKGROUND', (0, 1), (-1, -1), colors.white),
-        
-        # Grid lines
-        ('GRID', (0, 0), (-1, -1), 1, colors.black),
-        
-        # Padding
-        ('VALIGN', (0, 0), (-1, -1), 'TOP'),  # Top align for better text wrapping
-        ('LEFTPADDING', (0, 0), (-1, -1), 8),
-        ('RIGHTPADDING', (0, 0), (-1, -1), 8),
-        ('TOPPADDING', (0, 0), (-1, -1), 6),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
-    ])
-    
-    table.setStyle(table_style)
-    
+
     # Build PDF
-    doc.build(content)
+    with _atomic_pdf(filename) as target:
+        doc = SimpleDocTemplate(target, **PAGE_MARGINS)
+        doc.build(content)
     print(f"Table PDF saved as {filename}")
 
 
+class _Bookmark(Flowable):
+    """Zero-size flowable that bookmarks the page it lands on and adds an outline entry."""
+
+    def __init__(self, key, text, level=0):
+        super().__init__()
+        self.key = key
+        self.text = text
+        self.level = level
+
+    def wrap(self, availWidth, availHeight):
+        return 0, 0
+
+    def draw(self):
+        self.canv.bookmarkPage(self.key)
+        self.canv.addOutlineEntry(self.text, self.key, level=self.level, closed=self.level > 0)
+
+
+SECTION_FLOWABLES = {
+    "text": text_flowables,
+    "table": table_flowables,
+}
+
+def booklet_flowables(booklet: list[dict], title: str = None) -> list:
+    """Flowables for a booklet: every section on a new page, bookmarked per test and per section."""
+    content = []
+    for i, test in enumerate(booklet):
+        for j, section in enumerate(test['sections']):
+            if content:
+                content.append(PageBreak())
+            if j == 0:
+                content.append(_Bookmark(f"test-{i}", test['title'], level=0))
+            content.append(_Bookmark(f"test-{i}-{j}", section.get('bookmark') or section.get('title') or section['kind'], level=1))
+            content.extend(SECTION_FLOWABLES[section['kind']](section['data'], section.get('title')))
+    return content
+
+
+def _show_outline(canv, doc):
+    canv.showOutline()
+
+
+def save_booklet_to_pdf(booklet: list[dict], filename: str = "booklet_output.pdf", title: str = None):
+    """
+    Render one or more tests into a single PDF, each section starting on a new page.
+    
+    Args:
+        booklet: List of {'title': str, 'sections': [{'kind': 'text'|'table', 'data': ..., 'title': str, 'bookmark': str}]}
+        filename: Output PDF filename
+        title: Optional document title (PDF metadata)
+    """
+    content = booklet_flowables(booklet)
+    if not content:
+        print("No data provided")
+        return
+
+    # Build PDF, pages are written straight to a temp file that replaces filename when complete
+    with _atomic_pdf(filename) as target:
+        doc = SimpleDocTemplate(target, title=title or "", **PAGE_MARGINS)
+        doc.build(content, onFirstPage=_show_outline)
+    print(f"Booklet PDF saved as {filename}")
+
+
+def render_pdf_bytes(kind: str, data, title: str = None) -> bytes:
+    """
+    Render a text, table or booklet PDF in memory. Output is invariant (no timestamps or random
+    document ids), so the same input always gives the same bytes.
+    """
+    start = time.perf_counter()
+    buffer = io.BytesIO()
+    doc = SimpleDocTemplate(buffer, invariant=1, title=title or "", **PAGE_MARGINS)
+    if kind == "booklet":
+        doc.build(booklet_flowables(data), onFirstPage=_show_outline)
+    else:
+        doc.build(SECTION_FLOWABLES[kind](data, title))
+    PDF_RENDER_SECONDS.observe(time.perf_counter() - start, kind)
+    return buffer.getvalue()
+
+
+# Render functions a PdfRenderService job can name
+RENDERERS = {
+    "text": save_text_to_pdf,
+    "table": save_dict_list_to_pdf,
+    "booklet": save_booklet_to_pdf,
+}
+
+class PdfRenderService:
+    """
+    Renders PDFs in a pool of worker processes so ReportLab layout runs off the calling thread
+    and scales with cores. submit() returns a Future resolving to the filename once the file is
+    written. With workers=0 jobs render inline and the returned Future is already done.
+    Render time is measured in the worker and recorded in vocab_pdf_render_seconds here.
+    """
+
+    def __init__(self, workers=None):
+        self.workers = (os.cpu_count() or 1) if workers is None else workers
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def _pool(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                # spawn, not fork: the API process is multi-threaded and forking it can copy held locks
+                self._executor = ProcessPoolExecutor(max_workers=self.workers,
+                                                     mp_context=multiprocessing.get_context("spawn"))
+            return self._executor
+
+    def _discard_pool(self, broken: ProcessPoolExecutor):
+        # Only the first thread to see this pool break replaces it; the rest reuse the fresh one
+        with self._lock:
+            if self._executor is broken:
+                self._executor = None
+        # Reaps the surviving workers and the pool's management thread
+        broken.shutdown(wait=False, cancel_futures=True)
+
+    def submit(self, kind: str, data, filename: str, title: str = None) -> Future:
+        if self.workers <= 0:
+            future = Future()
+            try:
+                future.set_result(_record_render(kind, _render(kind, data, filename, title)))
+            except Exception as e:
+                future.set_exception(e)
+            return future
+        pool = self._pool()
+        try:
+            rendering = pool.submit(_render, kind, data, filename, title)
+        except BrokenProcessPool:
+            # A worker died (e.g. killed for memory); start a fresh pool rather than failing every later render
+            self._discard_pool(pool)
+            rendering = self._pool().submit(_render, kind, data, filename, title)
+        return _filename_future(kind, rendering)
+
+    def submit_text(self, text: str, filename: str, title: str = None) -> Future:
+        return self.submit("text", text, filename, title)
+
+    def submit_table(self, data: list[dict], filename: str, title: str = None) -> Future:
+        return self.submit("table", data, filename, title)
+
+    def submit_booklet(self, booklet: list[dict], filename: str, title: str = None) -> Future:
+        return self.submit("booklet", booklet, filename, title)
+
+    def warm_up(self):
+        # Start every worker now (spawn + reportlab import) instead of on the first real render
+        if self.workers > 0:
+            wait([self._pool().submit(_noop) for _ in range(self.workers)])
+
+    @staticmethod
+    def wait_all(futures) -> list[str]:
+        """Wait for every render and return the filenames; raises the first render error."""
+        wait(futures)
+        return [future.result() for future in futures]
+
+    def shutdown(self, wait=True):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait, cancel_futures=not wait)
+
+
+def _noop():
+    return None
+
+
+def _render(kind, data, filename, title):
+    # Runs in a worker process; its metrics would be lost there, so the time travels back with the filename
+    start = time.perf_counter()
+    RENDERERS[kind](data, filename, title)
+    return filename, time.perf_counter() - start
+
+
+def _record_render(kind, result):
+    filename, seconds = result
+    PDF_RENDER_SECONDS.observe(seconds, kind)
+    return filename
+
+
+def _filename_future(kind, rendering: Future) -> Future:
+    """Future resolving to the filename of a worker render, recording its time when it lands."""
+    future = Future()
+    def done(rendering):
+        try:
+            future.set_result(_record_render(kind, rendering.result()))
+        except BaseException as e:
+            # Includes CancelledError from a shutdown(wait=False)
+            future.set_exception(e)
+    rendering.add_done_callback(done)
+    return future
+
+
 if __name__ == "__main__":
     # Test data for the table function
     test_data = [
@@ -194,6 +384,14 @@ if __name__ == "__main__":
     ]
     
     save_dict_list_to_pdf(test_data2, "data/student_scores.pdf", "Student Test Scores")
+
+    # Both tables and a text page in one booklet with bookmarks
+    booklet = [{'title': "Test 1", 'sections': [
+        {'kind': "table", 'data': test_data, 'title': "Words and Definitions", 'bookmark': "Definitions"},
+        {'kind': "text", 'data': "1. abundant\n2. benevolent", 'title': "Answers", 'bookmark': "Answers"}]},
+        {'title': "Test 2", 'sections': [
+        {'kind': "table", 'data': test_data2, 'title': "Student Test Scores", 'bookmark': "Scores"}]}]
+    save_booklet_to_pdf(booklet, "data/booklet.pdf", "Vocabulary Booklet")
     print("Test completed! Check the generated PDF files.")
 
 
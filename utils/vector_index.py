@@ -0,0 +1,168 @@
+import sys
+import threading
+
+import numpy as np
+
+from logger import GLOBAL_LOGGER as log
+from exception.custom_exception import CustomException
+from utils.db_manager import SQLiteManager
+
+try:
+    import faiss
+except ImportError:
+    faiss = None
+
+
+class VectorIndex:
+    """
+    Exact cosine-similarity index keyed by string. Vectors are L2-normalised as they are added
+    and queries before searching, so inner products are cosines whatever the embedding model returns.
+    Search runs on a FAISS IndexFlatIP when faiss is installed and is otherwise a brute-force
+    NumPy matrix-vector product; both return the same neighbours. Dimensions are taken from
+    the first vectors added. Adding a key that is already indexed replaces its vector.
+    """
+
+    def __init__(self, use_faiss=None):
+        self.backend = "faiss" if (faiss is not None if use_faiss is None else use_faiss) else "numpy"
+        self.dimensions = None
+        self._keys = []
+        self._ids = {}
+        self._matrix = None   # rows beyond len(self._keys) are spare capacity
+        self._faiss = None
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._keys)
+
+    def __contains__(self, key):
+        return key in self._ids
+
+    @staticmethod
+    def normalize(vectors) -> np.ndarray:
+        """Rows scaled to unit length; all-zero rows are left as they are."""
+        vectors = np.array(vectors, dtype=np.float32, ndmin=2)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.where(norms > 0, norms, 1.0)
+
+    def add(self, keys, vectors) -> int:
+        """Index keys with their vectors, replacing the vectors of keys already indexed; returns how many were new."""
+        if not keys:
+            return 0
+        vectors = self.normalize(np.asarray(vectors, dtype=np.float32).reshape(len(keys), -1))
+        with self._lock:
+            last_rows = {key: i for i, key in enumerate(keys)}   # the last vector given for a key wins
+            fresh = [i for key, i in last_rows.items() if key not in self._ids]
+            replaced = [i for key, i in last_rows.items() if key in self._ids]
+            if self.dimensions is None:
+                self.dimensions = vectors.shape[1]
+                self._matrix = np.zeros((max(1024, len(fresh)), self.dimensions), dtype=np.float32)
+                if self.backend == "faiss":
+                    self._faiss = faiss.IndexFlatIP(self.dimensions)
+            elif vectors.shape[1] != self.dimensions:
+                raise CustomException(f"Vector size {vectors.shape[1]} does not match index size {self.dimensions}", sys)
+            for i in replaced:
+                self._matrix[self._ids[keys[i]]] = vectors[i]
+            count = len(self._keys)
+            if count + len(fresh) > len(self._matrix):
+                # Grow by doubling so a stream of small adds stays amortised O(1) per row
+                grown = np.zeros((max(2 * len(self._matrix), count + len(fresh)), self.dimensions), dtype=np.float32)
+                grown[:count] = self._matrix[:count]
+                self._matrix = grown
+            self._matrix[count:count + len(fresh)] = vectors[fresh]
+            for offset, i in enumerate(fresh):
+                self._ids[keys[i]] = count + offset
+                self._keys.append(keys[i])
+            if self._faiss is not None:
+                if replaced:
+                    # IndexFlatIP can't overwrite rows in place: reload it from the matrix
+                    self._faiss.reset()
+                    self._faiss.add(self._matrix[:len(self._keys)])
+                elif fresh:
+                    self._faiss.add(vectors[fresh])
+            return len(fresh)
+
+    def vector(self, key):
+        with self._lock:
+            row = self._ids.get(key)
+            return None if row is None else self._matrix[row].copy()
+
+    def search(self, vector, k=10, exclude=()) -> list[tuple[str, float]]:
+        """Up to k (key, cosine score) pairs closest to vector, best first, skipping keys in exclude."""
+        query = self.normalize(np.asarray(vector, dtype=np.float32).reshape(1, -1))
+        with self._lock:
+            count = len(self._keys)
+            wanted = min(count, k + len(exclude))
+            if not wanted:
+                return []
+            if self._faiss is not None:
+                scores, rows = self._faiss.search(query, wanted)
+                ranked = zip(rows[0].tolist(), scores[0].tolist())
+            else:
+                scores = self._matrix[:count] @ query[0]
+                rows = np.argpartition(-scores, wanted - 1)[:wanted] if wanted < count else np.arange(count)
+                rows = rows[np.argsort(-scores[rows], kind="stable")]
+                ranked = zip(rows.tolist(), scores[rows].tolist())
+            results = [(self._keys[row], round(score, 4)) for row, score in ranked
+                       if row >= 0 and self._keys[row] not in exclude]
+        return results[:k]
+
+
+class VectorStore:
+    """
+    SQLite persistence for a VectorIndex: one row per key with its float32 vector as a blob,
+    plus named values in vector_meta, such as the embedding model the vectors came from. Vectors from another model are useless,
+    so opening the store for a different model empties it.
+    """
+
+    def __init__(self, db_path, model):
+        self.db_path = db_path
+        self.db = SQLiteManager(db_path=db_path, check_same_thread=False)
+        self.create_tables()
+        stored_model = self.db.query_fetch("SELECT value FROM vector_meta WHERE name = 'model';")
+        if stored_model is None or stored_model['value'] != model:
+            self.reset(model)
+
+    def create_tables(self):
+        try:
+            self.db.query_execute("CREATE TABLE IF NOT EXISTS vectors (key TEXT PRIMARY KEY, vector BLOB NOT NULL);")
+            self.db.query_execute("CREATE TABLE IF NOT EXISTS vector_meta (name TEXT PRIMARY KEY, value TEXT);")
+        except Exception as e:
+            log.error("Error creating vector store tables", error=str(e))
+            raise CustomException("Error creating vector store tables : ", e) from e
+
+    def reset(self, model):
+        with self.db.transaction() as conn:
+            conn.execute("DELETE FROM vectors;")
+            conn.execute("DELETE FROM vector_meta;")
+            conn.execute("INSERT OR REPLACE INTO vector_meta (name, value) VALUES ('model', ?);", (model,))
+        log.info("Vector store reset", db_path=self.db_path, model=model)
+
+    def get_meta(self, name):
+        row = self.db.query_fetch("SELECT value FROM vector_meta WHERE name = ?;", (name,))
+        return None if row is None else row['value']
+
+    def set_meta(self, name, value):
+        self.db.query_execute("INSERT OR REPLACE INTO vector_meta (name, value) VALUES (?, ?);", (name, str(value)))
+
+    def load(self) -> tuple[list[str], np.ndarray]:
+        """All stored (keys, vectors), in insertion order."""
+        rows = self.db.query_fetch_all("SELECT key, vector FROM vectors ORDER BY rowid;")
+        if not rows:
+            return [], np.zeros((0, 0), dtype=np.float32)
+        return [row['key'] for row in rows], np.vstack([np.frombuffer(row['vector'], dtype=np.float32) for row in rows])
+
+    def save(self, keys, vectors) -> int:
+        vectors = np.asarray(vectors, dtype=np.float32)
+        return self.db.execute_many("INSERT OR REPLACE INTO vectors (key, vector) VALUES (?, ?);",
+                                    [(key, vector.tobytes()) for key, vector in zip(keys, vectors)])
+
+    def close(self):
+        self.db.close()
+
+
+if __name__ == "__main__":
+    rng = np.random.default_rng(0)
+    vectors = rng.normal(size=(5, 8)).astype(np.float32)
+    index = VectorIndex()
+    index.add(["a", "b", "c", "d", "e"], vectors)
+    print(index.backend, index.search(index.vector("a"), k=3, exclude={"a"}))